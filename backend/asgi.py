@@ -0,0 +1,258 @@
+# asgi.py
+"""
+Async serving mode: an ASGI app for an event-loop server (Hypercorn), e.g.
+
+    hypercorn -b 0.0.0.0:5000 -w 2 asgi:app
+
+I/O-bound reads (the routes of async_app) are served by async Quart handlers on an
+aiomysql pool, so one worker keeps many requests in flight instead of one
+per worker. Every other request (writes, exports, the remaining
+resources) goes to the sync Flask app in main.py on a thread pool, so the
+API is the same in both modes. Gunicorn + main:app remains the default.
+"""
+
+import asyncio
+import logging
+import os
+from functools import wraps
+
+import main
+from a2wsgi import WSGIMiddleware
+from async_db import close_async_pool, get_async_connection
+from auth import AuthError, authenticate
+from compression import COMPRESS_MIN_SIZE, compress_body, compressible, mark_encoded, negotiate
+from conditional import compute_validators, set_validators
+from db import STICKY_HEADER
+from fields import InvalidFields, parse_fields, project
+from filters import InvalidFilter, parse_filters
+from includes import InvalidInclude, include_tables
+from json_provider import FastJSONProvider
+from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+from opentelemetry.trace import Status, StatusCode, get_current_span
+from pagination import InvalidPageRequest, next_page, parse_page_request
+from quart import Quart, Response, current_app, g, jsonify, make_response, request, url_for
+from repositories.students_repository import (
+    STUDENT_FIELDS,
+    STUDENT_FILTERS,
+    STUDENT_ORDER,
+    get_student_async,
+    list_students_async,
+)
+from repositories.table_versions_repository import get_table_versions_async
+from sync import InvalidSyncToken
+from werkzeug.exceptions import HTTPException
+from werkzeug.sansio.http import is_resource_modified
+
+log = logging.getLogger(__name__)
+
+# Threads running sync Flask requests per worker
+ASGI_SYNC_THREADS = int(os.getenv("API_ASGI_SYNC_THREADS", "10"))
+
+# Headers the Flask app exposes through flask-cors
+CORS_EXPOSE_HEADERS = f"Link, ETag, Last-Modified, {STICKY_HEADER}"
+
+async_app = Quart(__name__, static_folder=None)
+async_app.json = FastJSONProvider(async_app)
+
+
+@async_app.before_request
+async def count_requests():
+    main.request_counter.add(1, {"http_method": request.method, "http_route": request.path})
+
+
+@async_app.errorhandler(InvalidFields)
+@async_app.errorhandler(InvalidFilter)
+@async_app.errorhandler(InvalidInclude)
+@async_app.errorhandler(InvalidPageRequest)
+@async_app.errorhandler(InvalidSyncToken)
+async def invalid_list_request(e):
+    get_current_span().add_event("validation_failed", {"reason": str(e)})
+    return jsonify({"error": str(e)}), 400
+
+
+@async_app.after_request
+async def cors_and_compress(response: Response) -> Response:
+    # Only GETs reach this app; preflights are answered by flask-cors, whose
+    # response headers (echoed Origin, Vary) these mirror
+    origin = request.headers.get("Origin")
+    if origin:
+        response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers["Access-Control-Expose-Headers"] = CORS_EXPOSE_HEADERS
+        response.vary.add("Origin")
+
+    if not compressible(response):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+    data = await response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(compress_body(data, encoding))
+    mark_encoded(response, encoding)
+    return response
+
+
+@async_app.after_serving
+async def close_pool():
+    await close_async_pool()
+
+
+# ---------- decorators (async counterparts of auth / conditional) ----------
+def requires_auth(f):
+    """auth.requires_auth for async handlers; claims go to g.jwt_payload."""
+
+    @wraps(f)
+    async def wrapper(*args, **kwargs):
+        if current_app.config.get("BYPASS_AUTH", False):
+            get_current_span().add_event("auth_bypassed", {"reason": "BYPASS_AUTH"})
+            return await f(*args, **kwargs)
+
+        try:
+            # Off the loop: a cache miss may fetch signing keys over HTTP
+            g.jwt_payload = await asyncio.to_thread(authenticate, request.headers.get("Authorization"))
+        except AuthError as e:
+            return jsonify({"error": str(e)}), e.status
+        return await f(*args, **kwargs)
+
+    return wrapper
+
+
+def conditional(*tables: str):
+    """conditional.conditional for async handlers."""
+
+    def decorator(f):
+        @wraps(f)
+        async def wrapper(*args, **kwargs):
+            read = tuple(dict.fromkeys([*tables, *include_tables(request.args)]))
+            try:
+                versions = await get_table_versions_async(read)
+            except Exception as e:
+                log.warning("Table versions unavailable", extra={"db.error": str(e)})
+                return await f(*args, **kwargs)
+
+            validators = compute_validators(
+                versions, read, request.path, request.query_string.decode("latin-1"), request.headers.get("Accept", "")
+            )
+            if validators is None:
+                return await f(*args, **kwargs)
+
+            etag, last_modified = validators
+            modified = is_resource_modified(
+                http_if_none_match=request.headers.get("If-None-Match"),
+                http_if_modified_since=request.headers.get("If-Modified-Since"),
+                etag=etag,
+                last_modified=last_modified,
+            )
+            if not modified:
+                get_current_span().add_event("http_not_modified", {"etag": etag})
+                response = Response(status=304)
+            else:
+                response = await make_response(await f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            set_validators(response, etag, last_modified)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# ---------- endpoints ----------
+@async_app.route("/health", methods=["GET"])
+async def health():
+    span = get_current_span()
+    span.update_name("health_handler")
+    try:
+        async with get_async_connection() as connection:
+            await connection.ping(reconnect=False)
+        span.set_status(Status(StatusCode.OK))
+        span.set_attribute("health.db_status", "ok")
+        return jsonify({"status": "healthy"}), 200
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        span.set_attribute("health.db_status", "error")
+        return jsonify({"status": "unhealthy", "reason": str(e)}), 500
+
+
+@async_app.route("/students", methods=["GET"])
+@requires_auth
+@conditional("students")
+async def get_students():
+    span = get_current_span()
+    filters = parse_filters(request.args, STUDENT_FILTERS)
+    fields = parse_fields(request.args, STUDENT_FIELDS)
+    page = parse_page_request(request.args, STUDENT_ORDER)
+    try:
+        rows = await list_students_async(limit=page.fetch_size, after=page.after, filters=filters, fields=fields)
+        students, cursor = next_page(rows, page, STUDENT_ORDER)
+        links = {}
+        if cursor is not None:
+            args = {**request.args.to_dict(), "cursor": cursor, "limit": page.limit}
+            links["Link"] = f'<{url_for("get_students", **args, _external=True)}>; rel="next"'
+        span.set_attribute("students.count", len(students))
+        span.set_status(Status(StatusCode.OK))
+        return jsonify([project(item, fields) for item in students]), 200, links
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to fetch students"}), 500
+
+
+@async_app.route("/students/<int:student_id>", methods=["GET"])
+@requires_auth
+@conditional("students")
+async def get_student_by_id(student_id: int):
+    span = get_current_span()
+    span.set_attribute("student.id", student_id)
+    fields = parse_fields(request.args, STUDENT_FIELDS)
+    try:
+        student = await get_student_async(student_id, fields=fields)
+        if not student:
+            span.set_status(Status(StatusCode.OK))
+            return jsonify({"error": "Student not found"}), 404
+
+        span.set_status(Status(StatusCode.OK))
+        return jsonify(student), 200
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to fetch student"}), 500
+
+
+# ---------- dispatch ----------
+class AsyncFirst:
+    """
+    Send GET / HEAD requests for routes of `async_app` to it and everything
+    else to the sync WSGI `sync_app`, run on `threads` threads.
+    """
+
+    def __init__(self, async_app, sync_app, threads: int = ASGI_SYNC_THREADS):
+        self.async_app = async_app
+        self.traced_async_app = OpenTelemetryMiddleware(async_app)
+        # Flask requests are traced by the Flask instrumentation
+        self.sync_app = WSGIMiddleware(sync_app, workers=threads)
+        self._urls = async_app.url_map.bind("localhost")
+
+    def is_async(self, scope) -> bool:
+        if scope["method"] not in ("GET", "HEAD"):
+            return False
+        try:
+            self._urls.match(scope["path"], method=scope["method"])
+        except HTTPException:
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.async_app(scope, receive, send)
+        if scope["type"] == "http" and self.is_async(scope):
+            return await self.traced_async_app(scope, receive, send)
+        return await self.sync_app(scope, receive, send)
+
+
+app = AsyncFirst(async_app, main.app)
@@ -0,0 +1,114 @@
+# async_db.py
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from config import DB_ASYNC_POOL_CONFIG, DB_CONFIG
+from db import PoolExhaustedError, pool_checkouts, pool_exhausted, pool_wait_time
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+
+log = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+_ATTRIBUTES = {"db.pool": "async"}
+
+
+def _load_aiomysql():
+    try:
+        import aiomysql
+    except ImportError:
+        log.info("aiomysql not installed; async serving mode unavailable")
+        return None
+    return aiomysql
+
+
+aiomysql = _load_aiomysql()
+
+# An aiomysql pool belongs to the event loop it was created on
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_pool_lock: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+async def _create_pool():
+    with tracer.start_as_current_span("create_async_db_pool") as span:
+        span.set_attribute("db.system", "mysql")
+        span.set_attribute("db.name", DB_CONFIG["database"])
+        span.set_attribute("net.peer.name", DB_CONFIG["host"])
+        try:
+            pool = await aiomysql.create_pool(
+                host=DB_CONFIG["host"],
+                port=DB_CONFIG["port"],
+                user=DB_CONFIG["user"],
+                password=DB_CONFIG["password"],
+                db=DB_CONFIG["database"],
+                minsize=DB_ASYNC_POOL_CONFIG["minsize"],
+                maxsize=DB_ASYNC_POOL_CONFIG["maxsize"],
+                pool_recycle=int(DB_ASYNC_POOL_CONFIG["max_lifetime"]),
+                # Read-only use: no transaction (or stale snapshot) outlives a statement
+                autocommit=True,
+            )
+        except Exception as e:
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            log.error(f"Async DB pool creation failed: {e}", extra={"db.error": str(e)})
+            raise
+        span.set_status(Status(StatusCode.OK))
+        log.info(
+            "Async DB pool ready",
+            extra={"db.host": DB_CONFIG["host"], "db.pool.size": DB_ASYNC_POOL_CONFIG["maxsize"]},
+        )
+        return pool
+
+
+async def get_async_pool():
+    """
+    Return the running event loop's aiomysql pool, creating it on first use.
+    """
+    if aiomysql is None:
+        raise RuntimeError("Async serving mode requires the 'aiomysql' package")
+
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        lock = _pool_lock.setdefault(loop, asyncio.Lock())
+        async with lock:
+            pool = _pools.get(loop)
+            if pool is None:
+                pool = _pools[loop] = await _create_pool()
+    return pool
+
+
+@asynccontextmanager
+async def get_async_connection():
+    """
+    Async counterpart of db.get_connection(): check a connection out of the
+    loop's pool for the duration of the block. Waits up to
+    DB_ASYNC_POOL_TIMEOUT seconds for a free one.
+    """
+    pool = await get_async_pool()
+    started = time.monotonic()
+    try:
+        connection = await asyncio.wait_for(pool.acquire(), DB_ASYNC_POOL_CONFIG["timeout"])
+    except asyncio.TimeoutError:
+        pool_exhausted.add(1, _ATTRIBUTES)
+        log.warning("Async DB pool exhausted", extra={"db.pool.size": DB_ASYNC_POOL_CONFIG["maxsize"]})
+        raise PoolExhaustedError("No DB connection available from async pool") from None
+
+    pool_wait_time.record((time.monotonic() - started) * 1000.0, _ATTRIBUTES)
+    pool_checkouts.add(1, _ATTRIBUTES)
+    try:
+        yield connection
+    finally:
+        pool.release(connection)
+
+
+async def close_async_pool() -> None:
+    """Close the running loop's pool (ASGI lifespan shutdown)."""
+    pool: Optional[Any] = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        pool.close()
+        await pool.wait_closed()
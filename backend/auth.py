@@ -1,14 +1,38 @@
 # auth.py
+import hashlib
+import json
 import logging
 import os
+import threading
+import time
 from functools import wraps
+from typing import Any, Callable, Dict, Optional
 
 import jwt  # PyJWT
 import requests
+from cache import TTLCache
 from flask import current_app, jsonify, request
+from opentelemetry import metrics
 from opentelemetry.trace import get_current_span
 
 log = logging.getLogger(__name__)
+meter = metrics.get_meter("student-registration-auth", "0.1.0")
+
+auth_cache_hits = meter.create_counter(
+    name="auth_cache_hits_total",
+    unit="1",
+    description="Validated-token and JWKS key cache hits",
+)
+auth_cache_misses = meter.create_counter(
+    name="auth_cache_misses_total",
+    unit="1",
+    description="Validated-token and JWKS key cache misses",
+)
+jwks_refreshes = meter.create_counter(
+    name="auth_jwks_refreshes_total",
+    unit="1",
+    description="JWKS fetches from the identity provider",
+)
 
 TENANT_ID = os.getenv("ENTRA_TENANT_ID", "")
 API_CLIENT_ID = os.getenv("ENTRA_API_CLIENT_ID", "")
@@ -17,25 +41,329 @@ EXPECTED_SCOPE = os.getenv("ENTRA_EXPECTED_SCOPE", "access_as_user")
 # Optional explicit audience override, e.g. "api://<API_CLIENT_ID>"
 EXPLICIT_AUDIENCE = os.getenv("ENTRA_API_AUDIENCE", "").strip()
 
+# Validated-token cache (entries never outlive the token's exp)
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "2048"))
+TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+
+# Signing keys: periodic background refresh, throttled refetch on unknown kid
+JWKS_REFRESH_INTERVAL = float(os.getenv("AUTH_JWKS_REFRESH_INTERVAL", "3600"))
+JWKS_MIN_REFETCH_INTERVAL = float(os.getenv("AUTH_JWKS_MIN_REFETCH_INTERVAL", "60"))
+
+# OIDC discovery: loaded lazily, retried with backoff, refreshed in the background
+OIDC_REFRESH_INTERVAL = float(os.getenv("AUTH_OIDC_REFRESH_INTERVAL", "86400"))
+OIDC_RETRY_MAX = float(os.getenv("AUTH_OIDC_RETRY_MAX", "300"))
+OIDC_TIMEOUT = float(os.getenv("AUTH_OIDC_TIMEOUT", "5"))
+
+# Optional local seeds for offline / CI environments (standard document formats)
+OIDC_CONFIG_FILE = os.getenv("ENTRA_OIDC_CONFIG_FILE", "").strip()  # openid-configuration JSON
+JWKS_FILE = os.getenv("ENTRA_JWKS_FILE", "").strip()  # {"keys": [...]} JWK set
+
 if not TENANT_ID or not API_CLIENT_ID:
     print("[auth] WARNING: ENTRA_TENANT_ID or ENTRA_API_CLIENT_ID not set. JWT validation may fail.")
 
 # Discover OpenID config (v2 endpoint)
 OIDC_CONFIG_URL = f"https://login.microsoftonline.com/{TENANT_ID}/v2.0/.well-known/openid-configuration"
 
-try:
-    oidc_config = requests.get(OIDC_CONFIG_URL, timeout=5).json()
-    ISSUER_V2 = oidc_config.get("issuer")  # e.g. https://login.microsoftonline.com/<tid>/v2.0
-    JWKS_URI = oidc_config.get("jwks_uri")
-except Exception as e:
-    print(f"[auth] Failed to load OIDC config: {e}")
-    ISSUER_V2 = None
-    JWKS_URI = None
-
 # v1 style issuer (matches what your token shows: sts.windows.net/tenant/)
 ISSUER_V1 = f"https://sts.windows.net/{TENANT_ID}/" if TENANT_ID else None
 
-jwks_client = jwt.PyJWKClient(JWKS_URI) if JWKS_URI else None
+
+def _keys_from_jwk_set(jwk_set: jwt.PyJWKSet) -> Dict[str, Any]:
+    return {k.key_id: k.key for k in jwk_set.keys if k.key_id}
+
+
+def _start_daemon(owner, target: Callable[[], None], name: str) -> None:
+    """
+    Start `target` in a daemon thread once per process. Threads do not
+    survive fork, so each gunicorn worker starts its own on first use.
+    """
+    pid = os.getpid()
+    if owner._daemon_pid == pid:
+        return
+    with owner._lock:
+        if owner._daemon_pid == pid:
+            return
+        owner._daemon_pid = pid
+        threading.Thread(target=target, name=name, daemon=True).start()
+
+
+class JWKSCache:
+    """
+    Signing keys by `kid`, fetched from the JWKS endpoint.
+
+    Keys are refreshed every `refresh_interval` seconds by a daemon thread
+    (started lazily, once per worker process) until stop() is called. A token
+    with an unknown `kid` triggers an immediate refetch (key rotation), but
+    at most once per `min_refetch_interval` so garbage tokens cannot hammer
+    the IdP.
+    """
+
+    def __init__(
+        self,
+        jwks_uri: Optional[str],
+        refresh_interval: float = 3600.0,
+        min_refetch_interval: float = 60.0,
+        fetch: Optional[Callable[[], Dict[str, Any]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        keys: Optional[Dict[str, Any]] = None,
+    ):
+        self.jwks_uri = jwks_uri
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self._fetch = fetch or self._fetch_keys
+        self._clock = clock
+
+        self._keys: Dict[str, Any] = dict(keys or {})
+        self._last_attempt: Optional[float] = None
+        self._lock = threading.Lock()
+        self._daemon_pid: Optional[int] = None
+        self._stopped = threading.Event()
+        self.hits = 0
+        self.misses = 0
+
+    def _fetch_keys(self) -> Dict[str, Any]:
+        if not self.jwks_uri:
+            raise jwt.PyJWKClientError("No JWKS URI configured")
+        client = jwt.PyJWKClient(self.jwks_uri, cache_jwk_set=False, timeout=OIDC_TIMEOUT)
+        return _keys_from_jwk_set(client.get_jwk_set())
+
+    def refresh(self) -> bool:
+        """
+        Replace the key set. On failure the previous keys stay in use.
+        """
+        self._last_attempt = self._clock()
+        try:
+            keys = self._fetch()
+        except Exception as e:
+            log.warning("JWKS refresh failed", extra={"auth.error": str(e)})
+            return False
+
+        jwks_refreshes.add(1)
+        self._keys = keys
+        return True
+
+    def get_signing_key(self, kid: Optional[str]) -> Any:
+        if self.refresh_interval > 0 and not self._stopped.is_set():
+            _start_daemon(self, self._refresh_loop, "jwks-refresh")
+
+        key = self._keys.get(kid)
+        if key is not None:
+            self.hits += 1
+            auth_cache_hits.add(1, {"cache": "jwks"})
+            return key
+
+        self.misses += 1
+        auth_cache_misses.add(1, {"cache": "jwks"})
+        with self._lock:
+            key = self._keys.get(kid)  # another thread may have just refetched
+            if key is None and self._may_refetch():
+                self.refresh()
+                key = self._keys.get(kid)
+
+        if key is None:
+            raise jwt.PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+        return key
+
+    def _may_refetch(self) -> bool:
+        return self._last_attempt is None or self._clock() - self._last_attempt >= self.min_refetch_interval
+
+    def _refresh_loop(self) -> None:
+        while not self._stopped.wait(self.refresh_interval):
+            self.refresh()
+
+    def stop(self) -> None:
+        """
+        End the refresh thread (at its next wake-up) once this cache has been
+        replaced; lookups keep working on the keys it holds.
+        """
+        self._stopped.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._keys), "hits": self.hits, "misses": self.misses}
+
+
+class OIDCDiscovery:
+    """
+    OpenID configuration + signing keys for the tenant, loaded on first use
+    instead of at import so worker start never waits on the IdP.
+
+    Optional local files seed the issuer / jwks_uri and the key set (offline
+    and CI). A failed load is retried with exponential backoff (capped at
+    `retry_max`) by both requests and a per-process daemon thread, which also
+    re-reads the discovery document every `refresh_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        config_url: str,
+        config_file: Optional[str] = None,
+        jwks_file: Optional[str] = None,
+        refresh_interval: float = 86400.0,
+        retry_max: float = 300.0,
+        fetch_config: Optional[Callable[[], Dict[str, Any]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config_url = config_url
+        self.config_file = config_file
+        self.jwks_file = jwks_file
+        self.refresh_interval = refresh_interval
+        self.retry_max = retry_max
+        self._fetch_config = fetch_config or self._fetch_remote_config
+        self._clock = clock
+
+        self.issuer: Optional[str] = None
+        self.jwks_uri: Optional[str] = None
+        self.jwks_cache: Optional[JWKSCache] = None
+
+        self._lock = threading.Lock()
+        self._daemon_pid: Optional[int] = None
+        self._seeded = False
+        self._backoff = 1.0
+        self._next_attempt = 0.0
+
+    def _fetch_remote_config(self) -> Dict[str, Any]:
+        response = requests.get(self.config_url, timeout=OIDC_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    def ensure_loaded(self) -> bool:
+        """
+        True once signing keys are available. Never blocks longer than one
+        discovery attempt, and only when a retry is due.
+        """
+        if self.jwks_cache is None:
+            with self._lock:
+                if not self._seeded:
+                    self._seeded = True
+                    self._load_seed()
+                if self.jwks_cache is None and self._clock() >= self._next_attempt:
+                    self.load()
+
+        if self.refresh_interval > 0:
+            _start_daemon(self, self._refresh_loop, "oidc-refresh")
+        return self.jwks_cache is not None
+
+    def _load_seed(self) -> None:
+        try:
+            if self.config_file:
+                with open(self.config_file, encoding="utf-8") as fh:
+                    self._apply_config(json.load(fh))
+            if self.jwks_file:
+                with open(self.jwks_file, encoding="utf-8") as fh:
+                    keys = _keys_from_jwk_set(jwt.PyJWKSet.from_dict(json.load(fh)))
+                self._replace_jwks_cache(self._new_jwks_cache(self.jwks_uri, keys))
+            log.info("Seeded OIDC config from local files", extra={"auth.config_file": self.config_file})
+        except Exception as e:
+            log.warning("Failed to load OIDC seed files", extra={"auth.error": str(e)})
+
+    def load(self) -> bool:
+        """
+        Fetch the discovery document; keeps the previous config on failure.
+        """
+        try:
+            config = self._fetch_config()
+            self._apply_config(config)
+        except Exception as e:
+            self._next_attempt = self._clock() + self._backoff
+            log.warning(
+                "Failed to load OIDC config",
+                extra={"auth.error": str(e), "auth.retry_in_s": self._backoff},
+            )
+            self._backoff = min(self._backoff * 2, self.retry_max)
+            return False
+
+        self._backoff = 1.0
+        self._next_attempt = 0.0
+        return True
+
+    def _apply_config(self, config: Dict[str, Any]) -> None:
+        jwks_uri = config.get("jwks_uri")
+        if not jwks_uri:
+            raise ValueError("OIDC config has no jwks_uri")
+
+        self.issuer = config.get("issuer")  # e.g. https://login.microsoftonline.com/<tid>/v2.0
+        if self.jwks_cache is None or self.jwks_cache.jwks_uri != jwks_uri:
+            keys = self.jwks_cache._keys if self.jwks_cache else None
+            self._replace_jwks_cache(self._new_jwks_cache(jwks_uri, keys))
+        self.jwks_uri = jwks_uri
+
+    def _replace_jwks_cache(self, jwks_cache: JWKSCache) -> None:
+        # The old cache's refresh thread would otherwise keep polling its URI
+        previous, self.jwks_cache = self.jwks_cache, jwks_cache
+        if previous is not None:
+            previous.stop()
+
+    @staticmethod
+    def _new_jwks_cache(jwks_uri: Optional[str], keys: Optional[Dict[str, Any]]) -> JWKSCache:
+        return JWKSCache(
+            jwks_uri,
+            refresh_interval=JWKS_REFRESH_INTERVAL,
+            min_refetch_interval=JWKS_MIN_REFETCH_INTERVAL,
+            keys=keys,
+        )
+
+    def _refresh_loop(self) -> None:
+        while True:
+            loaded = self.jwks_cache is not None and self._backoff == 1.0
+            time.sleep(self.refresh_interval if loaded else self._backoff)
+            with self._lock:
+                self.load()
+
+
+discovery = OIDCDiscovery(
+    OIDC_CONFIG_URL,
+    config_file=OIDC_CONFIG_FILE or None,
+    jwks_file=JWKS_FILE or None,
+    refresh_interval=OIDC_REFRESH_INTERVAL,
+    retry_max=OIDC_RETRY_MAX,
+)
+
+# sha256(token) -> decoded claims, for tokens whose signature already verified
+token_cache = TTLCache(
+    maxsize=TOKEN_CACHE_SIZE,
+    ttl=TOKEN_CACHE_TTL,
+    on_hit=lambda: auth_cache_hits.add(1, {"cache": "token"}),
+    on_miss=lambda: auth_cache_misses.add(1, {"cache": "token"}),
+)
+
+
+def _verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify signature + expiry once per token; repeat requests with the same
+    bearer token are served from token_cache until the token expires.
+    """
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    decoded = token_cache.get(cache_key)
+    if decoded is not None:
+        get_current_span().set_attribute("auth.cache_hit", True)
+        return decoded
+
+    kid = jwt.get_unverified_header(token).get("kid")
+    signing_key = discovery.jwks_cache.get_signing_key(kid)
+
+    # We disable built-in iss/aud verification and do it ourselves
+    decoded = jwt.decode(
+        token,
+        signing_key,
+        algorithms=["RS256"],
+        options={
+            "verify_exp": True,
+            "verify_aud": False,
+            "verify_iss": False,
+        },
+    )
+
+    exp = decoded.get("exp")
+    token_cache.set(cache_key, decoded, ttl=(exp - time.time()) if isinstance(exp, (int, float)) else None)
+    get_current_span().set_attribute("auth.cache_hit", False)
+    return decoded
+
+
+def auth_cache_stats() -> Dict[str, Any]:
+    return {
+        "token": token_cache.stats(),
+        "jwks": discovery.jwks_cache.stats() if discovery.jwks_cache else None,
+    }
 
 
 def _build_expected_audiences() -> set:
@@ -75,168 +403,176 @@ def _build_expected_issuers() -> set:
     We accept both.
     """
     expected = set()
-    if ISSUER_V2:
-        expected.add(ISSUER_V2)
+    if discovery.issuer:
+        expected.add(discovery.issuer)
     if ISSUER_V1:
         expected.add(ISSUER_V1)
     return expected
 
 
-def requires_auth(f):
+class AuthError(Exception):
+    """A rejected request: str(error) is returned with HTTP `status`."""
+
+    def __init__(self, message: str, status: int = 401):
+        super().__init__(message)
+        self.status = status
+
+
+def authenticate(auth_header: Optional[str]) -> Dict[str, Any]:
     """
-    Strict JWT validation decorator for Entra ID access tokens.
+    Validate an "Authorization: Bearer <jwt>" header and return the token's
+    claims, or raise AuthError. Framework-agnostic, so the Flask decorator
+    below and the async app (asgi.py) share it.
 
-    This version:
-      - ✅ Validates signature via JWKS
+      - ✅ Validates signature via JWKS (once per token, then cached until exp)
       - ✅ Validates issuer (v1 & v2 forms)
       - ✅ Validates audience (GUID and api://GUID forms, plus optional override)
       - ✅ Validates expiry
       - ✅ Enforces EXPECTED_SCOPE in 'scp'
       - ✅ Adds auth.* attributes to the current span
       - ✅ Logs a structured "JWT validated" with key claims
-
-      Additionally:
-      - ✅ Allows bypassing auth when Flask config BYPASS_AUTH=True (used in tests)
     """
+    span = get_current_span()
 
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        span = get_current_span()
+    if not auth_header or not auth_header.startswith("Bearer "):
+        span.add_event("auth_missing_or_invalid_header")
+        raise AuthError("Authorization header missing")
 
-        # 🔓 Bypass auth when explicitly enabled (e.g. tests)
-        try:
-            if current_app.config.get("BYPASS_AUTH", False):
-                span.add_event("auth_bypassed", {"reason": "BYPASS_AUTH"})
-                return f(*args, **kwargs)
-        except RuntimeError:
-            # No app context available; ignore and proceed with normal auth
-            pass
-
-        auth_header = request.headers.get("Authorization", None)
+    token = auth_header.split(" ", 1)[1]
 
-        if not auth_header or not auth_header.startswith("Bearer "):
-            span.add_event("auth_missing_or_invalid_header")
-            return jsonify({"error": "Authorization header missing"}), 401
+    if not discovery.ensure_loaded():
+        span.add_event("auth_config_not_loaded")
+        raise AuthError("Auth not configured properly", 500)
 
-        token = auth_header.split(" ", 1)[1]
+    try:
+        # 1) Signature + expiry validation (cached per token)
+        decoded = _verify_token(token)
 
-        if not jwks_client:
-            span.add_event("auth_config_not_loaded")
-            return jsonify({"error": "Auth not configured properly"}), 500
+        token_iss = decoded.get("iss", "")
+        token_aud = decoded.get("aud", "")
+        token_scp = decoded.get("scp", "")
+        token_oid = decoded.get("oid", "")
+        token_upn = decoded.get("preferred_username") or decoded.get("email") or decoded.get("unique_name", "")
+        token_tid = decoded.get("tid", "")
 
-        try:
-            # 1) Signature + expiry validation
-            signing_key = jwks_client.get_signing_key_from_jwt(token).key
-
-            # We disable built-in iss/aud verification and do it ourselves
-            decoded = jwt.decode(
-                token,
-                signing_key,
-                algorithms=["RS256"],
-                options={
-                    "verify_exp": True,
-                    "verify_aud": False,
-                    "verify_iss": False,
+        # 2) Issuer validation (v1 + v2 allowed)
+        expected_issuers = _build_expected_issuers()
+        if expected_issuers and token_iss not in expected_issuers:
+            span.add_event(
+                "auth_invalid_issuer",
+                {
+                    "iss": token_iss,
+                    "expected": list(expected_issuers),
                 },
             )
+            log.warning(
+                "JWT invalid issuer",
+                extra={
+                    "jwt.iss": token_iss,
+                    "jwt.expected_issuers": list(expected_issuers),
+                },
+            )
+            raise AuthError("Invalid token: invalid issuer")
 
-            token_iss = decoded.get("iss", "")
-            token_aud = decoded.get("aud", "")
-            token_scp = decoded.get("scp", "")
-            token_oid = decoded.get("oid", "")
-            token_upn = decoded.get("preferred_username") or decoded.get("email") or decoded.get("unique_name", "")
-            token_tid = decoded.get("tid", "")
-
-            # 2) Issuer validation (v1 + v2 allowed)
-            expected_issuers = _build_expected_issuers()
-            if expected_issuers and token_iss not in expected_issuers:
-                span.add_event(
-                    "auth_invalid_issuer",
-                    {
-                        "iss": token_iss,
-                        "expected": list(expected_issuers),
-                    },
-                )
-                log.warning(
-                    "JWT invalid issuer",
-                    extra={
-                        "jwt.iss": token_iss,
-                        "jwt.expected_issuers": list(expected_issuers),
-                    },
-                )
-                return jsonify({"error": "Invalid token: invalid issuer"}), 401
-
-            # 3) Audience validation (GUID vs api://GUID)
-            expected_audiences = _build_expected_audiences()
-            if expected_audiences and token_aud not in expected_audiences:
-                span.add_event(
-                    "auth_invalid_audience",
-                    {
-                        "aud": token_aud,
-                        "expected": list(expected_audiences),
-                    },
-                )
-                log.warning(
-                    "JWT invalid audience",
-                    extra={
-                        "jwt.aud": token_aud,
-                        "jwt.expected_audiences": list(expected_audiences),
-                    },
-                )
-                return jsonify({"error": "Invalid token: invalid audience"}), 401
-
-            # 4) Trace attributes (OpenTelemetry)
-            span.set_attribute("auth.iss", token_iss)
-            span.set_attribute("auth.aud", token_aud)
-            span.set_attribute("auth.scopes", token_scp)
-            span.set_attribute("auth.oid", token_oid)
-            span.set_attribute("auth.user", token_upn)
-            span.set_attribute("auth.tenant", token_tid)
-
+        # 3) Audience validation (GUID vs api://GUID)
+        expected_audiences = _build_expected_audiences()
+        if expected_audiences and token_aud not in expected_audiences:
             span.add_event(
-                "auth_token_claims",
+                "auth_invalid_audience",
                 {
-                    "iss": token_iss,
                     "aud": token_aud,
-                    "scp": token_scp,
-                    "oid": token_oid,
-                    "preferred_username": token_upn,
-                    "tid": token_tid,
+                    "expected": list(expected_audiences),
                 },
             )
-
-            # 5) Structured log (no raw token)
-            log.info(
-                "JWT validated",
+            log.warning(
+                "JWT invalid audience",
                 extra={
-                    "jwt.iss": token_iss,
                     "jwt.aud": token_aud,
-                    "jwt.scp": token_scp,
-                    "jwt.oid": token_oid,
-                    "jwt.preferred_username": token_upn,
-                    "jwt.tid": token_tid,
+                    "jwt.expected_audiences": list(expected_audiences),
                 },
             )
+            raise AuthError("Invalid token: invalid audience")
+
+        # 4) Trace attributes (OpenTelemetry)
+        span.set_attribute("auth.iss", token_iss)
+        span.set_attribute("auth.aud", token_aud)
+        span.set_attribute("auth.scopes", token_scp)
+        span.set_attribute("auth.oid", token_oid)
+        span.set_attribute("auth.user", token_upn)
+        span.set_attribute("auth.tenant", token_tid)
+
+        span.add_event(
+            "auth_token_claims",
+            {
+                "iss": token_iss,
+                "aud": token_aud,
+                "scp": token_scp,
+                "oid": token_oid,
+                "preferred_username": token_upn,
+                "tid": token_tid,
+            },
+        )
+
+        # 5) Structured log (no raw token)
+        log.info(
+            "JWT validated",
+            extra={
+                "jwt.iss": token_iss,
+                "jwt.aud": token_aud,
+                "jwt.scp": token_scp,
+                "jwt.oid": token_oid,
+                "jwt.preferred_username": token_upn,
+                "jwt.tid": token_tid,
+            },
+        )
+
+        # 6) Scope enforcement
+        scopes_raw = token_scp
+        scopes = scopes_raw.split() if isinstance(scopes_raw, str) else []
+
+        if EXPECTED_SCOPE and EXPECTED_SCOPE not in scopes:
+            span.add_event(
+                "auth_insufficient_scope",
+                {"scp": scopes_raw, "expected": EXPECTED_SCOPE},
+            )
+            raise AuthError("Insufficient scope", 403)
+
+        span.add_event("auth_success", {"subject": decoded.get("sub", "")})
+        return decoded
+
+    except AuthError:
+        raise
+    except Exception as ex:
+        span.add_event("auth_failed", {"error": str(ex)})
+        log.warning("JWT validation failed", extra={"auth.error": str(ex)})
+        raise AuthError(f"Invalid token: {str(ex)}") from ex
+
 
-            # 6) Scope enforcement
-            scopes_raw = token_scp
-            scopes = scopes_raw.split() if isinstance(scopes_raw, str) else []
-
-            if EXPECTED_SCOPE and EXPECTED_SCOPE not in scopes:
-                span.add_event(
-                    "auth_insufficient_scope",
-                    {"scp": scopes_raw, "expected": EXPECTED_SCOPE},
-                )
-                return jsonify({"error": "Insufficient scope"}), 403
-
-            # 7) Attach decoded token to request for downstream use
-            request.jwt_payload = decoded
-            span.add_event("auth_success", {"subject": decoded.get("sub", "")})
-
-        except Exception as ex:
-            span.add_event("auth_failed", {"error": str(ex)})
-            log.warning("JWT validation failed", extra={"auth.error": str(ex)})
-            return jsonify({"error": f"Invalid token: {str(ex)}"}), 401
+def requires_auth(f):
+    """
+    Strict JWT validation decorator for Entra ID access tokens (see
+    authenticate). The decoded claims are attached as request.jwt_payload.
+
+    Allows bypassing auth when Flask config BYPASS_AUTH=True (used in tests).
+    """
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        span = get_current_span()
+
+        # 🔓 Bypass auth when explicitly enabled (e.g. tests)
+        try:
+            if current_app.config.get("BYPASS_AUTH", False):
+                span.add_event("auth_bypassed", {"reason": "BYPASS_AUTH"})
+                return f(*args, **kwargs)
+        except RuntimeError:
+            # No app context available; ignore and proceed with normal auth
+            pass
+
+        try:
+            request.jwt_payload = authenticate(request.headers.get("Authorization", None))
+        except AuthError as e:
+            return jsonify({"error": str(e)}), e.status
 
         return f(*args, **kwargs)
 
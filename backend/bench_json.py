@@ -0,0 +1,70 @@
+# bench_json.py
+"""
+Micro-benchmark: serialise a list of attendance-like rows the old way
+(per-field .isoformat()/float() in the repository, then Flask's stdlib
+provider) and the new way (raw DB values through FastJSONProvider).
+
+    python bench_json.py [rows] [repeats]
+"""
+
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from json_provider import FastJSONProvider
+
+
+def _raw_rows(n: int):
+    start = date(2025, 1, 1)
+    created = datetime(2025, 1, 1, 8, 30, 15)
+    return [
+        {
+            "id": i,
+            "student_id": i % 500,
+            "attendance_date": start + timedelta(days=i % 365),
+            "status": "present",
+            "amount": Decimal("1250.00"),
+            "created_at": created + timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+
+
+def _old_path(provider, rows):
+    converted = [
+        {
+            **row,
+            "attendance_date": row["attendance_date"].isoformat(),
+            "amount": float(row["amount"]),
+            "created_at": row["created_at"].isoformat(),
+        }
+        for row in rows
+    ]
+    return provider.response(converted).get_data()
+
+
+def _new_path(provider, rows):
+    return provider.response(rows).get_data()
+
+
+def main(n: int = 10_000, repeats: int = 20) -> None:
+    app = Flask(__name__)
+    rows = _raw_rows(n)
+    old = DefaultJSONProvider(app)
+    new = FastJSONProvider(app)
+
+    with app.app_context():
+        old_s = min(timeit.repeat(lambda: _old_path(old, rows), number=1, repeat=repeats))
+        new_s = min(timeit.repeat(lambda: _new_path(new, rows), number=1, repeat=repeats))
+
+    print(f"{n} rows, best of {repeats}")
+    print(f"  isoformat + stdlib provider : {old_s * 1000:8.2f} ms")
+    print(f"  raw + FastJSONProvider ({new.backend}): {new_s * 1000:8.2f} ms")
+    print(f"  speed-up: {old_s / new_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
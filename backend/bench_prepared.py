@@ -0,0 +1,74 @@
+# bench_prepared.py
+"""
+Benchmark: StudentMapper.get_by_id / insert with plain (text protocol)
+cursors versus server-side prepared statements (binary protocol), against
+the database configured by DB_* (the rows it inserts are deleted again).
+
+    python bench_prepared.py [operations] [repeats]
+"""
+
+import itertools
+import statistics
+import sys
+import time
+import uuid
+
+import db
+from mappers.students_mapper import Student, StudentMapper
+
+
+def _per_op_us(fn, n: int, repeats: int) -> float:
+    # Best of `repeats` runs of n calls, in microseconds per call
+    runs = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(n):
+            fn()
+        runs.append((time.perf_counter() - started) / n * 1e6)
+    return min(runs)
+
+
+def _bench(connection, mapper: StudentMapper, student_id: int, tag: str, n: int, repeats: int):
+    get_us = _per_op_us(lambda: mapper.get_by_id(connection, student_id), n, repeats)
+    counter = itertools.count()
+    insert_us = _per_op_us(
+        lambda: mapper.insert(
+            connection, Student(first_name="Bench", last_name="Mark", email=f"{tag}-{next(counter)}@example.invalid")
+        ),
+        n,
+        repeats,
+    )
+    return get_us, insert_us
+
+
+def main(n: int = 2000, repeats: int = 5) -> None:
+    connection = db.create_db_connection()
+    if connection is None:
+        sys.exit("No database connection (check DB_* settings)")
+
+    mapper = StudentMapper()
+    run = uuid.uuid4().hex[:8]
+    seed = Student(first_name="Bench", last_name="Mark", email=f"bench-{run}@example.invalid")
+    student_id = mapper.insert(connection, seed)
+    results = {}
+    try:
+        for enabled in (False, True):
+            db.DB_PREPARED_STATEMENTS["enabled"] = enabled
+            label = "prepared" if enabled else "plain"
+            results[label] = _bench(connection, mapper, student_id, f"bench-{run}-{label}", n, repeats)
+    finally:
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM students WHERE email LIKE %s", (f"bench-{run}%",))
+        connection.commit()
+        cursor.close()
+        connection.close()
+
+    print(f"{n} operations, best of {repeats} (connector C extension: {db.mysql.connector.HAVE_CEXT})")
+    for op, index in (("get_by_id", 0), ("insert", 1)):
+        plain, prepared = results["plain"][index], results["prepared"][index]
+        print(f"  {op:9}  plain {plain:8.1f} us   prepared {prepared:8.1f} us   ({plain / prepared:.2f}x)")
+    print(f"  mean speed-up: {statistics.mean(results['plain'][i] / results['prepared'][i] for i in (0, 1)):.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
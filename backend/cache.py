@@ -0,0 +1,235 @@
+# cache.py
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from json_provider import json_default
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+log = logging.getLogger(__name__)
+meter = metrics.get_meter("student-registration-cache", "0.1.0")
+
+cache_hits = meter.create_counter(
+    name="cache_hits_total",
+    unit="1",
+    description="Read-through cache hits",
+)
+cache_misses = meter.create_counter(
+    name="cache_misses_total",
+    unit="1",
+    description="Read-through cache misses",
+)
+
+_MISSING = object()
+
+# name -> cache, for the hit-ratio gauge
+_registered: Dict[str, Any] = {}
+
+
+class CacheBackend:
+    """
+    Interface for read-through cache storage. The in-process TTLCache is the
+    default; a shared backend (RedisCache) keeps several gunicorn workers
+    consistent because invalidations are seen by all of them.
+    """
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class TTLCache(CacheBackend):
+    """
+    Thread-safe in-process cache with a per-entry TTL and an LRU size bound.
+
+    Entries may carry their own TTL (e.g. "until the token's exp") which is
+    capped at `ttl`. `hits` / `misses` are kept for stats() and callers can
+    pass `on_hit` / `on_miss` callbacks to feed metrics counters.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_hit: Optional[Callable[[], None]] = None,
+        on_miss: Optional[Callable[[], None]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._on_hit = on_hit
+        self._on_miss = on_miss
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, expires_at)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] > self._clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                value = entry[0]
+            else:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                value = _MISSING
+
+        if value is _MISSING:
+            if self._on_miss:
+                self._on_miss()
+            return default
+
+        if self._on_hit:
+            self._on_hit()
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (value, self._clock() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
+
+
+class RedisCache(CacheBackend):
+    """
+    Shared cache in Redis. Values are stored as JSON under `namespace:key`;
+    clear() drops the whole namespace. Needs the optional `redis` package.
+    """
+
+    def __init__(self, url: str, namespace: str, ttl: float = 300.0, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("RedisCache requires the 'redis' package") from e
+            client = redis.Redis.from_url(url)
+
+        self._client = client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = self._client.get(self._key(key))
+        except Exception as e:
+            # A cache outage must not take reads down with it.
+            log.warning("Redis cache get failed", extra={"cache.error": str(e)})
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        try:
+            self._client.set(self._key(key), json.dumps(value, default=json_default), px=int(ttl * 1000))
+        except Exception as e:
+            log.warning("Redis cache set failed", extra={"cache.error": str(e)})
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self._key(key))
+        except Exception as e:
+            # Often called after a commit: the write has happened either way.
+            log.warning("Redis cache delete failed", extra={"cache.error": str(e)})
+
+    def clear(self) -> None:
+        try:
+            keys = list(self._client.scan_iter(match=f"{self.namespace}:*"))
+            if keys:
+                self._client.delete(*keys)
+        except Exception as e:
+            log.warning("Redis cache clear failed", extra={"cache.error": str(e)})
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": (self.hits / total) if total else 0.0}
+
+
+def read_through(name: str, backend: CacheBackend, key: str, load: Callable[[], Any]) -> Any:
+    """
+    Return the cached value for `key`, or call `load()` and cache its
+    result. None results are not cached. Hits/misses are counted per `name`.
+    """
+    _registered[name] = backend
+
+    value = backend.get(key, _MISSING)
+    if value is not _MISSING:
+        cache_hits.add(1, {"cache": name})
+        return value
+
+    cache_misses.add(1, {"cache": name})
+    value = load()
+    if value is not None:
+        backend.set(key, value)
+    return value
+
+
+def _observe_hit_ratio(options: CallbackOptions) -> Iterable[Observation]:
+    for name, backend in list(_registered.items()):
+        ratio = backend.stats().get("hit_ratio")
+        if ratio is not None:
+            yield Observation(ratio, {"cache": name})
+
+
+meter.create_observable_gauge(
+    name="cache_hit_ratio",
+    callbacks=[_observe_hit_ratio],
+    unit="1",
+    description="Hit ratio of each read-through cache since process start",
+)
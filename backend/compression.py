@@ -0,0 +1,167 @@
+# compression.py
+import logging
+import os
+import time
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Response, request
+from opentelemetry import metrics
+from streaming import NDJSON_MIMETYPE
+
+log = logging.getLogger(__name__)
+meter = metrics.get_meter("student-registration-compression", "0.1.0")
+
+# Buffered bodies smaller than this go out uncompressed (bytes)
+COMPRESS_MIN_SIZE = int(os.getenv("API_COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("API_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_MIMETYPES = {"application/json", NDJSON_MIMETYPE, "text/plain", "text/html", "text/csv"}
+
+compression_ratio = meter.create_histogram(
+    name="http_response_compression_ratio",
+    unit="1",
+    description="Uncompressed / compressed size of compressed response bodies",
+)
+compression_cpu_time = meter.create_histogram(
+    name="http_response_compression_cpu_ms",
+    unit="ms",
+    description="CPU time spent compressing one response body",
+)
+
+
+def _load_brotli():
+    try:
+        import brotli
+    except ImportError:
+        log.info("brotli not installed; compressing with gzip only")
+        return None
+    return brotli
+
+
+_brotli = _load_brotli()
+
+# Server preference order when the client rates encodings equally
+ENCODINGS = ("br", "gzip") if _brotli is not None else ("gzip",)
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._obj = _brotli.Compressor(quality=BROTLI_QUALITY)
+            self._flush = self._obj.flush
+        else:
+            # wbits=31: zlib stream with a gzip header/trailer
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._flush = lambda: self._obj.flush(zlib.Z_SYNC_FLUSH)
+        self.encoding = encoding
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        out = self._obj.process(data) if self.encoding == "br" else self._obj.compress(data)
+        return out + self._flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._obj.finish() if self.encoding == "br" else self._obj.flush(zlib.Z_FINISH)
+
+
+def _record(encoding: str, raw_size: int, compressed_size: int, cpu_seconds: float) -> None:
+    attributes = {"encoding": encoding}
+    if compressed_size:
+        compression_ratio.record(raw_size / compressed_size, attributes)
+    compression_cpu_time.record(cpu_seconds * 1000, attributes)
+
+
+def compressible(response: Response) -> bool:
+    return (
+        200 <= response.status_code < 300
+        and response.status_code != 204
+        and not getattr(response, "direct_passthrough", False)  # absent on Quart responses
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and "no-transform" not in response.headers.get("Cache-Control", "")
+    )
+
+
+def negotiate(accept_encodings) -> Optional[str]:
+    encoding = accept_encodings.best_match(ENCODINGS)
+    return encoding if encoding in ENCODINGS else None
+
+
+def _compress_stream(source: Iterable, encoding: str) -> Iterator[bytes]:
+    # One flush per chunk so every streamed batch reaches the client at once
+    compressor = _Compressor(encoding)
+    raw_size = compressed_size = 0
+    cpu = 0.0
+    try:
+        for chunk in source:
+            data = chunk.encode() if isinstance(chunk, str) else chunk
+            if not data:
+                continue
+            started = time.thread_time()
+            out = compressor.compress(data, flush=True)
+            cpu += time.thread_time() - started
+            raw_size += len(data)
+            compressed_size += len(out)
+            yield out
+
+        started = time.thread_time()
+        out = compressor.finish()
+        cpu += time.thread_time() - started
+        compressed_size += len(out)
+        yield out
+        _record(encoding, raw_size, compressed_size, cpu)
+    finally:
+        if hasattr(source, "close"):
+            source.close()
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    started = time.thread_time()
+    compressor = _Compressor(encoding)
+    compressed = compressor.compress(data) + compressor.finish()
+    _record(encoding, len(data), len(compressed), time.thread_time() - started)
+    return compressed
+
+
+def mark_encoded(response: Response, encoding: str) -> None:
+    response.headers["Content-Encoding"] = encoding
+    # Encoded bytes differ per coding. conditional's ETags are weak already;
+    # weaken any other, which still matches If-None-Match
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def compress_response(response: Response) -> Response:
+    """
+    gzip / brotli-encode JSON and text responses per Accept-Encoding.
+    Buffered bodies under COMPRESS_MIN_SIZE are left alone; streamed bodies
+    (size unknown up front) are always compressed, chunk by chunk.
+    """
+    if not compressible(response):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        response.set_data(compress_body(data, encoding))
+
+    mark_encoded(response, encoding)
+    return response
+
+
+def init_app(app) -> None:
+    """
+    Register response compression on a Flask app.
+    """
+    app.after_request(compress_response)
@@ -0,0 +1,92 @@
+# conditional.py
+import hashlib
+import logging
+from datetime import datetime
+from functools import wraps
+from typing import Mapping, Optional, Sequence, Tuple
+
+from flask import Response, make_response, request
+from includes import include_tables
+from opentelemetry.trace import get_current_span
+from repositories.table_versions_repository import get_table_versions
+from werkzeug.http import is_resource_modified
+
+log = logging.getLogger(__name__)
+
+
+def compute_validators(
+    versions: Mapping[str, Tuple[int, datetime]], tables: Sequence[str], path: str, query_string: str, accept: str
+) -> Optional[Tuple[str, datetime]]:
+    """
+    (etag, last_modified) for a GET of `path` + `query_string` given the
+    `versions` of the tables it reads, or None when any is missing.
+    """
+    if len(versions) != len(tables):
+        return None
+
+    # Same data version + same URL + same representation => same bytes
+    parts = [path, query_string, accept]
+    parts += [f"{table}:{versions[table][0]}" for table in sorted(tables)]
+    etag = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    last_modified = max(updated_at for _, updated_at in versions.values())
+    return etag, last_modified
+
+
+def set_validators(response, etag: str, last_modified: datetime) -> None:
+    """
+    Put the validators on a 200 or its 304. The ETag is weak: it names the
+    data version, not the bytes, which differ when the 200 is compressed
+    (see compression.mark_encoded), so both carry the same value.
+    """
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    # Authenticated data: browsers may store it but must revalidate
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def _validators(tables: Sequence[str]) -> Optional[Tuple[str, datetime]]:
+    """
+    Validators for the current request, or None when table versions are
+    unavailable (validators are then simply omitted).
+    """
+    try:
+        versions = get_table_versions(tables)
+    except Exception as e:
+        log.warning("Table versions unavailable", extra={"db.error": str(e)})
+        return None
+    return compute_validators(
+        versions, tables, request.path, request.query_string.decode("latin-1"), request.headers.get("Accept", "")
+    )
+
+
+def conditional(*tables: str):
+    """
+    Add a weak ETag and Last-Modified to a GET handler's 200 responses and
+    answer If-None-Match / If-Modified-Since with 304 before the handler runs.
+    Validators come from the per-table versions of `tables`, so revalidation
+    costs one primary-key read instead of the full query + serialisation.
+    """
+
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            # ?include=student also depends on the students table
+            validators = _validators(tuple(dict.fromkeys([*tables, *include_tables(request.args)])))
+            if validators is None:
+                return f(*args, **kwargs)
+
+            etag, last_modified = validators
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                get_current_span().add_event("http_not_modified", {"etag": etag})
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            set_validators(response, etag, last_modified)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -50,3 +50,54 @@ DB_CONFIG = {
     "user": get_env_var("DB_USER"),
     "password": get_env_var("DB_PASSWORD"),
 }
+
+# Connection pool settings (optional; sensible defaults for a single gunicorn worker)
+DB_POOL_CONFIG = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", "5")),
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+    "ping_after": float(os.getenv("DB_POOL_PING_AFTER", "30")),
+    "reset_on_return": os.getenv("DB_POOL_RESET_ON_RETURN", "true").lower() == "true",
+}
+
+# Mapper statements are prepared server-side once per pooled connection
+# (MySQL caps the server-wide total at max_prepared_stmt_count)
+DB_PREPARED_STATEMENTS = {
+    "enabled": os.getenv("DB_PREPARED_STATEMENTS", "true").lower() == "true",
+    # Statements kept prepared per connection, least recently used evicted
+    "cache_size": int(os.getenv("DB_PREPARED_CACHE_SIZE", "64")),
+}
+
+# Async serving mode (asgi.py): one aiomysql pool per worker event loop.
+# A single worker runs many requests at once, so this pool is larger.
+DB_ASYNC_POOL_CONFIG = {
+    "minsize": int(os.getenv("DB_ASYNC_POOL_MIN_SIZE", "1")),
+    "maxsize": int(os.getenv("DB_ASYNC_POOL_SIZE", "20")),
+    "timeout": float(os.getenv("DB_ASYNC_POOL_TIMEOUT", "10")),
+    "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+}
+
+
+def _replica_configs(hosts: str) -> list:
+    # "replica-1,replica-2:3307" -> one DB_CONFIG per replica (same credentials)
+    configs = []
+    for entry in filter(None, (h.strip() for h in hosts.split(","))):
+        host, _, port = entry.partition(":")
+        configs.append({**DB_CONFIG, "host": host, "port": int(port) if port else DB_CONFIG["port"]})
+    return configs
+
+
+# Optional read replicas (comma-separated host[:port]); reads stay on the
+# primary when unset
+DB_REPLICA_CONFIGS = _replica_configs(os.getenv("DB_REPLICA_HOSTS", ""))
+
+DB_REPLICA_ROUTING = {
+    # Reads go to the primary for this long after the caller's last write
+    "sticky_seconds": float(os.getenv("DB_REPLICA_STICKY_SECONDS", "10")),
+    # Replicas further behind than this are skipped
+    "max_lag": float(os.getenv("DB_REPLICA_MAX_LAG", "5")),
+    "lag_check_interval": float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "5")),
+    # Optional shared store so stickiness holds across gunicorn workers
+    "sticky_cache_url": os.getenv("DB_REPLICA_STICKY_CACHE_URL", "").strip(),
+}
@@ -1,35 +1,83 @@
 # db.py
+import itertools
 import logging
+import math
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
 from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import mysql.connector
-from config import DB_CONFIG
-from opentelemetry import trace
+from cache import CacheBackend, RedisCache, TTLCache
+from config import DB_CONFIG, DB_POOL_CONFIG, DB_PREPARED_STATEMENTS, DB_REPLICA_CONFIGS, DB_REPLICA_ROUTING
+from flask import g, has_app_context, has_request_context, request
+from mysql.connector.abstracts import MySQLConnectionAbstract
+from opentelemetry import metrics, trace
+from opentelemetry.metrics import CallbackOptions, Observation
 from opentelemetry.trace import Status, StatusCode
 
 log = logging.getLogger(__name__)
 tracer = trace.get_tracer(__name__)
+meter = metrics.get_meter("student-registration-db", "0.1.0")
 
+pool_wait_time = meter.create_histogram(
+    name="db_pool_wait_time_ms",
+    unit="ms",
+    description="Time spent waiting to check a connection out of the pool",
+)
+pool_checkouts = meter.create_counter(
+    name="db_pool_checkouts_total",
+    unit="1",
+    description="Connections checked out of the pool",
+)
+pool_exhausted = meter.create_counter(
+    name="db_pool_exhausted_total",
+    unit="1",
+    description="Checkouts that timed out because the pool was exhausted",
+)
+read_routing = meter.create_counter(
+    name="db_read_routing_total",
+    unit="1",
+    description="Read-only checkouts by target (replica / primary) and reason",
+)
+statements_prepared = meter.create_counter(
+    name="db_statements_prepared_total",
+    unit="1",
+    description="Server-side statements prepared (one per connection and SQL text while cached)",
+)
 
-def create_db_connection():
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no pooled connection becomes available within the timeout."""
+
+    pass
+
+
+def create_db_connection(config: Optional[Dict[str, Any]] = None):
     """
-    Low-level DB connection helper with tracing & logging.
+    Low-level DB connection helper with tracing & logging. Connects to the
+    primary unless a replica's `config` is given.
     """
+    config = config or DB_CONFIG
     connection = None
     with tracer.start_as_current_span("create_db_connection") as span:
         try:
-            connection = mysql.connector.connect(**DB_CONFIG)
+            connection = mysql.connector.connect(**config)
             if connection.is_connected():
                 span.set_status(Status(StatusCode.OK))
                 span.set_attribute("db.system", "mysql")
-                span.set_attribute("db.user", DB_CONFIG["user"])
-                span.set_attribute("db.name", DB_CONFIG["database"])
-                span.set_attribute("net.peer.name", DB_CONFIG["host"])
+                span.set_attribute("db.user", config["user"])
+                span.set_attribute("db.name", config["database"])
+                span.set_attribute("net.peer.name", config["host"])
                 log.info(
                     "Connected to DB",
                     extra={
-                        "db.host": DB_CONFIG["host"],
-                        "db.name": DB_CONFIG["database"],
+                        "db.host": config["host"],
+                        "db.name": config["database"],
                     },
                 )
             else:
@@ -42,14 +90,663 @@ def create_db_connection():
     return connection
 
 
+class ConnectionPool:
+    """
+    Process-wide pool of MySQL connections.
+
+    Keeps up to `pool_size` idle connections and allows `max_overflow` extra
+    connections under load (closed again when returned). Connections older
+    than `max_lifetime` seconds are recycled, and connections idle for longer
+    than `ping_after` seconds are pinged before being handed out.
+    """
+
+    def __init__(
+        self,
+        connect=create_db_connection,
+        pool_size: int = 5,
+        max_overflow: int = 5,
+        timeout: float = 10.0,
+        max_lifetime: float = 1800.0,
+        ping_after: float = 30.0,
+        reset_on_return: bool = True,
+    ):
+        self._connect = connect
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+        self.reset_on_return = reset_on_return
+
+        self._cond = threading.Condition()
+        self._idle: deque = deque()  # (connection, returned_at)
+        self._born: dict = {}  # id(connection) -> created_at
+        self._open = 0
+
+    # ---------- checkout ----------
+    def acquire(self) -> Optional[Any]:
+        started = time.monotonic()
+        deadline = started + self.timeout
+        entry = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._open < self.pool_size + self.max_overflow:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    pool_exhausted.add(1)
+                    log.warning(
+                        "DB pool exhausted",
+                        extra={"db.pool.size": self.pool_size, "db.pool.overflow": self.max_overflow},
+                    )
+                    raise PoolExhaustedError("No DB connection available from pool")
+                self._cond.wait(remaining)
+
+        connection = self._checkout(entry)
+        pool_wait_time.record((time.monotonic() - started) * 1000.0)
+        if connection is not None:
+            pool_checkouts.add(1)
+        return connection
+
+    def _checkout(self, entry) -> Optional[Any]:
+        if entry is not None:
+            connection, returned_at = entry
+            if self._is_usable(connection, returned_at):
+                return connection
+            self._discard(connection, keep_slot=True)
+
+        connection = self._connect()
+        if connection is None:
+            self._free_slot()
+            return None
+
+        self._born[id(connection)] = time.monotonic()
+        return connection
+
+    def _is_usable(self, connection, returned_at: float) -> bool:
+        now = time.monotonic()
+        born = self._born.get(id(connection), now)
+        if self.max_lifetime and now - born > self.max_lifetime:
+            return False
+        if self.ping_after is not None and now - returned_at > self.ping_after:
+            try:
+                connection.ping(reconnect=False)
+            except Exception as e:
+                log.info("Discarding stale pooled DB connection", extra={"db.error": str(e)})
+                return False
+        return True
+
+    # ---------- return ----------
+    def release(self, connection) -> None:
+        if connection is None:
+            return
+
+        healthy = False
+        try:
+            healthy = connection.is_connected()
+            if healthy and self.reset_on_return:
+                connection.rollback()
+        except Exception as e:
+            log.info("Pooled DB connection failed reset", extra={"db.error": str(e)})
+            healthy = False
+
+        born = self._born.get(id(connection), time.monotonic())
+        expired = bool(self.max_lifetime) and time.monotonic() - born > self.max_lifetime
+
+        with self._cond:
+            if healthy and not expired and len(self._idle) < self.pool_size:
+                self._idle.append((connection, time.monotonic()))
+                self._cond.notify()
+                return
+
+        self._discard(connection)
+
+    def _discard(self, connection, keep_slot: bool = False) -> None:
+        self._born.pop(id(connection), None)
+        try:
+            if connection.is_connected():
+                connection.close()
+        except Exception:
+            pass
+        if not keep_slot:
+            self._free_slot()
+
+    def _free_slot(self) -> None:
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def close_all(self) -> None:
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Return the process-wide pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**DB_POOL_CONFIG)
+    return _pool
+
+
+def _reset_pool_after_fork() -> None:
+    # Sockets must never be shared between a parent and forked workers.
+    global _pool, _replicas
+    _pool = None
+    _replicas = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+# ---------- prepared statements ----------
+class PreparedStatement:
+    """
+    Cursor bound to one server-side prepared statement. MySQL parses the
+    SQL once per connection; each execute() then sends only the parameters
+    over the binary protocol. close() keeps the statement prepared for the
+    next caller of prepared_cursor() on the same connection.
+    """
+
+    def __init__(self, connection, cursor, sql: str):
+        self._connection = connection
+        self._cursor = cursor
+        self.sql = sql
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, operation: str, params: Sequence[Any] = ()) -> None:
+        if operation != self.sql:
+            raise ValueError("PreparedStatement can only execute the SQL it was prepared for")
+        # The connector re-prepares unless handed the very same str object
+        self._cursor.execute(self.sql, params)
+
+    def close(self) -> None:
+        # Rows left unread would block the connection's next statement
+        try:
+            if self._connection.unread_result:
+                self._cursor.fetchall()
+        except Exception as e:
+            log.info("Failed to drain prepared statement", extra={"db.error": str(e)})
+
+
+# raw connection -> OrderedDict of (sql, dictionary) -> (sql, prepared cursor);
+# entries go when the connection is closed and collected
+_statements: "weakref.WeakKeyDictionary[Any, OrderedDict]" = weakref.WeakKeyDictionary()
+_statements_lock = threading.Lock()
+
+
+def _supports_prepared(connection) -> bool:
+    return isinstance(connection, MySQLConnectionAbstract)
+
+
+def prepared_cursor(connection, sql: str, dictionary: bool = False):
+    """
+    Cursor for one of a mapper's constant statements, prepared on first use
+    and cached per connection (DB_PREPARED_CACHE_SIZE statements, LRU).
+    Execute it with that same `sql` only. Falls back to a plain cursor when
+    DB_PREPARED_STATEMENTS is off or `connection` is not a MySQL one.
+    """
+    raw = connection.raw if isinstance(connection, ScopedConnection) else connection
+    if not DB_PREPARED_STATEMENTS["enabled"] or not _supports_prepared(raw):
+        return connection.cursor(dictionary=True) if dictionary else connection.cursor()
+
+    with _statements_lock:
+        cache = _statements.get(raw)
+        if cache is None:
+            cache = _statements[raw] = OrderedDict()
+
+    # A connection is only ever used by one thread at a time
+    key = (sql, dictionary)
+    entry = cache.get(key)
+    if entry is None:
+        entry = cache[key] = (sql, raw.cursor(prepared=True, dictionary=dictionary))
+        statements_prepared.add(1)
+        if len(cache) > DB_PREPARED_STATEMENTS["cache_size"]:
+            _, (_, evicted) = cache.popitem(last=False)
+            try:
+                evicted.close()  # deallocates it on the server
+            except Exception as e:
+                log.info("Failed to deallocate prepared statement", extra={"db.error": str(e)})
+    else:
+        cache.move_to_end(key)
+    return PreparedStatement(raw, entry[1], entry[0])
+
+
+# ---------- read replicas ----------
+class Replica:
+    """
+    One read replica: its own pool plus the last measured replication lag
+    (None when unknown, unreachable or replication is stopped).
+    """
+
+    def __init__(self, name: str, pool: ConnectionPool, lag_check_interval: float = 5.0):
+        self.name = name
+        self.pool = pool
+        self.lag_check_interval = lag_check_interval
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def check_due(self) -> bool:
+        return time.monotonic() - self.checked_at >= self.lag_check_interval
+
+    def check_lag(self, connection) -> None:
+        """
+        Refresh `lag` from SHOW REPLICA STATUS (needs REPLICATION CLIENT).
+        A server with no replication status (e.g. a managed reader endpoint)
+        counts as caught up; stopped replication as unknown.
+        """
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is checking
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SHOW REPLICA STATUS")
+            status = cursor.fetchone()
+            cursor.close()
+            self.lag = 0.0 if status is None else _as_seconds(status.get("Seconds_Behind_Source"))
+        except Exception as e:
+            log.warning("Replica lag check failed", extra={"db.replica": self.name, "db.error": str(e)})
+            self.lag = None
+        finally:
+            self.checked_at = time.monotonic()
+            self._lock.release()
+
+    def caught_up(self, max_lag: float) -> bool:
+        return self.lag is not None and self.lag <= max_lag
+
+
+def _as_seconds(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+_replicas: Optional[List[Replica]] = None
+_replica_turn = itertools.count()
+
+
+def get_replicas() -> List[Replica]:
+    """
+    Return the process-wide replica pools (empty when DB_REPLICA_HOSTS is
+    unset), creating them on first use.
+    """
+    global _replicas
+    if _replicas is None:
+        with _pool_lock:
+            if _replicas is None:
+                _replicas = [
+                    Replica(
+                        f"{config['host']}:{config['port']}",
+                        ConnectionPool(connect=partial(create_db_connection, config), **DB_POOL_CONFIG),
+                        lag_check_interval=DB_REPLICA_ROUTING["lag_check_interval"],
+                    )
+                    for config in DB_REPLICA_CONFIGS
+                ]
+    return _replicas
+
+
+def _acquire_replica(replicas: List[Replica]) -> Tuple[Optional[Replica], Optional[Any]]:
+    # Round-robin over the replicas that are (or may now be) caught up
+    start = next(_replica_turn) % len(replicas)
+    for replica in replicas[start:] + replicas[:start]:
+        if not replica.check_due() and not replica.caught_up(DB_REPLICA_ROUTING["max_lag"]):
+            continue
+        try:
+            connection = replica.pool.acquire()
+        except PoolExhaustedError:
+            continue
+        if connection is None:
+            replica.lag, replica.checked_at = None, time.monotonic()
+            continue
+
+        if replica.check_due():
+            replica.check_lag(connection)
+        if replica.caught_up(DB_REPLICA_ROUTING["max_lag"]):
+            return replica, connection
+        replica.pool.release(connection)
+    return None, None
+
+
+def _observe_replica_lag(options: CallbackOptions) -> Iterable[Observation]:
+    for replica in _replicas or ():
+        if replica.lag is not None:
+            yield Observation(replica.lag, {"db.replica": replica.name})
+
+
+meter.create_observable_gauge(
+    name="db_replica_lag_seconds",
+    callbacks=[_observe_replica_lag],
+    unit="s",
+    description="Replication lag of each read replica at its last check",
+)
+
+
+# ---------- read-your-writes ----------
+# Client-held marker: a response to a write carries the time (Unix seconds)
+# until which the caller's reads must use the primary, as a header and a
+# cookie. Sent back as either, it pins the caller's reads whichever worker
+# or load balancer node serves them.
+STICKY_HEADER = "X-Read-Primary-Until"
+STICKY_COOKIE = "read_primary_until"
+
+
+def _default_sticky_store() -> CacheBackend:
+    ttl = DB_REPLICA_ROUTING["sticky_seconds"]
+    if DB_REPLICA_ROUTING["sticky_cache_url"]:
+        return RedisCache(DB_REPLICA_ROUTING["sticky_cache_url"], namespace="db-sticky", ttl=ttl)
+    return TTLCache(maxsize=10000, ttl=ttl)
+
+
+_sticky: CacheBackend = _default_sticky_store()
+
+
+def _caller_key() -> Optional[str]:
+    # Token subject; anonymous callers are only pinned by the marker
+    claims = getattr(request, "jwt_payload", None) or {}
+    subject = claims.get("oid") or claims.get("sub")
+    return f"sub:{subject}" if subject else None
+
+
+def _marker_pins_primary() -> bool:
+    raw = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+    try:
+        until = float(raw)
+    except (TypeError, ValueError):
+        return False
+    # Honoured for at most the sticky window from now, so a forged marker
+    # cannot pin reads to the primary for longer than a real write would
+    return 0 < until - time.time() <= DB_REPLICA_ROUTING["sticky_seconds"]
+
+
+def _note_write() -> None:
+    # Pin the rest of this request, and the caller's next requests, to the primary
+    if not has_app_context():
+        return
+    g.db_read_primary = True
+    if has_request_context() and DB_REPLICA_CONFIGS:
+        g.db_read_primary_until = time.time() + DB_REPLICA_ROUTING["sticky_seconds"]
+        key = _caller_key()
+        if key is not None:
+            _sticky.set(key, True)
+
+
+def stamp_read_primary(response):
+    """
+    after_request: hand a writer the marker that keeps its next reads on
+    the primary (see STICKY_HEADER).
+    """
+    until = g.get("db_read_primary_until")
+    if until is not None:
+        value = f"{until:.3f}"
+        response.headers[STICKY_HEADER] = value
+        response.set_cookie(
+            STICKY_COOKIE,
+            value,
+            max_age=math.ceil(DB_REPLICA_ROUTING["sticky_seconds"]),
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def reads_from_primary() -> bool:
+    """
+    True when get_read_connection() must use the primary: after a write in
+    this request, while the caller presents an unexpired write marker, within
+    DB_REPLICA_STICKY_SECONDS of the token subject's last write (as recorded
+    in the sticky store), or inside read_from_primary().
+    """
+    if not has_app_context():
+        return getattr(_scope, "read_primary", False)
+    if "db_read_primary" not in g:
+        if not has_request_context():
+            g.db_read_primary = False
+        elif _marker_pins_primary():
+            g.db_read_primary = True
+        else:
+            key = _caller_key()
+            g.db_read_primary = key is not None and _sticky.get(key) is not None
+    return g.db_read_primary
+
+
+@contextmanager
+def read_from_primary(enabled: bool = True):
+    """
+    Pin this thread's reads outside a Flask context, e.g. fan-out tasks
+    carrying their request's reads_from_primary().
+    """
+    previous = getattr(_scope, "read_primary", False)
+    _scope.read_primary = enabled
+    try:
+        yield
+    finally:
+        _scope.read_primary = previous
+
+
+class ScopedConnection:
+    """
+    Pooled connection shared by every repository call in one request (or one
+    transaction() block). Commits are deferred while a transaction is open so
+    the enclosed statements succeed or fail together.
+    """
+
+    def __init__(self, connection, pool: Optional[ConnectionPool] = None):
+        self.raw = connection
+        self.pool = pool  # None: the primary pool
+        self.transaction_depth = 0
+        self.pending_callbacks = []
+        self.commit_hooks = {}  # key -> hook(connection), see before_commit()
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def commit(self):
+        if self.transaction_depth == 0:
+            hooks, self.commit_hooks = self.commit_hooks, {}
+            for key in sorted(hooks):
+                hooks[key](self)
+            self.raw.commit()
+            _note_write()
+            callbacks, self.pending_callbacks = self.pending_callbacks, []
+            for callback in callbacks:
+                callback()
+
+    def rollback(self):
+        self.pending_callbacks = []
+        self.commit_hooks = {}
+        self.raw.rollback()
+
+    def close(self):
+        # Returned to the pool by whoever bound it, never closed by callers.
+        pass
+
+
+_scope = threading.local()
+
+
+def _bound_connection() -> Optional[ScopedConnection]:
+    if has_app_context():
+        return g.get("db_connection")
+    return getattr(_scope, "connection", None)
+
+
 @contextmanager
 def get_connection():
     """
-    Context manager for DB connections so callers don't forget to close.
+    Context manager for DB connections so callers don't forget to release.
+
+    Inside a Flask request the first call checks a connection out of the pool
+    and binds it to `g`; later calls in the same request reuse it and it is
+    returned in teardown (see init_app). Elsewhere each call checks out and
+    returns its own connection.
     """
-    conn = create_db_connection()
+    bound = _bound_connection()
+    if bound is not None:
+        yield bound
+        return
+
+    pool = get_pool()
+    conn = pool.acquire()
+
+    if has_app_context() and conn is not None:
+        g.db_connection = ScopedConnection(conn)
+        yield g.db_connection
+        return
+
     try:
         yield conn
     finally:
-        if conn and conn.is_connected():
-            conn.close()
+        pool.release(conn)
+
+
+@contextmanager
+def get_read_connection():
+    """
+    Like get_connection(), for read-only repository calls: served by a
+    caught-up replica when DB_REPLICA_HOSTS is set. Falls back to the
+    primary inside a transaction() block, while reads_from_primary(), or
+    when no replica is usable. Within a request the replica connection is
+    bound to `g` and reused.
+    """
+    replicas = get_replicas()
+    bound = _bound_connection()
+    reason = None
+    if not replicas:
+        reason = "no_replicas"
+    elif bound is not None and bound.transaction_depth > 0:
+        reason = "transaction"
+    elif reads_from_primary():
+        reason = "sticky"
+    elif has_app_context() and g.get("db_read_connection") is not None:
+        yield g.db_read_connection
+        return
+
+    replica, conn = (None, None) if reason else _acquire_replica(replicas)
+    if conn is None:
+        if replicas:
+            read_routing.add(1, {"db.target": "primary", "db.reason": reason or "replicas_unavailable"})
+        with get_connection() as primary:
+            yield primary
+        return
+
+    read_routing.add(1, {"db.target": "replica", "db.replica": replica.name})
+    if has_app_context():
+        g.db_read_connection = ScopedConnection(conn, pool=replica.pool)
+        yield g.db_read_connection
+        return
+
+    try:
+        yield conn
+    finally:
+        replica.pool.release(conn)
+
+
+@contextmanager
+def transaction():
+    """
+    Unit of work: repository calls inside the block share one connection and
+    are committed together on success, or rolled back on error.
+    """
+    owned = None
+    if _bound_connection() is None and not has_app_context():
+        raw = get_pool().acquire()
+        if raw is None:
+            raise RuntimeError("DB connection failed")
+        owned = _scope.connection = ScopedConnection(raw)
+
+    try:
+        with get_connection() as conn:
+            if conn is None or not conn.is_connected():
+                raise RuntimeError("DB connection failed")
+
+            conn.transaction_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                conn.transaction_depth -= 1
+                if conn.transaction_depth == 0:
+                    conn.rollback()
+                raise
+            conn.transaction_depth -= 1
+            if conn.transaction_depth == 0:
+                conn.commit()
+    finally:
+        if owned is not None:
+            _scope.connection = None
+            get_pool().release(owned.raw)
+
+
+def in_transaction() -> bool:
+    """True inside a transaction() block, whose writes are not committed yet."""
+    conn = _bound_connection()
+    return conn is not None and conn.transaction_depth > 0
+
+
+def after_commit(callback) -> None:
+    """
+    Run `callback` once the current unit of work is committed: immediately
+    when no transaction() block is open, otherwise after the outermost
+    commit. Dropped on rollback. Used for cache invalidation.
+    """
+    conn = _bound_connection()
+    if conn is not None and conn.transaction_depth > 0:
+        conn.pending_callbacks.append(callback)
+    else:
+        callback()
+
+
+def before_commit(connection, key: str, hook: Callable[[Any], None]) -> None:
+    """
+    Run `hook(connection)` as the last statement(s) of the unit of work open
+    on `connection`, right before it commits: once however often `key` is
+    registered, with hooks in key order so concurrent units of work take
+    their locks in the same order. Dropped on rollback. On a connection that
+    is neither request- nor transaction()-bound the hook runs immediately.
+    """
+    if isinstance(connection, ScopedConnection):
+        connection.commit_hooks.setdefault(key, hook)
+    else:
+        hook(connection)
+
+
+def release_request_connection(exc: Optional[BaseException] = None) -> None:
+    """
+    Return the request-bound connections (if any) to their pools.
+    """
+    for key in ("db_connection", "db_read_connection"):
+        conn = g.pop(key, None)
+        if conn is None:
+            continue
+
+        if exc is not None:
+            try:
+                conn.raw.rollback()
+            except Exception as e:
+                log.info("Rollback on teardown failed", extra={"db.error": str(e)})
+
+        (conn.pool or get_pool()).release(conn.raw)
+
+
+def init_app(app) -> None:
+    """
+    Register request-scoped connection handling on a Flask app.
+    """
+    app.after_request(stamp_read_primary)
+    app.teardown_appcontext(release_request_connection)
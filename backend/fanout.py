@@ -0,0 +1,59 @@
+# fanout.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from db import read_from_primary, reads_from_primary
+from opentelemetry import context as otel_context
+
+# Threads used to run independent repository reads of one request in parallel
+FANOUT_MAX_WORKERS = int(os.getenv("API_FANOUT_MAX_WORKERS", "4"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Worker threads do not survive fork: each gunicorn worker builds its own.
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+                _executor_pid = pid
+    return _executor
+
+
+def _timed(ctx, read_primary: bool, task: Callable[[], Any]) -> Tuple[Any, float]:
+    # Only the trace context and the request's replica routing cross threads;
+    # the Flask context (and with it the request-bound DB connection)
+    # deliberately does not, so each task checks out its own pooled connection.
+    token = otel_context.attach(ctx)
+    started = time.perf_counter()
+    try:
+        with read_from_primary(read_primary):
+            return task(), (time.perf_counter() - started) * 1000.0
+    finally:
+        otel_context.detach(token)
+
+
+def run_concurrently(tasks: Dict[str, Callable[[], Any]]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run independent zero-argument callables in the shared thread pool.
+    Returns ({name: result}, {name: elapsed_ms}); the first task exception
+    is re-raised.
+    """
+    ctx = otel_context.get_current()
+    read_primary = reads_from_primary()
+    executor = _get_executor()
+    futures = {name: executor.submit(_timed, ctx, read_primary, task) for name, task in tasks.items()}
+
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    for name, future in futures.items():
+        results[name], timings[name] = future.result()
+    return results, timings
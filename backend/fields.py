@@ -0,0 +1,63 @@
+# fields.py
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from pagination import OrderSpec
+
+
+class InvalidFields(ValueError):
+    """Raised when `fields` names a column the resource does not expose."""
+
+    pass
+
+
+def parse_fields(args: Mapping[str, str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Read `fields=id,first_name` from request args. None (no `fields`
+    parameter) means every field.
+    """
+    raw = args.get("fields")
+    if raw is None:
+        return None
+
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    if not names:
+        raise InvalidFields("fields must name at least one field")
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise InvalidFields(f"Invalid fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})")
+    return list(dict.fromkeys(names))
+
+
+def select_columns(
+    columns: Sequence[str],
+    fields: Optional[Sequence[str]],
+    order: OrderSpec = (),
+) -> Tuple[str, ...]:
+    """
+    Columns to SELECT, in table order: the requested `fields` plus the
+    keyset `order` columns paginate() needs for the next cursor. All
+    `columns` when fields is None.
+    """
+    if fields is None:
+        return tuple(columns)
+    wanted = {*fields, *(column for column, _ in order)}
+    return tuple(column for column in columns if column in wanted)
+
+
+def select_sql(table: str, columns: Sequence[str]) -> str:
+    """
+    Bare `SELECT ... FROM table` for keyset_query(); `columns` must come
+    from a repository whitelist, never from the request.
+    """
+    return f"SELECT {', '.join(columns)}\nFROM {table}"  # nosec B608 - whitelisted identifiers only
+
+
+def project(item: Dict[str, Any], fields: Optional[Sequence[str]], keep: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Drop the keys that were selected only for paging / embedding. `keep`
+    names extra keys to retain (embedded includes).
+    """
+    if fields is None:
+        return item
+    wanted = {*fields, *keep}
+    return {key: value for key, value in item.items() if key in wanted}
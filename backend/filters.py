@@ -0,0 +1,86 @@
+# filters.py
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+
+class InvalidFilter(ValueError):
+    """Raised when a list filter query param has an unusable value."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class Filter:
+    """
+    One query-param filter: `sql` is a parameterised condition with a single
+    %s placeholder, `parse` turns the raw string into the bound value.
+    """
+
+    sql: str
+    parse: Callable[[str], Any] = str
+
+
+def positive_int(raw: str) -> int:
+    value = int(raw)
+    if value < 1:
+        raise ValueError("must be a positive integer")
+    return value
+
+
+def iso_date(raw: str) -> str:
+    return date.fromisoformat(raw).isoformat()
+
+
+def year_month(raw: str) -> str:
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", raw):
+        raise ValueError("must be YYYY-MM")
+    return raw
+
+
+def boolean(raw: str) -> int:
+    lowered = raw.lower()
+    if lowered in ("1", "true"):
+        return 1
+    if lowered in ("0", "false"):
+        return 0
+    raise ValueError("must be true or false")
+
+
+def choice(*allowed: str) -> Callable[[str], str]:
+    def parse(raw: str) -> str:
+        if raw not in allowed:
+            raise ValueError(f"must be one of {', '.join(allowed)}")
+        return raw
+
+    return parse
+
+
+def parse_filters(args: Mapping[str, str], spec: Mapping[str, Filter]) -> Dict[str, Any]:
+    """
+    Pick the filters in `spec` out of request args and convert their values.
+    Unknown params are ignored (limit, cursor, ...); empty values are skipped.
+    """
+    filters = {}
+    for name, flt in spec.items():
+        raw = args.get(name)
+        if raw is None or raw == "":
+            continue
+        try:
+            filters[name] = flt.parse(raw)
+        except ValueError as e:
+            raise InvalidFilter(f"Invalid {name}: {e}") from e
+    return filters
+
+
+def filter_where(filters: Mapping[str, Any], spec: Mapping[str, Filter]) -> Tuple[List[str], List[Any]]:
+    """
+    Turn parsed filters into WHERE conditions + params for keyset_query().
+    """
+    where = []
+    params = []
+    for name, value in filters.items():
+        where.append(spec[name].sql)
+        params.append(value)
+    return where, params
@@ -0,0 +1,84 @@
+# json_provider.py
+import dataclasses
+import json
+import logging
+import os
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+from flask import Response
+from flask.json.provider import JSONProvider
+
+log = logging.getLogger(__name__)
+
+# "auto" = orjson when installed, else stdlib; "orjson" / "stdlib" to force one
+JSON_ENCODER = os.getenv("API_JSON_ENCODER", "auto").strip().lower()
+
+
+def json_default(o: Any) -> Any:
+    """
+    Encode the raw DB values repositories hand through: dates/times as
+    ISO 8601, DECIMAL columns as numbers.
+    """
+    if isinstance(o, (date, datetime, time)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _load_orjson():
+    if JSON_ENCODER == "stdlib":
+        return None
+    try:
+        import orjson
+    except ImportError:
+        if JSON_ENCODER == "orjson":
+            raise RuntimeError("API_JSON_ENCODER=orjson requires the 'orjson' package")
+        return None
+    return orjson
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson (optional dependency) with a
+    stdlib fallback. Both paths encode date/datetime/Decimal the same way,
+    emit compact UTF-8 and keep dict keys in insertion (SELECT) order.
+    """
+
+    mimetype = "application/json"
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._orjson = _load_orjson()
+        self.backend = "orjson" if self._orjson else "stdlib"
+        log.info("JSON provider ready", extra={"json.backend": self.backend})
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        if self._orjson is not None:
+            return self._orjson.dumps(obj, default=json_default, option=self._orjson.OPT_NON_STR_KEYS)
+        return self.dumps(obj).encode()
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self._orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode()
+        kwargs.setdefault("default", json_default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if self._orjson is not None and not kwargs:
+            return self._orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Skip the bytes -> str -> bytes round trip jsonify() would do
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
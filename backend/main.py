@@ -1,20 +1,36 @@
 # main.py
+import csv
+import io
 import logging
 import os
+from datetime import date, timedelta
+from decimal import Decimal
 
 from auth import requires_auth
-from db import create_db_connection
+from compression import init_app as init_compression
+from conditional import conditional
+from db import STICKY_HEADER, get_connection, init_app, transaction
+from fanout import run_concurrently
+from fields import InvalidFields, parse_fields, project
+from filters import InvalidFilter, boolean, iso_date, parse_filters, positive_int, year_month
 from flask import Flask, jsonify, request
 from flask_cors import CORS
+from includes import InvalidInclude, embed, embed_stream, parse_includes, with_include_keys
+from json_provider import FastJSONProvider
 from opentelemetry import metrics, trace
 from opentelemetry._logs import set_logger_provider
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
 from opentelemetry.sdk._logs.export import BatchLogRecordProcessor, ConsoleLogExporter
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.trace import Status, StatusCode, get_current_span
+from pagination import InvalidPageRequest, paginate, parse_limit, parse_page_request
 
 # 🔹 NEW: Assessments repository imports
 from repositories.assessments_repository import (
+    ASSESSMENT_FEED,
+    ASSESSMENT_FIELDS,
+    ASSESSMENT_FILTERS,
+    ASSESSMENT_ORDER,
     create_assessment,
     delete_assessment,
     get_assessment,
@@ -22,21 +38,37 @@ from repositories.assessments_repository import (
     update_assessment,
 )
 from repositories.attendance_repository import (
+    ATTENDANCE_FEED,
+    ATTENDANCE_FIELDS,
+    ATTENDANCE_FILTERS,
+    ATTENDANCE_ORDER,
+    ATTENDANCE_STATUSES,
+    UnknownStudentsError,
     create_attendance,
     delete_attendance,
     get_attendance,
+    iter_attendance,
     list_attendance,
-    list_attendance_for_student,
+    summarise_attendance_for_student,
     update_attendance,
+    upsert_attendance_register,
 )
+from repositories.changes_repository import list_changes
 from repositories.documents_repository import (
+    DOCUMENT_FEED,
+    DOCUMENT_FIELDS,
+    DOCUMENT_FILTERS,
+    DOCUMENT_ORDER,
     create_document,
     delete_document,
     get_document,
     list_documents,
-    list_documents_for_student,
 )
 from repositories.enrolments_repository import (
+    ENROLMENT_FEED,
+    ENROLMENT_FIELDS,
+    ENROLMENT_FILTERS,
+    ENROLMENT_ORDER,
     create_enrolment,
     delete_enrolment,
     get_enrolment,
@@ -44,6 +76,10 @@ from repositories.enrolments_repository import (
     update_enrolment,
 )
 from repositories.programmes_repository import (
+    PROGRAMME_FEED,
+    PROGRAMME_FIELDS,
+    PROGRAMME_FILTERS,
+    PROGRAMME_ORDER,
     ProgrammeCodeAlreadyExistsError,
     create_programme,
     delete_programme,
@@ -51,29 +87,53 @@ from repositories.programmes_repository import (
     list_programmes,
     update_programme,
 )
+from repositories.reports_repository import (
+    REPORT_FILTERS,
+    REPORT_TABLES,
+    get_programme_summary,
+    get_programmes_overview,
+    report_period,
+)
+from repositories.stipend_runs_repository import ProRataRule, run_stipends
 from repositories.stipends_repository import (
+    STIPEND_FEED,
+    STIPEND_FIELDS,
+    STIPEND_FILTERS,
+    STIPEND_ORDER,
     create_stipend,
     delete_stipend,
     get_stipend,
+    iter_stipends,
     list_stipends,
-    list_stipends_for_student,
     update_stipend,
 )
+from repositories.student_search_repository import STUDENT_SEARCH_DEFAULT_LIMIT, search_students
 from repositories.students_repository import (
+    STUDENT_FEED,
+    STUDENT_FIELDS,
+    STUDENT_FILTERS,
+    STUDENT_ORDER,
     EmailAlreadyExistsError,
     delete_student,
     get_student,
     list_students,
     register_student,
+    register_students_bulk,
     update_student,
 )
 from repositories.workplace_placements_repository import (
+    PLACEMENT_FEED,
+    PLACEMENT_FIELDS,
+    PLACEMENT_FILTERS,
+    PLACEMENT_ORDER,
     create_placement,
     delete_placement,
     get_placement,
     list_placements,
     update_placement,
 )
+from streaming import stream_response, wants_stream
+from sync import ChangeFeed, InvalidSyncToken, SyncTokenExpired, changes_page, parse_sync_request
 
 # =============================================================================
 # Environment-driven config
@@ -97,6 +157,13 @@ ENABLE_PROMETHEUS = os.getenv("ENABLE_PROMETHEUS", "true").lower() == "true"
 PROMETHEUS_PORT = int(os.getenv("PROMETHEUS_PORT", "9100"))
 PROMETHEUS_HOST = os.getenv("PROMETHEUS_HOST", "0.0.0.0")
 
+# Learner profile: rows per section, attendance summary window (days)
+PROFILE_SECTION_LIMIT = int(os.getenv("API_PROFILE_SECTION_LIMIT", "100"))
+PROFILE_ATTENDANCE_DAYS = int(os.getenv("API_PROFILE_ATTENDANCE_DAYS", "30"))
+
+# Max rows accepted by one bulk request
+BULK_MAX_ROWS = int(os.getenv("API_BULK_MAX_ROWS", "5000"))
+
 FLASK_DEBUG = os.getenv("FLASK_DEBUG", "false").lower() == "true"
 FLASK_HOST = os.getenv("FLASK_HOST", "0.0.0.0")
 FLASK_PORT = int(os.getenv("FLASK_PORT", "5000"))
@@ -154,7 +221,10 @@ request_counter = meter.create_counter(
 
 # --- Flask App ---
 app = Flask(__name__)
-CORS(app)
+app.json = FastJSONProvider(app)
+CORS(app, expose_headers=["Link", "ETag", "Last-Modified", STICKY_HEADER])
+init_app(app)
+init_compression(app)
 
 
 @app.before_request
@@ -168,6 +238,45 @@ def count_requests():
     )
 
 
+@app.errorhandler(InvalidFields)
+@app.errorhandler(InvalidFilter)
+@app.errorhandler(InvalidInclude)
+@app.errorhandler(InvalidPageRequest)
+@app.errorhandler(InvalidSyncToken)
+def invalid_list_request(e):
+    get_current_span().add_event("validation_failed", {"reason": str(e)})
+    return jsonify({"error": str(e)}), 400
+
+
+@app.errorhandler(SyncTokenExpired)
+def expired_sync_token(e):
+    get_current_span().add_event("sync_token_expired", {"reason": str(e)})
+    return jsonify({"error": str(e)}), 410
+
+
+def changes_response(feed: ChangeFeed, resource: str):
+    """
+    Shared body of the GET /<resource>/changes endpoints. No conditional
+    GET here: rows leave the settle window without a table version bump.
+    """
+    span = get_current_span()
+    sync = parse_sync_request(request.args)
+    span.set_attribute(f"{resource}.changes.initial", sync.after is None)
+    try:
+        rows, tombstones, synced_to = list_changes(feed, sync)
+        page = changes_page(rows, tombstones, sync, synced_to)
+        span.set_attribute(f"{resource}.changes.count", len(page["changes"]))
+        span.set_attribute(f"{resource}.changes.deleted", len(page["deleted"]))
+        span.set_status(Status(StatusCode.OK))
+        return jsonify(page), 200
+    except SyncTokenExpired:
+        raise
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": f"Failed to fetch {resource} changes"}), 500
+
+
 # --- Endpoints ---
 
 
@@ -185,9 +294,10 @@ def health():
     span.update_name("health_handler")
 
     try:
-        connection = create_db_connection()
-        if connection and connection.is_connected():
-            connection.close()
+        with get_connection() as connection:
+            connected = connection is not None and connection.is_connected()
+
+        if connected:
             span.set_status(Status(StatusCode.OK))
             span.set_attribute("health.db_status", "ok")
             return jsonify({"status": "healthy"}), 200
@@ -346,30 +456,111 @@ def create_student():
         return jsonify({"error": "Failed to create student"}), 500
 
 
+# CREATE (bulk)
+@app.route("/students/bulk", methods=["POST"])
+@requires_auth
+def create_students_bulk():
+    """
+    Register many students in one transaction. Body: a JSON array of
+    {first_name, last_name, email} or CSV (Content-Type: text/csv) with a
+    header row. Per-row results report created ids, duplicate-email
+    conflicts and invalid rows without aborting the batch.
+    """
+    span = get_current_span()
+
+    if request.mimetype == "text/csv":
+        rows = list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    else:
+        rows = request.get_json(silent=True)
+
+    if not isinstance(rows, list) or not rows:
+        span.set_status(Status(StatusCode.ERROR, "Invalid request body"))
+        return jsonify({"error": "Expected a non-empty JSON array or CSV body"}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        span.set_status(Status(StatusCode.ERROR, "Too many rows"))
+        return jsonify({"error": f"At most {BULK_MAX_ROWS} rows per request"}), 413
+
+    span.set_attribute("students.bulk.rows", len(rows))
+    try:
+        with transaction():
+            results = register_students_bulk(rows)
+
+        summary = {status: sum(r["status"] == status for r in results) for status in ("created", "conflict", "invalid")}
+        for status, count in summary.items():
+            span.set_attribute(f"students.bulk.{status}", count)
+        log.info("Bulk student registration", extra={f"students.bulk.{k}": v for k, v in summary.items()})
+
+        span.set_status(Status(StatusCode.OK))
+        return jsonify({**summary, "results": results}), 201 if summary["created"] else 200
+
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to register students"}), 500
+
+
 # READ ALL
 @app.route("/students", methods=["GET"])
 @requires_auth
+@conditional("students")
 def get_students():
     span = get_current_span()
+    filters = parse_filters(request.args, STUDENT_FILTERS)
+    fields = parse_fields(request.args, STUDENT_FIELDS)
+    page = parse_page_request(request.args, STUDENT_ORDER)
     try:
-        students = list_students()
+        students, links = paginate(
+            list_students(limit=page.fetch_size, after=page.after, filters=filters, fields=fields),
+            page,
+            STUDENT_ORDER,
+        )
         span.set_attribute("students.count", len(students))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(students), 200
+        return jsonify([project(item, fields) for item in students]), 200, links
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
         return jsonify({"error": "Failed to fetch students"}), 500
 
 
+# CHANGES (delta sync)
+@app.route("/students/changes", methods=["GET"])
+@requires_auth
+def get_student_changes():
+    return changes_response(STUDENT_FEED, "students")
+
+
+# SEARCH (typeahead by name / email)
+@app.route("/students/search", methods=["GET"])
+@requires_auth
+def search_students_by_name():
+    span = get_current_span()
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    limit = parse_limit(request.args) if request.args.get("limit") else STUDENT_SEARCH_DEFAULT_LIMIT
+    span.set_attribute("search.query_length", len(query))
+    try:
+        students = search_students(query, limit=limit)
+        span.set_attribute("students.count", len(students))
+        span.set_status(Status(StatusCode.OK))
+        return jsonify(students), 200
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to search students"}), 500
+
+
 # READ ONE
 @app.route("/students/<int:student_id>", methods=["GET"])
 @requires_auth
+@conditional("students")
 def get_student_by_id(student_id: int):
     span = get_current_span()
     span.set_attribute("student.id", student_id)
+    fields = parse_fields(request.args, STUDENT_FIELDS)
     try:
-        student = get_student(student_id)
+        student = get_student(student_id, fields=fields)
         if not student:
             span.set_status(Status(StatusCode.OK))
             return jsonify({"error": "Student not found"}), 404
@@ -382,6 +573,54 @@ def get_student_by_id(student_id: int):
         return jsonify({"error": "Failed to fetch student"}), 500
 
 
+# READ ONE (profile)
+@app.route("/students/<int:student_id>/profile", methods=["GET"])
+@requires_auth
+@conditional("students", "enrolments", "workplace_placements", "assessments", "attendance", "stipends", "documents")
+def get_student_profile(student_id: int):
+    """
+    Learner 360: the student plus enrolments, placements, assessments,
+    recent attendance, stipends and documents in one response. Sections are
+    queried concurrently, each on its own pooled connection.
+    """
+    span = get_current_span()
+    span.set_attribute("student.id", student_id)
+
+    by_student = {"student_id": student_id}
+    since = (date.today() - timedelta(days=PROFILE_ATTENDANCE_DAYS)).isoformat()
+    limit = PROFILE_SECTION_LIMIT
+
+    try:
+        sections, timings = run_concurrently(
+            {
+                "student": lambda: get_student(student_id),
+                "enrolments": lambda: list_enrolments(limit=limit, filters=by_student),
+                "workplace_placements": lambda: list_placements(limit=limit, filters=by_student),
+                "assessments": lambda: list_assessments(limit=limit, filters=by_student),
+                "attendance_summary": lambda: summarise_attendance_for_student(student_id, since),
+                "recent_attendance": lambda: list_attendance(
+                    limit=limit, filters={**by_student, "attendance_date_from": since}
+                ),
+                "stipends": lambda: list_stipends(limit=limit, filters=by_student),
+                "documents": lambda: list_documents(limit=limit, filters=by_student),
+            }
+        )
+        for name, ms in timings.items():
+            span.set_attribute(f"profile.{name}.duration_ms", round(ms, 2))
+
+        student = sections.pop("student")
+        if not student:
+            span.set_status(Status(StatusCode.OK))
+            return jsonify({"error": "Student not found"}), 404
+
+        span.set_status(Status(StatusCode.OK))
+        return jsonify({**student, **sections}), 200
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to fetch student profile"}), 500
+
+
 # UPDATE
 @app.route("/students/<int:student_id>", methods=["PUT"])
 @requires_auth
@@ -456,13 +695,21 @@ def delete_student_by_id(student_id: int):
 
 @app.route("/programmes", methods=["GET"])
 @requires_auth
+@conditional("programmes")
 def api_list_programmes():
     span = get_current_span()
+    filters = parse_filters(request.args, PROGRAMME_FILTERS)
+    fields = parse_fields(request.args, PROGRAMME_FIELDS)
+    page = parse_page_request(request.args, PROGRAMME_ORDER)
     try:
-        programmes = list_programmes()
+        programmes, links = paginate(
+            list_programmes(limit=page.fetch_size, after=page.after, filters=filters),
+            page,
+            PROGRAMME_ORDER,
+        )
         span.set_attribute("programmes.count", len(programmes))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(programmes), 200
+        return jsonify([project(item, fields) for item in programmes]), 200, links
     except Exception as e:
         app.logger.exception("Error fetching programmes")
         span.record_exception(e)
@@ -493,14 +740,15 @@ def api_create_programme():
         ), 400
 
     try:
-        pid = create_programme(
-            programme_name=programme_name,
-            programme_code=programme_code,
-            nqf_level=nqf_level,
-            credits=credits,
-            description=description,
-        )
-        programme = get_programme(pid)
+        with transaction():
+            pid = create_programme(
+                programme_name=programme_name,
+                programme_code=programme_code,
+                nqf_level=nqf_level,
+                credits=credits,
+                description=description,
+            )
+            programme = get_programme(pid)
         span.set_attribute("programme.id", pid)
         span.set_status(Status(StatusCode.OK))
         return jsonify({"message": "Programme created", "programme": programme}), 201
@@ -514,11 +762,20 @@ def api_create_programme():
         return jsonify({"error": "Failed to create programme"}), 500
 
 
+# CHANGES (delta sync)
+@app.route("/programmes/changes", methods=["GET"])
+@requires_auth
+def api_programme_changes():
+    return changes_response(PROGRAMME_FEED, "programmes")
+
+
 @app.route("/programmes/<int:programme_id>", methods=["GET"])
 @requires_auth
+@conditional("programmes")
 def api_get_programme(programme_id: int):
     span = get_current_span()
     span.set_attribute("programme.id", programme_id)
+    fields = parse_fields(request.args, PROGRAMME_FIELDS)
     try:
         programme = get_programme(programme_id)
         if not programme:
@@ -526,7 +783,7 @@ def api_get_programme(programme_id: int):
             return jsonify({"error": "Programme not found"}), 404
 
         span.set_status(Status(StatusCode.OK))
-        return jsonify(programme), 200
+        return jsonify(project(programme, fields)), 200
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -608,13 +865,27 @@ def api_delete_programme(programme_id: int):
 
 @app.route("/enrolments", methods=["GET"])
 @requires_auth
+@conditional("enrolments")
 def api_list_enrolments():
     span = get_current_span()
+    filters = parse_filters(request.args, ENROLMENT_FILTERS)
+    includes = parse_includes(request.args, ("student", "programme"))
+    fields = parse_fields(request.args, ENROLMENT_FIELDS)
+    page = parse_page_request(request.args, ENROLMENT_ORDER)
     try:
-        enrolments = list_enrolments()
+        enrolments, links = paginate(
+            list_enrolments(
+                limit=page.fetch_size,
+                after=page.after,
+                filters=filters,
+                fields=with_include_keys(fields, includes),
+            ),
+            page,
+            ENROLMENT_ORDER,
+        )
         span.set_attribute("enrolments.count", len(enrolments))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(enrolments), 200
+        return jsonify([project(item, fields, includes) for item in embed(enrolments, includes)]), 200, links
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -644,14 +915,15 @@ def api_create_enrolment():
         ), 400
 
     try:
-        eid = create_enrolment(
-            student_id=int(student_id),
-            programme_id=int(programme_id),
-            enrolment_status=enrolment_status,
-            enrolment_date=enrolment_date,
-            completion_date=completion_date,
-        )
-        enrolment = get_enrolment(eid)
+        with transaction():
+            eid = create_enrolment(
+                student_id=int(student_id),
+                programme_id=int(programme_id),
+                enrolment_status=enrolment_status,
+                enrolment_date=enrolment_date,
+                completion_date=completion_date,
+            )
+            enrolment = get_enrolment(eid)
         span.set_attribute("enrolment.id", eid)
         span.set_status(Status(StatusCode.OK))
         return jsonify({"message": "Enrolment created", "enrolment": enrolment}), 201
@@ -661,14 +933,23 @@ def api_create_enrolment():
         return jsonify({"error": "Failed to create enrolment"}), 500
 
 
+# CHANGES (delta sync)
+@app.route("/enrolments/changes", methods=["GET"])
+@requires_auth
+def api_enrolment_changes():
+    return changes_response(ENROLMENT_FEED, "enrolments")
+
+
 @app.route("/enrolments/<int:enrolment_id>", methods=["GET"])
 @requires_auth
+@conditional("enrolments")
 def api_get_enrolment(enrolment_id: int):
     span = get_current_span()
     span.set_attribute("enrolment.id", enrolment_id)
 
+    fields = parse_fields(request.args, ENROLMENT_FIELDS)
     try:
-        enrolment = get_enrolment(enrolment_id)
+        enrolment = get_enrolment(enrolment_id, fields=fields)
         if not enrolment:
             span.set_status(Status(StatusCode.OK))
             return jsonify({"error": "Enrolment not found"}), 404
@@ -752,13 +1033,27 @@ def api_delete_enrolment(enrolment_id: int):
 
 @app.route("/workplace-placements", methods=["GET"])
 @requires_auth
+@conditional("workplace_placements")
 def api_list_placements():
     span = get_current_span()
+    filters = parse_filters(request.args, PLACEMENT_FILTERS)
+    includes = parse_includes(request.args, ("student",))
+    fields = parse_fields(request.args, PLACEMENT_FIELDS)
+    page = parse_page_request(request.args, PLACEMENT_ORDER)
     try:
-        placements = list_placements()
+        placements, links = paginate(
+            list_placements(
+                limit=page.fetch_size,
+                after=page.after,
+                filters=filters,
+                fields=with_include_keys(fields, includes),
+            ),
+            page,
+            PLACEMENT_ORDER,
+        )
         span.set_attribute("placements.count", len(placements))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(placements), 200
+        return jsonify([project(item, fields, includes) for item in embed(placements, includes)]), 200, links
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -790,16 +1085,17 @@ def api_create_placement():
         ), 400
 
     try:
-        pid = create_placement(
-            student_id=int(student_id),
-            employer_name=employer_name,
-            employer_contact=employer_contact,
-            supervisor_name=supervisor_name,
-            supervisor_phone=supervisor_phone,
-            start_date=start_date,
-            end_date=end_date,
-        )
-        placement = get_placement(pid)
+        with transaction():
+            pid = create_placement(
+                student_id=int(student_id),
+                employer_name=employer_name,
+                employer_contact=employer_contact,
+                supervisor_name=supervisor_name,
+                supervisor_phone=supervisor_phone,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            placement = get_placement(pid)
         span.set_attribute("placement.id", pid)
         span.set_status(Status(StatusCode.OK))
         return jsonify({"message": "Placement created", "placement": placement}), 201
@@ -809,14 +1105,23 @@ def api_create_placement():
         return jsonify({"error": "Failed to create placement"}), 500
 
 
+# CHANGES (delta sync)
+@app.route("/workplace-placements/changes", methods=["GET"])
+@requires_auth
+def api_placement_changes():
+    return changes_response(PLACEMENT_FEED, "placements")
+
+
 @app.route("/workplace-placements/<int:placement_id>", methods=["GET"])
 @requires_auth
+@conditional("workplace_placements")
 def api_get_placement(placement_id: int):
     span = get_current_span()
     span.set_attribute("placement.id", placement_id)
 
+    fields = parse_fields(request.args, PLACEMENT_FIELDS)
     try:
-        placement = get_placement(placement_id)
+        placement = get_placement(placement_id, fields=fields)
         if not placement:
             span.set_status(Status(StatusCode.OK))
             return jsonify({"error": "Placement not found"}), 404
@@ -904,19 +1209,31 @@ def api_delete_placement(placement_id: int):
 
 @app.route("/attendance", methods=["GET"])
 @requires_auth
+@conditional("attendance")
 def api_list_attendance():
     span = get_current_span()
-    student_id = request.args.get("student_id")
+    filters = parse_filters(request.args, ATTENDANCE_FILTERS)
+    includes = parse_includes(request.args, ("student",))
+    fields = parse_fields(request.args, ATTENDANCE_FIELDS)
 
-    try:
-        if student_id:
-            records = list_attendance_for_student(int(student_id))
-        else:
-            records = list_attendance()
+    if wants_stream():
+        span.set_attribute("attendance.streamed", True)
+        rows = iter_attendance(filters, fields=with_include_keys(fields, includes))
+        return stream_response(project(row, fields, includes) for row in embed_stream(rows, includes))
 
+    page = parse_page_request(request.args, ATTENDANCE_ORDER)
+
+    try:
+        records = list_attendance(
+            limit=page.fetch_size,
+            after=page.after,
+            filters=filters,
+            fields=with_include_keys(fields, includes),
+        )
+        records, links = paginate(records, page, ATTENDANCE_ORDER)
         span.set_attribute("attendance.count", len(records))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(records), 200
+        return jsonify([project(item, fields, includes) for item in embed(records, includes)]), 200, links
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -944,12 +1261,13 @@ def api_create_attendance():
         ), 400
 
     try:
-        aid = create_attendance(
-            student_id=int(student_id),
-            attendance_date=attendance_date,
-            status=status,
-        )
-        record = get_attendance(aid)
+        with transaction():
+            aid = create_attendance(
+                student_id=int(student_id),
+                attendance_date=attendance_date,
+                status=status,
+            )
+            record = get_attendance(aid)
         span.set_attribute("attendance.id", aid)
         span.set_status(Status(StatusCode.OK))
         return jsonify({"message": "Attendance created", "attendance": record}), 201
@@ -959,14 +1277,71 @@ def api_create_attendance():
         return jsonify({"error": "Failed to create attendance"}), 500
 
 
+@app.route("/attendance/register", methods=["POST"])
+@requires_auth
+def api_attendance_register():
+    """
+    Capture a whole class register for one day in one round trip:
+    {"attendance_date": "YYYY-MM-DD", "entries": [{"student_id": 1, "status": "present"}, ...]}.
+    Re-submitting the same day updates changed statuses instead of failing.
+    """
+    span = get_current_span()
+    data = request.get_json(silent=True)
+
+    if not isinstance(data, dict) or not isinstance(data.get("entries"), list) or not data["entries"]:
+        span.set_status(Status(StatusCode.ERROR, "Invalid request body"))
+        return jsonify({"error": "attendance_date and a non-empty entries list required"}), 400
+    if len(data["entries"]) > BULK_MAX_ROWS:
+        span.set_status(Status(StatusCode.ERROR, "Too many rows"))
+        return jsonify({"error": f"At most {BULK_MAX_ROWS} entries per request"}), 413
+
+    try:
+        attendance_date = iso_date(str(data.get("attendance_date", "")))
+        entries = [(positive_int(str(e.get("student_id", ""))), e.get("status", "present")) for e in data["entries"]]
+    except (ValueError, AttributeError):
+        span.set_status(Status(StatusCode.ERROR, "Invalid register"))
+        return jsonify({"error": "attendance_date must be YYYY-MM-DD and student_id a positive integer"}), 400
+
+    if any(status not in ATTENDANCE_STATUSES for _, status in entries):
+        return jsonify({"error": f"status must be one of {', '.join(ATTENDANCE_STATUSES)}"}), 400
+    if len({sid for sid, _ in entries}) != len(entries):
+        return jsonify({"error": "Each student may appear only once per register"}), 400
+
+    span.set_attribute("attendance.date", attendance_date)
+    span.set_attribute("attendance.entries", len(entries))
+    try:
+        with transaction():
+            counts = upsert_attendance_register(attendance_date, entries)
+        for key, value in counts.items():
+            span.set_attribute(f"attendance.{key}", value)
+        span.set_status(Status(StatusCode.OK))
+        return jsonify({"attendance_date": attendance_date, **counts}), 200
+    except UnknownStudentsError as e:
+        span.set_status(Status(StatusCode.ERROR, "unknown_students"))
+        return jsonify({"error": str(e), "student_ids": e.student_ids}), 422
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to save attendance register"}), 500
+
+
+# CHANGES (delta sync)
+@app.route("/attendance/changes", methods=["GET"])
+@requires_auth
+def api_attendance_changes():
+    return changes_response(ATTENDANCE_FEED, "attendance")
+
+
 @app.route("/attendance/<int:attendance_id>", methods=["GET"])
 @requires_auth
+@conditional("attendance")
 def api_get_attendance(attendance_id: int):
     span = get_current_span()
     span.set_attribute("attendance.id", attendance_id)
 
+    fields = parse_fields(request.args, ATTENDANCE_FIELDS)
     try:
-        record = get_attendance(attendance_id)
+        record = get_attendance(attendance_id, fields=fields)
         if not record:
             span.set_status(Status(StatusCode.OK))
             return jsonify({"error": "Attendance not found"}), 404
@@ -1046,19 +1421,31 @@ def api_delete_attendance(attendance_id: int):
 
 @app.route("/stipends", methods=["GET"])
 @requires_auth
+@conditional("stipends")
 def api_list_stipends():
     span = get_current_span()
-    student_id = request.args.get("student_id")
+    filters = parse_filters(request.args, STIPEND_FILTERS)
+    includes = parse_includes(request.args, ("student",))
+    fields = parse_fields(request.args, STIPEND_FIELDS)
 
-    try:
-        if student_id:
-            records = list_stipends_for_student(int(student_id))
-        else:
-            records = list_stipends()
+    if wants_stream():
+        span.set_attribute("stipends.streamed", True)
+        rows = iter_stipends(filters, fields=with_include_keys(fields, includes))
+        return stream_response(project(row, fields, includes) for row in embed_stream(rows, includes))
+
+    page = parse_page_request(request.args, STIPEND_ORDER)
 
+    try:
+        records = list_stipends(
+            limit=page.fetch_size,
+            after=page.after,
+            filters=filters,
+            fields=with_include_keys(fields, includes),
+        )
+        records, links = paginate(records, page, STIPEND_ORDER)
         span.set_attribute("stipends.count", len(records))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(records), 200
+        return jsonify([project(item, fields, includes) for item in embed(records, includes)]), 200, links
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -1087,13 +1474,14 @@ def api_create_stipend():
         ), 400
 
     try:
-        sid = create_stipend(
-            student_id=int(student_id),
-            month=month,
-            amount=float(amount),
-            status=status,
-        )
-        record = get_stipend(sid)
+        with transaction():
+            sid = create_stipend(
+                student_id=int(student_id),
+                month=month,
+                amount=float(amount),
+                status=status,
+            )
+            record = get_stipend(sid)
         span.set_attribute("stipend.id", sid)
         span.set_status(Status(StatusCode.OK))
         return jsonify({"message": "Stipend created", "stipend": record}), 201
@@ -1103,14 +1491,77 @@ def api_create_stipend():
         return jsonify({"error": "Failed to create stipend"}), 500
 
 
+@app.route("/stipends/run", methods=["POST"])
+@requires_auth
+def api_run_stipends():
+    """
+    Generate a month's stipends from attendance:
+    {"month": "YYYY-MM", "dry_run": true, "programme_id": 3,
+     "rule": {"monthly_amount": 2500, "min_percentage": 50, "full_percentage": 90}}.
+    Everything but `month` is optional; the rule defaults come from env.
+    """
+    span = get_current_span()
+    data = request.get_json(silent=True) or {}
+
+    try:
+        if not isinstance(data, dict):
+            raise ValueError("body must be a JSON object")
+        month = year_month(str(data.get("month", "")))
+        programme_id = positive_int(str(data["programme_id"])) if data.get("programme_id") is not None else None
+
+        # A JSON boolean, or "true" / "false" / "1" / "0"; anything else
+        # (e.g. "no", which is truthy) must not turn into a real run
+        dry_run = data.get("dry_run", False)
+        if isinstance(dry_run, str):
+            dry_run = bool(boolean(dry_run))
+        elif not isinstance(dry_run, bool):
+            raise ValueError("dry_run must be true or false")
+
+        overrides = data.get("rule") or {}
+        if not isinstance(overrides, dict):
+            raise ValueError("rule must be an object")
+        defaults = ProRataRule()
+        rule = ProRataRule(
+            monthly_amount=Decimal(str(overrides.get("monthly_amount", defaults.monthly_amount))),
+            min_percentage=float(overrides.get("min_percentage", defaults.min_percentage)),
+            full_percentage=float(overrides.get("full_percentage", defaults.full_percentage)),
+        )
+        if not rule.monthly_amount.is_finite() or rule.monthly_amount <= 0:
+            raise ValueError("monthly_amount must be greater than 0")
+        if not 0 <= rule.min_percentage <= rule.full_percentage <= 100 or rule.full_percentage == 0:
+            raise ValueError("need 0 <= min_percentage <= full_percentage <= 100 and full_percentage > 0")
+    except (ValueError, TypeError, ArithmeticError) as e:
+        span.set_status(Status(StatusCode.ERROR, "Invalid stipend run"))
+        return jsonify({"error": f"Invalid stipend run: {e}"}), 400
+
+    try:
+        with transaction():
+            report = run_stipends(month, rule=rule, programme_id=programme_id, dry_run=dry_run)
+        span.set_status(Status(StatusCode.OK))
+        return jsonify(report), 200
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to run stipends"}), 500
+
+
+# CHANGES (delta sync)
+@app.route("/stipends/changes", methods=["GET"])
+@requires_auth
+def api_stipend_changes():
+    return changes_response(STIPEND_FEED, "stipends")
+
+
 @app.route("/stipends/<int:stipend_id>", methods=["GET"])
 @requires_auth
+@conditional("stipends")
 def api_get_stipend(stipend_id: int):
     span = get_current_span()
     span.set_attribute("stipend.id", stipend_id)
 
+    fields = parse_fields(request.args, STIPEND_FIELDS)
     try:
-        record = get_stipend(stipend_id)
+        record = get_stipend(stipend_id, fields=fields)
         if not record:
             span.set_status(Status(StatusCode.OK))
             return jsonify({"error": "Stipend not found"}), 404
@@ -1192,13 +1643,27 @@ def api_delete_stipend(stipend_id: int):
 
 @app.route("/assessments", methods=["GET"])
 @requires_auth
+@conditional("assessments")
 def api_list_assessments():
     span = get_current_span()
+    filters = parse_filters(request.args, ASSESSMENT_FILTERS)
+    includes = parse_includes(request.args, ("student", "programme"))
+    fields = parse_fields(request.args, ASSESSMENT_FIELDS)
+    page = parse_page_request(request.args, ASSESSMENT_ORDER)
     try:
-        assessments = list_assessments()
+        assessments, links = paginate(
+            list_assessments(
+                limit=page.fetch_size,
+                after=page.after,
+                filters=filters,
+                fields=with_include_keys(fields, includes),
+            ),
+            page,
+            ASSESSMENT_ORDER,
+        )
         span.set_attribute("assessments.count", len(assessments))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(assessments), 200
+        return jsonify([project(item, fields, includes) for item in embed(assessments, includes)]), 200, links
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -1233,18 +1698,19 @@ def api_create_assessment():
         ), 400
 
     try:
-        aid = create_assessment(
-            student_id=int(student_id),
-            programme_id=int(programme_id),
-            assessment_type=assessment_type,
-            assessment_name=assessment_name,
-            assessment_date=assessment_date,
-            score=score,
-            max_score=max_score,
-            result=result,
-            moderation_outcome=moderation_outcome,
-        )
-        assessment = get_assessment(aid)
+        with transaction():
+            aid = create_assessment(
+                student_id=int(student_id),
+                programme_id=int(programme_id),
+                assessment_type=assessment_type,
+                assessment_name=assessment_name,
+                assessment_date=assessment_date,
+                score=score,
+                max_score=max_score,
+                result=result,
+                moderation_outcome=moderation_outcome,
+            )
+            assessment = get_assessment(aid)
         span.set_attribute("assessment.id", aid)
         span.set_status(Status(StatusCode.OK))
         return (
@@ -1257,14 +1723,23 @@ def api_create_assessment():
         return jsonify({"error": "Failed to create assessment"}), 500
 
 
+# CHANGES (delta sync)
+@app.route("/assessments/changes", methods=["GET"])
+@requires_auth
+def api_assessment_changes():
+    return changes_response(ASSESSMENT_FEED, "assessments")
+
+
 @app.route("/assessments/<int:assessment_id>", methods=["GET"])
 @requires_auth
+@conditional("assessments")
 def api_get_assessment(assessment_id: int):
     span = get_current_span()
     span.set_attribute("assessment.id", assessment_id)
 
+    fields = parse_fields(request.args, ASSESSMENT_FIELDS)
     try:
-        assessment = get_assessment(assessment_id)
+        assessment = get_assessment(assessment_id, fields=fields)
         if not assessment:
             span.set_status(Status(StatusCode.OK))
             return jsonify({"error": "Assessment not found"}), 404
@@ -1356,19 +1831,20 @@ def api_delete_assessment(assessment_id: int):
 
 @app.route("/documents", methods=["GET"])
 @requires_auth
+@conditional("documents")
 def api_list_documents():
     span = get_current_span()
-    student_id = request.args.get("student_id")
+    filters = parse_filters(request.args, DOCUMENT_FILTERS)
+    fields = parse_fields(request.args, DOCUMENT_FIELDS)
+    page = parse_page_request(request.args, DOCUMENT_ORDER)
 
     try:
-        if student_id:
-            docs = list_documents_for_student(int(student_id))
-        else:
-            docs = list_documents()
+        docs = list_documents(limit=page.fetch_size, after=page.after, filters=filters, fields=fields)
 
+        docs, links = paginate(docs, page, DOCUMENT_ORDER)
         span.set_attribute("documents.count", len(docs))
         span.set_status(Status(StatusCode.OK))
-        return jsonify(docs), 200
+        return jsonify([project(item, fields) for item in docs]), 200, links
     except Exception as e:
         span.record_exception(e)
         span.set_status(Status(StatusCode.ERROR, str(e)))
@@ -1398,14 +1874,15 @@ def api_create_document():
         ), 400
 
     try:
-        did = create_document(
-            student_id=int(student_id),
-            document_name=document_name,
-            file_path=file_path,
-            document_type=document_type,
-            uploaded_by=uploaded_by,
-        )
-        doc = get_document(did)
+        with transaction():
+            did = create_document(
+                student_id=int(student_id),
+                document_name=document_name,
+                file_path=file_path,
+                document_type=document_type,
+                uploaded_by=uploaded_by,
+            )
+            doc = get_document(did)
         span.set_attribute("document.id", did)
         span.set_status(Status(StatusCode.OK))
         return jsonify({"message": "Document created", "document": doc}), 201
@@ -1415,14 +1892,23 @@ def api_create_document():
         return jsonify({"error": "Failed to create document"}), 500
 
 
+# CHANGES (delta sync)
+@app.route("/documents/changes", methods=["GET"])
+@requires_auth
+def api_document_changes():
+    return changes_response(DOCUMENT_FEED, "documents")
+
+
 @app.route("/documents/<int:document_id>", methods=["GET"])
 @requires_auth
+@conditional("documents")
 def api_get_document(document_id: int):
     span = get_current_span()
     span.set_attribute("document.id", document_id)
 
+    fields = parse_fields(request.args, DOCUMENT_FIELDS)
     try:
-        doc = get_document(document_id)
+        doc = get_document(document_id, fields=fields)
         if not doc:
             span.set_status(Status(StatusCode.OK))
             return jsonify({"error": "Document not found"}), 404
@@ -1455,6 +1941,56 @@ def api_delete_document(document_id: int):
         return jsonify({"error": "Failed to delete document"}), 500
 
 
+# =========================================
+#   Reports API
+# =========================================
+
+
+@app.route("/reports/programmes/<int:programme_id>/summary", methods=["GET"])
+@requires_auth
+@conditional(*REPORT_TABLES)
+def api_programme_summary(programme_id: int):
+    """
+    Programme dashboard figures, computed in the database. Attendance and
+    stipends cover ?month_from=YYYY-MM .. ?month_to=YYYY-MM (default: the
+    last REPORT_DEFAULT_MONTHS months).
+    """
+    span = get_current_span()
+    span.set_attribute("programme.id", programme_id)
+    period = report_period(**parse_filters(request.args, REPORT_FILTERS))
+
+    try:
+        summary = get_programme_summary(programme_id, period)
+        if not summary:
+            span.set_status(Status(StatusCode.OK))
+            return jsonify({"error": "Programme not found"}), 404
+
+        span.set_status(Status(StatusCode.OK))
+        return jsonify(summary), 200
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to build programme summary"}), 500
+
+
+@app.route("/reports/overview", methods=["GET"])
+@requires_auth
+@conditional(*REPORT_TABLES)
+def api_reports_overview():
+    span = get_current_span()
+    period = report_period(**parse_filters(request.args, REPORT_FILTERS))
+
+    try:
+        overview = get_programmes_overview(period)
+        span.set_attribute("programmes.count", len(overview["programmes"]))
+        span.set_status(Status(StatusCode.OK))
+        return jsonify(overview), 200
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        return jsonify({"error": "Failed to build reports overview"}), 500
+
+
 # --- Run Flask App ---
 if __name__ == "__main__":
     app.run(
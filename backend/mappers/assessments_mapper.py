@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Any, List, Optional
 
+from db import prepared_cursor
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 
@@ -108,7 +109,7 @@ class AssessmentMapper:
             span.set_attribute("db.operation", "INSERT")
             span.set_attribute("db.sql.table", "assessments")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.INSERT_SQL)
             try:
                 cursor.execute(
                     self.INSERT_SQL,
@@ -152,7 +153,7 @@ class AssessmentMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "assessments")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_BY_ID_SQL)
             try:
                 cursor.execute(self.SELECT_BY_ID_SQL, (assessment_id,))
                 row = cursor.fetchone()
@@ -189,7 +190,7 @@ class AssessmentMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "assessments")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_ALL_SQL)
             try:
                 cursor.execute(self.SELECT_ALL_SQL)
                 rows = cursor.fetchall()
@@ -217,7 +218,7 @@ class AssessmentMapper:
             span.set_attribute("db.operation", "UPDATE")
             span.set_attribute("db.sql.table", "assessments")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.UPDATE_SQL)
             try:
                 cursor.execute(
                     self.UPDATE_SQL,
@@ -267,7 +268,7 @@ class AssessmentMapper:
             span.set_attribute("db.operation", "DELETE")
             span.set_attribute("db.sql.table", "assessments")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.DELETE_SQL)
             try:
                 cursor.execute(self.DELETE_SQL, (assessment_id,))
                 connection.commit()
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, List, Optional
 
+from db import prepared_cursor
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 
@@ -63,7 +64,7 @@ class EmployerMapper:
             span.set_attribute("db.operation", "INSERT")
             span.set_attribute("db.sql.table", "employers")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.INSERT_SQL)
             try:
                 cursor.execute(
                     self.INSERT_SQL,
@@ -98,7 +99,7 @@ class EmployerMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "employers")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_BY_ID_SQL)
             try:
                 cursor.execute(self.SELECT_BY_ID_SQL, (employer_id,))
                 row = cursor.fetchone()
@@ -130,7 +131,7 @@ class EmployerMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "employers")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_ALL_SQL)
             try:
                 cursor.execute(self.SELECT_ALL_SQL)
                 rows = cursor.fetchall()
@@ -155,7 +156,7 @@ class EmployerMapper:
             span.set_attribute("db.operation", "UPDATE")
             span.set_attribute("db.sql.table", "employers")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.UPDATE_SQL)
             try:
                 cursor.execute(
                     self.UPDATE_SQL,
@@ -194,7 +195,7 @@ class EmployerMapper:
             span.set_attribute("db.operation", "DELETE")
             span.set_attribute("db.sql.table", "employers")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.DELETE_SQL)
             try:
                 cursor.execute(self.DELETE_SQL, (employer_id,))
                 connection.commit()
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
+from db import prepared_cursor
 from mysql.connector import MySQLConnection
 
 
@@ -37,6 +38,50 @@ class ProgrammeMapper:
         ) ENGINE=InnoDB;
     """
 
+    INSERT_SQL = """
+        INSERT INTO programmes (code, name, nqf_level, credits, is_active)
+        VALUES (%s, %s, %s, %s, %s)
+    """
+
+    SELECT_BY_ID_SQL = """
+        SELECT
+            id,
+            code,
+            name,
+            nqf_level,
+            credits,
+            is_active,
+            created_at
+        FROM programmes
+        WHERE id = %s
+    """
+
+    SELECT_ALL_SQL = """
+        SELECT
+            id,
+            code,
+            name,
+            nqf_level,
+            credits,
+            is_active,
+            created_at
+        FROM programmes
+        ORDER BY name
+    """
+
+    UPDATE_SQL = """
+        UPDATE programmes
+        SET
+            code = %s,
+            name = %s,
+            nqf_level = %s,
+            credits = %s,
+            is_active = %s
+        WHERE id = %s
+    """
+
+    DELETE_SQL = "DELETE FROM programmes WHERE id = %s"
+
     # ---------- internal helper ----------
 
     def _row_to_programme(self, row: dict) -> Programme:
@@ -53,21 +98,8 @@ class ProgrammeMapper:
     # ---------- READ ALL ----------
 
     def list_all(self, connection: MySQLConnection) -> List[Programme]:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT
-                id,
-                code,
-                name,
-                nqf_level,
-                credits,
-                is_active,
-                created_at
-            FROM programmes
-            ORDER BY name
-            """
-        )
+        cursor = prepared_cursor(connection, self.SELECT_ALL_SQL, dictionary=True)
+        cursor.execute(self.SELECT_ALL_SQL)
         rows = cursor.fetchall()
         cursor.close()
         return [self._row_to_programme(r) for r in rows]
@@ -79,20 +111,9 @@ class ProgrammeMapper:
         connection: MySQLConnection,
         programme_id: int,
     ) -> Optional[Programme]:
-        cursor = connection.cursor(dictionary=True)
+        cursor = prepared_cursor(connection, self.SELECT_BY_ID_SQL, dictionary=True)
         cursor.execute(
-            """
-            SELECT
-                id,
-                code,
-                name,
-                nqf_level,
-                credits,
-                is_active,
-                created_at
-            FROM programmes
-            WHERE id = %s
-            """,
+            self.SELECT_BY_ID_SQL,
             (programme_id,),
         )
         row = cursor.fetchone()
@@ -106,12 +127,9 @@ class ProgrammeMapper:
         connection: MySQLConnection,
         programme: Programme,
     ) -> int:
-        cursor = connection.cursor()
+        cursor = prepared_cursor(connection, self.INSERT_SQL)
         cursor.execute(
-            """
-            INSERT INTO programmes (code, name, nqf_level, credits, is_active)
-            VALUES (%s, %s, %s, %s, %s)
-            """,
+            self.INSERT_SQL,
             (
                 programme.code,
                 programme.name,
@@ -133,18 +151,9 @@ class ProgrammeMapper:
         programme_id: int,
         programme: Programme,
     ) -> bool:
-        cursor = connection.cursor()
+        cursor = prepared_cursor(connection, self.UPDATE_SQL)
         cursor.execute(
-            """
-            UPDATE programmes
-            SET
-                code = %s,
-                name = %s,
-                nqf_level = %s,
-                credits = %s,
-                is_active = %s
-            WHERE id = %s
-            """,
+            self.UPDATE_SQL,
             (
                 programme.code,
                 programme.name,
@@ -162,8 +171,8 @@ class ProgrammeMapper:
     # ---------- DELETE ----------
 
     def delete(self, connection: MySQLConnection, programme_id: int) -> bool:
-        cursor = connection.cursor()
-        cursor.execute("DELETE FROM programmes WHERE id = %s", (programme_id,))
+        cursor = prepared_cursor(connection, self.DELETE_SQL)
+        cursor.execute(self.DELETE_SQL, (programme_id,))
         connection.commit()
         deleted = cursor.rowcount > 0
         cursor.close()
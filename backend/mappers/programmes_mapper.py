@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from db import prepared_cursor
 from mysql.connector import Error
 
 log = logging.getLogger(__name__)
@@ -30,6 +31,55 @@ class ProgrammeMapper:
     This class knows how to translate DB rows <-> Programme objects.
     """
 
+    INSERT_SQL = """
+        INSERT INTO programmes
+            (code, name, nqf_level, credits, description, is_active)
+        VALUES
+            (%s, %s, %s, %s, %s, %s)
+    """
+
+    SELECT_ALL_SQL = """
+        SELECT
+            id,
+            code,
+            name,
+            nqf_level,
+            credits,
+            description,
+            is_active,
+            created_at
+        FROM programmes
+        ORDER BY name ASC, id ASC
+    """
+
+    SELECT_BY_ID_SQL = """
+        SELECT
+            id,
+            code,
+            name,
+            nqf_level,
+            credits,
+            description,
+            is_active,
+            created_at
+        FROM programmes
+        WHERE id = %s
+    """
+
+    UPDATE_SQL = """
+        UPDATE programmes
+        SET
+            code = %s,
+            name = %s,
+            nqf_level = %s,
+            credits = %s,
+            description = %s,
+            is_active = %s
+        WHERE id = %s
+    """
+
+    DELETE_SQL = "DELETE FROM programmes WHERE id = %s"
+
     def _row_to_programme(self, row: Dict[str, Any]) -> Programme:
         return Programme(
             id=row.get("id"),
@@ -48,13 +98,6 @@ class ProgrammeMapper:
         Insert a Programme into the DB.
         Returns the newly generated ID.
         """
-        sql = """
-            INSERT INTO programmes
-                (code, name, nqf_level, credits, description, is_active)
-            VALUES
-                (%s, %s, %s, %s, %s, %s)
-        """
-
         params = (
             programme.code,
             programme.name,
@@ -64,9 +107,9 @@ class ProgrammeMapper:
             1 if programme.is_active else 0,
         )
 
-        cursor = connection.cursor()
+        cursor = prepared_cursor(connection, self.INSERT_SQL)
         try:
-            cursor.execute(sql, params)
+            cursor.execute(self.INSERT_SQL, params)
             connection.commit()
             new_id = cursor.lastrowid
             log.debug("Inserted programme id=%s", new_id)
@@ -80,23 +123,9 @@ class ProgrammeMapper:
 
     # ---------- READ ALL ----------
     def list_all(self, connection) -> List[Programme]:
-        sql = """
-            SELECT
-                id,
-                code,
-                name,
-                nqf_level,
-                credits,
-                description,
-                is_active,
-                created_at
-            FROM programmes
-            ORDER BY name ASC, id ASC
-        """
-
-        cursor = connection.cursor(dictionary=True)
+        cursor = prepared_cursor(connection, self.SELECT_ALL_SQL, dictionary=True)
         try:
-            cursor.execute(sql)
+            cursor.execute(self.SELECT_ALL_SQL)
             rows = cursor.fetchall()
             return [self._row_to_programme(row) for row in rows]
         except Error:
@@ -107,23 +136,9 @@ class ProgrammeMapper:
 
     # ---------- READ ONE ----------
     def get_by_id(self, connection, programme_id: int) -> Optional[Programme]:
-        sql = """
-            SELECT
-                id,
-                code,
-                name,
-                nqf_level,
-                credits,
-                description,
-                is_active,
-                created_at
-            FROM programmes
-            WHERE id = %s
-        """
-
-        cursor = connection.cursor(dictionary=True)
+        cursor = prepared_cursor(connection, self.SELECT_BY_ID_SQL, dictionary=True)
         try:
-            cursor.execute(sql, (programme_id,))
+            cursor.execute(self.SELECT_BY_ID_SQL, (programme_id,))
             row = cursor.fetchone()
             if not row:
                 return None
@@ -140,18 +155,6 @@ class ProgrammeMapper:
         Update an existing programme.
         Returns True if a row was updated, False if not found.
         """
-        sql = """
-            UPDATE programmes
-            SET
-                code = %s,
-                name = %s,
-                nqf_level = %s,
-                credits = %s,
-                description = %s,
-                is_active = %s
-            WHERE id = %s
-        """
-
         params = (
             programme.code,
             programme.name,
@@ -162,9 +165,9 @@ class ProgrammeMapper:
             programme_id,
         )
 
-        cursor = connection.cursor()
+        cursor = prepared_cursor(connection, self.UPDATE_SQL)
         try:
-            cursor.execute(sql, params)
+            cursor.execute(self.UPDATE_SQL, params)
             connection.commit()
             updated = cursor.rowcount > 0
             log.debug("Updated programme id=%s, updated=%s", programme_id, updated)
@@ -182,11 +185,9 @@ class ProgrammeMapper:
         Delete a programme by ID.
         Returns True if a row was deleted, False otherwise.
         """
-        sql = "DELETE FROM programmes WHERE id = %s"
-
-        cursor = connection.cursor()
+        cursor = prepared_cursor(connection, self.DELETE_SQL)
         try:
-            cursor.execute(sql, (programme_id,))
+            cursor.execute(self.DELETE_SQL, (programme_id,))
             connection.commit()
             deleted = cursor.rowcount > 0
             log.debug("Deleted programme id=%s, deleted=%s", programme_id, deleted)
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Any, List, Optional
 
+from db import prepared_cursor
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 
@@ -69,7 +70,7 @@ class StipendRecordMapper:
             span.set_attribute("db.operation", "INSERT")
             span.set_attribute("db.sql.table", "stipend_records")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.INSERT_SQL)
             try:
                 cursor.execute(
                     self.INSERT_SQL,
@@ -105,7 +106,7 @@ class StipendRecordMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "stipend_records")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_BY_ID_SQL)
             try:
                 cursor.execute(self.SELECT_BY_ID_SQL, (record_id,))
                 row = cursor.fetchone()
@@ -137,7 +138,7 @@ class StipendRecordMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "stipend_records")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_ALL_SQL)
             try:
                 cursor.execute(self.SELECT_ALL_SQL)
                 rows = cursor.fetchall()
@@ -162,7 +163,7 @@ class StipendRecordMapper:
             span.set_attribute("db.operation", "UPDATE")
             span.set_attribute("db.sql.table", "stipend_records")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.UPDATE_SQL)
             try:
                 cursor.execute(
                     self.UPDATE_SQL,
@@ -202,7 +203,7 @@ class StipendRecordMapper:
             span.set_attribute("db.operation", "DELETE")
             span.set_attribute("db.sql.table", "stipend_records")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.DELETE_SQL)
             try:
                 cursor.execute(self.DELETE_SQL, (record_id,))
                 connection.commit()
@@ -2,10 +2,12 @@
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Sequence, Tuple
 
+from db import prepared_cursor
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
+from pagination import keyset_query
 
 log = logging.getLogger(__name__)
 tracer = trace.get_tracer(__name__)
@@ -24,6 +26,7 @@ class Student:
     last_name: str = ""
     email: str = ""
     registration_date: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     def as_insert_tuple(self) -> tuple[str, str, str]:
         return (self.first_name, self.last_name, self.email)
@@ -43,17 +46,28 @@ class StudentMapper:
         VALUES (%s, %s, %s)
     """
 
+    # Selectable columns, in SELECT order (narrowed by sparse fieldsets)
+    COLUMNS = ("id", "first_name", "last_name", "email", "registration_date", "updated_at")
+
     SELECT_BY_ID_SQL = """
-        SELECT id, first_name, last_name, email, registration_date
+        SELECT {columns}
         FROM students
         WHERE id = %s
     """
 
+    SELECT_BY_IDS_SQL = """
+        SELECT id, first_name, last_name, email, registration_date, updated_at
+        FROM students
+        WHERE id IN ({placeholders})
+    """
+
     SELECT_ALL_SQL = """
-        SELECT id, first_name, last_name, email, registration_date
+        SELECT {columns}
         FROM students
     """
 
+    LIST_ORDER = (("id", "ASC"),)
+
     UPDATE_SQL = """
         UPDATE students
         SET first_name = %s, last_name = %s, email = %s
@@ -65,6 +79,14 @@ class StudentMapper:
         WHERE id = %s
     """
 
+    SELECT_IDS_BY_EMAIL_SQL = """
+        SELECT id, email
+        FROM students
+        WHERE email IN ({placeholders})
+    """
+
+    BULK_BATCH_SIZE = 500
+
     # ---------- CREATE ----------
     def insert(self, connection: Any, student: Student) -> Optional[int]:
         if connection is None or not connection.is_connected():
@@ -75,7 +97,7 @@ class StudentMapper:
             span.set_attribute("db.operation", "INSERT")
             span.set_attribute("db.sql.table", "students")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.INSERT_SQL)
             try:
                 cursor.execute(self.INSERT_SQL, student.as_insert_tuple())
                 connection.commit()
@@ -107,8 +129,69 @@ class StudentMapper:
             finally:
                 cursor.close()
 
+    def insert_many(self, connection: Any, students: Sequence[Student]) -> List[Optional[int]]:
+        """
+        Insert students with multi-row INSERTs of BULK_BATCH_SIZE rows.
+        Returns the new id per student, or None where the email already
+        exists. Emails must be unique within `students`.
+        """
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection is not available")
+
+        with tracer.start_as_current_span("db_insert_students_bulk") as span:
+            span.set_attribute("db.system", "mysql")
+            span.set_attribute("db.operation", "INSERT")
+            span.set_attribute("db.sql.table", "students")
+            span.set_attribute("students.count", len(students))
+
+            cursor = connection.cursor()
+            try:
+                ids: List[Optional[int]] = []
+                for start in range(0, len(students), self.BULK_BATCH_SIZE):
+                    ids.extend(self._insert_batch(cursor, students[start : start + self.BULK_BATCH_SIZE]))
+                connection.commit()
+
+                span.set_attribute("students.inserted", sum(1 for i in ids if i is not None))
+                span.set_status(Status(StatusCode.OK))
+                return ids
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                log.error("Failed to bulk insert students", extra={"error": str(e)})
+                raise
+            finally:
+                cursor.close()
+
+    def _insert_batch(self, cursor: Any, batch: Sequence[Student], retry: bool = True) -> List[Optional[int]]:
+        existing = self._ids_by_email(cursor, [s.email for s in batch])
+        fresh = [s for s in batch if s.email.lower() not in existing]
+
+        if fresh:
+            cursor.execute("SAVEPOINT students_bulk")
+            try:
+                cursor.executemany(self.INSERT_SQL, [s.as_insert_tuple() for s in fresh])
+            except Exception as e:
+                if "Duplicate entry" not in str(e):
+                    raise
+                # Lost a race with a concurrent insert: re-check this batch once.
+                cursor.execute("ROLLBACK TO SAVEPOINT students_bulk")
+                if not retry:
+                    raise DuplicateEmailError("Email already exists") from e
+                return self._insert_batch(cursor, batch, retry=False)
+
+        inserted = self._ids_by_email(cursor, [s.email for s in fresh]) if fresh else {}
+        return [None if s.email.lower() in existing else inserted.get(s.email.lower()) for s in batch]
+
+    def _ids_by_email(self, cursor: Any, emails: Sequence[str]) -> dict:
+        if not emails:
+            return {}
+        placeholders = ", ".join(["%s"] * len(emails))
+        sql = self.SELECT_IDS_BY_EMAIL_SQL.format(placeholders=placeholders)  # nosec B608 - placeholders only
+        cursor.execute(sql, tuple(emails))
+        return {email.lower(): student_id for student_id, email in cursor.fetchall()}
+
     # ---------- READ ----------
-    def get_by_id(self, connection: Any, student_id: int) -> Optional[Student]:
+    def get_by_id(self, connection: Any, student_id: int, columns: Sequence[str] = COLUMNS) -> Optional[Student]:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection is not available")
 
@@ -117,15 +200,16 @@ class StudentMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "students")
 
-            cursor = connection.cursor()
+            sql = self.SELECT_BY_ID_SQL.format(columns=", ".join(columns))  # nosec B608 - whitelisted columns
+            cursor = prepared_cursor(connection, sql)
             try:
-                cursor.execute(self.SELECT_BY_ID_SQL, (student_id,))
+                cursor.execute(sql, (student_id,))
                 row = cursor.fetchone()
                 if not row:
                     span.set_status(Status(StatusCode.OK))
                     return None
 
-                student = self._row_to_student(row)
+                student = self._row_to_student(row, columns)
                 span.set_attribute("student.id", student.id)
                 span.set_status(Status(StatusCode.OK))
                 return student
@@ -140,7 +224,44 @@ class StudentMapper:
             finally:
                 cursor.close()
 
-    def list_all(self, connection: Any) -> List[Student]:
+    def get_by_ids(self, connection: Any, student_ids: Sequence[int]) -> List[Student]:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection is not available")
+        if not student_ids:
+            return []
+
+        with tracer.start_as_current_span("db_get_students_by_ids") as span:
+            span.set_attribute("db.system", "mysql")
+            span.set_attribute("db.operation", "SELECT")
+            span.set_attribute("db.sql.table", "students")
+            span.set_attribute("students.requested", len(student_ids))
+
+            cursor = connection.cursor()
+            try:
+                placeholders = ", ".join(["%s"] * len(student_ids))
+                sql = self.SELECT_BY_IDS_SQL.format(placeholders=placeholders)  # nosec B608 - placeholders only
+                cursor.execute(sql, tuple(student_ids))
+                students = [self._row_to_student(row) for row in cursor.fetchall()]
+                span.set_attribute("students.count", len(students))
+                span.set_status(Status(StatusCode.OK))
+                return students
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                log.error("Failed to fetch students by ids", extra={"error": str(e)})
+                raise
+            finally:
+                cursor.close()
+
+    def list_all(
+        self,
+        connection: Any,
+        limit: Optional[int] = None,
+        after: Optional[Sequence[Any]] = None,
+        where: Sequence[str] = (),
+        params: Sequence[Any] = (),
+        columns: Sequence[str] = COLUMNS,
+    ) -> List[Student]:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection is not available")
 
@@ -151,9 +272,9 @@ class StudentMapper:
 
             cursor = connection.cursor()
             try:
-                cursor.execute(self.SELECT_ALL_SQL)
+                cursor.execute(*self._list_query(limit, after, where, params, columns))
                 rows = cursor.fetchall()
-                students = [self._row_to_student(row) for row in rows]
+                students = [self._row_to_student(row, columns) for row in rows]
                 span.set_attribute("students.count", len(students))
                 span.set_status(Status(StatusCode.OK))
                 return students
@@ -165,6 +286,77 @@ class StudentMapper:
             finally:
                 cursor.close()
 
+    def _list_query(
+        self,
+        limit: Optional[int],
+        after: Optional[Sequence[Any]],
+        where: Sequence[str],
+        params: Sequence[Any],
+        columns: Sequence[str],
+    ) -> Tuple[str, List[Any]]:
+        return keyset_query(
+            self.SELECT_ALL_SQL.format(columns=", ".join(columns)),  # nosec B608 - whitelisted columns
+            self.LIST_ORDER,
+            after=after,
+            limit=limit,
+            where=where,
+            params=params,
+        )
+
+    # ---------- READ (async) ----------
+    # Same queries on an aiomysql connection, for the async app (asgi.py)
+    async def get_by_id_async(
+        self, connection: Any, student_id: int, columns: Sequence[str] = COLUMNS
+    ) -> Optional[Student]:
+        with tracer.start_as_current_span("db_get_student_by_id") as span:
+            span.set_attribute("db.system", "mysql")
+            span.set_attribute("db.operation", "SELECT")
+            span.set_attribute("db.sql.table", "students")
+
+            try:
+                async with connection.cursor() as cursor:
+                    sql = self.SELECT_BY_ID_SQL.format(columns=", ".join(columns))  # nosec B608 - whitelisted columns
+                    await cursor.execute(sql, (student_id,))
+                    row = await cursor.fetchone()
+                span.set_status(Status(StatusCode.OK))
+                return self._row_to_student(row, columns) if row else None
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                log.error(
+                    "Failed to fetch student",
+                    extra={"error": str(e), "student.id": student_id},
+                )
+                raise
+
+    async def list_all_async(
+        self,
+        connection: Any,
+        limit: Optional[int] = None,
+        after: Optional[Sequence[Any]] = None,
+        where: Sequence[str] = (),
+        params: Sequence[Any] = (),
+        columns: Sequence[str] = COLUMNS,
+    ) -> List[Student]:
+        with tracer.start_as_current_span("db_list_students") as span:
+            span.set_attribute("db.system", "mysql")
+            span.set_attribute("db.operation", "SELECT")
+            span.set_attribute("db.sql.table", "students")
+
+            try:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(*self._list_query(limit, after, where, params, columns))
+                    rows = await cursor.fetchall()
+                students = [self._row_to_student(row, columns) for row in rows]
+                span.set_attribute("students.count", len(students))
+                span.set_status(Status(StatusCode.OK))
+                return students
+            except Exception as e:
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                log.error("Failed to list students", extra={"error": str(e)})
+                raise
+
     # ---------- UPDATE ----------
     def update(self, connection: Any, student_id: int, student: Student) -> bool:
         if connection is None or not connection.is_connected():
@@ -175,7 +367,7 @@ class StudentMapper:
             span.set_attribute("db.operation", "UPDATE")
             span.set_attribute("db.sql.table", "students")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.UPDATE_SQL)
             try:
                 cursor.execute(self.UPDATE_SQL, student.as_update_tuple(student_id))
                 connection.commit()
@@ -218,7 +410,7 @@ class StudentMapper:
             span.set_attribute("db.operation", "DELETE")
             span.set_attribute("db.sql.table", "students")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.DELETE_SQL)
             try:
                 cursor.execute(self.DELETE_SQL, (student_id,))
                 connection.commit()
@@ -239,13 +431,6 @@ class StudentMapper:
                 cursor.close()
 
     # ---------- helper ----------
-    def _row_to_student(self, row: tuple) -> Student:
-        # SELECT id, first_name, last_name, email, registration_date
-        student_id, first_name, last_name, email, registration_date = row
-        return Student(
-            id=student_id,
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            registration_date=registration_date,
-        )
+    def _row_to_student(self, row: tuple, columns: Sequence[str] = COLUMNS) -> Student:
+        # Unselected columns keep the dataclass defaults
+        return Student(**dict(zip(columns, row)))
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from datetime import date, datetime
 from typing import Any, List, Optional
 
+from db import prepared_cursor
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 
@@ -75,7 +76,7 @@ class WorkplacePlacementMapper:
             span.set_attribute("db.operation", "INSERT")
             span.set_attribute("db.sql.table", "workplace_placements")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.INSERT_SQL)
             try:
                 cursor.execute(
                     self.INSERT_SQL,
@@ -115,7 +116,7 @@ class WorkplacePlacementMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "workplace_placements")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_BY_ID_SQL)
             try:
                 cursor.execute(self.SELECT_BY_ID_SQL, (placement_id,))
                 row = cursor.fetchone()
@@ -147,7 +148,7 @@ class WorkplacePlacementMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "workplace_placements")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_ALL_SQL)
             try:
                 cursor.execute(self.SELECT_ALL_SQL)
                 rows = cursor.fetchall()
@@ -175,7 +176,7 @@ class WorkplacePlacementMapper:
             span.set_attribute("db.operation", "UPDATE")
             span.set_attribute("db.sql.table", "workplace_placements")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.UPDATE_SQL)
             try:
                 cursor.execute(
                     self.UPDATE_SQL,
@@ -216,7 +217,7 @@ class WorkplacePlacementMapper:
             span.set_attribute("db.operation", "DELETE")
             span.set_attribute("db.sql.table", "workplace_placements")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.DELETE_SQL)
             try:
                 cursor.execute(self.DELETE_SQL, (placement_id,))
                 connection.commit()
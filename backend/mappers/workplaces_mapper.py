@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, List, Optional
 
+from db import prepared_cursor
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 
@@ -73,7 +74,7 @@ class WorkplaceMapper:
             span.set_attribute("db.operation", "INSERT")
             span.set_attribute("db.sql.table", "workplaces")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.INSERT_SQL)
             try:
                 cursor.execute(
                     self.INSERT_SQL,
@@ -111,7 +112,7 @@ class WorkplaceMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "workplaces")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_BY_ID_SQL)
             try:
                 cursor.execute(self.SELECT_BY_ID_SQL, (workplace_id,))
                 row = cursor.fetchone()
@@ -143,7 +144,7 @@ class WorkplaceMapper:
             span.set_attribute("db.operation", "SELECT")
             span.set_attribute("db.sql.table", "workplaces")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.SELECT_ALL_SQL)
             try:
                 cursor.execute(self.SELECT_ALL_SQL)
                 rows = cursor.fetchall()
@@ -168,7 +169,7 @@ class WorkplaceMapper:
             span.set_attribute("db.operation", "UPDATE")
             span.set_attribute("db.sql.table", "workplaces")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.UPDATE_SQL)
             try:
                 cursor.execute(
                     self.UPDATE_SQL,
@@ -210,7 +211,7 @@ class WorkplaceMapper:
             span.set_attribute("db.operation", "DELETE")
             span.set_attribute("db.sql.table", "workplaces")
 
-            cursor = connection.cursor()
+            cursor = prepared_cursor(connection, self.DELETE_SQL)
             try:
                 cursor.execute(self.DELETE_SQL, (workplace_id,))
                 connection.commit()
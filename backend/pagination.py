@@ -0,0 +1,196 @@
+# pagination.py
+import base64
+import binascii
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+from flask import request, url_for
+
+DEFAULT_PAGE_SIZE = int(os.getenv("API_DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+
+# ((column, "ASC" | "DESC"), ...) — must match the list query's ORDER BY
+OrderSpec = Sequence[Tuple[str, str]]
+
+
+class InvalidPageRequest(ValueError):
+    """Raised when `limit` or `cursor` query params cannot be used."""
+
+    pass
+
+
+@dataclass
+class PageRequest:
+    limit: int
+    after: Optional[List[Any]] = None
+
+    @property
+    def fetch_size(self) -> int:
+        # One extra row tells us whether another page exists.
+        return self.limit + 1
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError) as e:
+        raise InvalidPageRequest("Invalid cursor") from e
+
+    if not isinstance(values, list) or not values:
+        raise InvalidPageRequest("Invalid cursor")
+    return values
+
+
+def parse_limit(args) -> int:
+    """
+    Read `limit` from request args, defaulting to DEFAULT_PAGE_SIZE and
+    capped at MAX_PAGE_SIZE.
+    """
+    raw_limit = args.get("limit")
+    if raw_limit is None or raw_limit == "":
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw_limit)
+    except ValueError as e:
+        raise InvalidPageRequest("limit must be an integer") from e
+    if limit < 1:
+        raise InvalidPageRequest("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_page_request(args, order: OrderSpec) -> PageRequest:
+    """
+    Read `limit` and `cursor` from request args. `limit` is capped at
+    MAX_PAGE_SIZE; `cursor` must carry one value per ORDER BY key.
+    """
+    limit = parse_limit(args)
+
+    after = None
+    token = args.get("cursor")
+    if token:
+        after = decode_cursor(token)
+        if len(after) != len(order):
+            raise InvalidPageRequest("Invalid cursor")
+
+    return PageRequest(limit=limit, after=after)
+
+
+def keyset_clause(
+    order: OrderSpec,
+    after: Sequence[Any],
+    nullable: Collection[str] = (),
+) -> Tuple[str, List[Any]]:
+    """
+    Build the "rows after this key" predicate for a (possibly mixed
+    direction) ORDER BY. MySQL sorts NULLs first ascending / last descending,
+    so columns listed in `nullable` get the matching IS NULL branches.
+    """
+    branches = []
+    params: List[Any] = []
+
+    for i, (column, direction) in enumerate(order):
+        parts = []
+        branch_params: List[Any] = []
+        for (prev_column, _), prev_value in zip(order[:i], after[:i]):
+            if prev_value is None:
+                parts.append(f"{prev_column} IS NULL")
+            else:
+                parts.append(f"{prev_column} = %s")
+                branch_params.append(prev_value)
+
+        value = after[i]
+        descending = direction.upper() == "DESC"
+        if value is None:
+            if descending:
+                continue  # nothing sorts after NULL
+            parts.append(f"{column} IS NOT NULL")
+        elif descending and column in nullable:
+            parts.append(f"({column} < %s OR {column} IS NULL)")
+            branch_params.append(value)
+        elif descending:
+            parts.append(f"{column} < %s")
+            branch_params.append(value)
+        else:
+            parts.append(f"{column} > %s")
+            branch_params.append(value)
+
+        branches.append("(" + " AND ".join(parts) + ")")
+        params.extend(branch_params)
+
+    if not branches:
+        return "1 = 0", []
+    return "(" + " OR ".join(branches) + ")", params
+
+
+def keyset_query(
+    select_sql: str,
+    order: OrderSpec,
+    after: Optional[Sequence[Any]] = None,
+    limit: Optional[int] = None,
+    where: Sequence[str] = (),
+    params: Sequence[Any] = (),
+    nullable: Collection[str] = (),
+) -> Tuple[str, List[Any]]:
+    """
+    Append WHERE / ORDER BY / LIMIT to a bare `SELECT ... FROM table`.
+    """
+    conditions = list(where)
+    all_params = list(params)
+
+    if after is not None:
+        clause, clause_params = keyset_clause(order, after, nullable)
+        conditions.append(clause)
+        all_params.extend(clause_params)
+
+    sql = select_sql.rstrip()
+    if conditions:
+        sql += "\nWHERE " + " AND ".join(conditions)
+    sql += "\nORDER BY " + ", ".join(f"{column} {direction}" for column, direction in order)
+    if limit is not None:
+        sql += "\nLIMIT %s"
+        all_params.append(limit)
+
+    return sql, all_params
+
+
+def next_page(
+    rows: List[Dict[str, Any]],
+    page: PageRequest,
+    order: OrderSpec,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Trim the look-ahead row: (items, cursor of the next page or None).
+    Serialised rows use the ORDER BY column names as keys.
+    """
+    if len(rows) <= page.limit:
+        return rows, None
+
+    items = rows[: page.limit]
+    return items, encode_cursor([items[-1][column] for column, _ in order])
+
+
+def paginate(
+    rows: List[Dict[str, Any]],
+    page: PageRequest,
+    order: OrderSpec,
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Trim the look-ahead row and build the `Link: <...>; rel="next"` header.
+    """
+    items, cursor = next_page(rows, page, order)
+    if cursor is None:
+        return items, {}
+
+    args = request.args.to_dict()
+    args.update({"cursor": cursor, "limit": page.limit})
+    next_url = url_for(request.endpoint, **(request.view_args or {}), **args, _external=True)
+
+    return items, {"Link": f'<{next_url}>; rel="next"'}
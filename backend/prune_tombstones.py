@@ -0,0 +1,24 @@
+# prune_tombstones.py
+"""
+Delete delta-sync tombstones (deleted_rows) older than
+API_SYNC_TOMBSTONE_RETENTION_DAYS, against the database configured by
+DB_*. Run it daily, e.g. from cron; /changes answers 410 to tokens that
+had not caught up with the tombstones it removed.
+
+    python prune_tombstones.py
+"""
+
+import sys
+
+from repositories.changes_repository import prune_tombstones
+from sync import SYNC_TOMBSTONE_RETENTION_DAYS
+
+
+def main(argv) -> int:
+    deleted = prune_tombstones()
+    print(f"  {deleted} tombstones older than {SYNC_TOMBSTONE_RETENTION_DAYS} days deleted")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
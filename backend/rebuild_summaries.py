@@ -0,0 +1,28 @@
+# rebuild_summaries.py
+"""
+Recompute the attendance / stipend summary tables (V14) from the base
+tables and report how many keys had drifted, against the database
+configured by DB_*. With --check nothing is written; the exit status is 1
+if any summary differs from its base table (e.g. for a scheduled check).
+
+    python rebuild_summaries.py [--check]
+"""
+
+import sys
+
+from repositories.summaries_repository import rebuild_summaries
+
+
+def main(argv) -> int:
+    check_only = "--check" in argv
+    report = rebuild_summaries(check_only=check_only)
+    for table, counts in report.items():
+        if check_only:
+            print(f"  {table:26} {counts['drifted']} drifted keys")
+        else:
+            print(f"  {table:26} {counts['drifted']} drifted keys rebuilt, {counts['after']} after")
+    return 1 if check_only and any(counts["drifted"] for counts in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
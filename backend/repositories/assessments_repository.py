@@ -1,40 +1,54 @@
 # repositories/assessments_repository.py
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
-from db import get_connection
+from db import get_connection, get_read_connection
+from fields import select_columns, select_sql
+from filters import Filter, choice, filter_where, iso_date, positive_int
+from pagination import keyset_query
+from sync import ChangeFeed
+
+from repositories.table_versions_repository import touch_tables
 
 log = logging.getLogger(__name__)
 
+ASSESSMENT_ORDER = (("assessment_date", "DESC"), ("id", "DESC"))
+
+
+ASSESSMENT_FILTERS = {
+    "student_id": Filter("student_id = %s", positive_int),
+    "programme_id": Filter("programme_id = %s", positive_int),
+    "assessment_type": Filter("assessment_type = %s", choice("Formative", "Summative")),
+    "result": Filter("result = %s"),
+    "assessment_date_from": Filter("assessment_date >= %s", iso_date),
+    "assessment_date_to": Filter("assessment_date <= %s", iso_date),
+}
+
+
+# Whitelist for ?fields= (also the SELECT order)
+ASSESSMENT_FIELDS = (
+    "id",
+    "student_id",
+    "programme_id",
+    "assessment_type",
+    "assessment_name",
+    "assessment_date",
+    "score",
+    "max_score",
+    "result",
+    "moderation_outcome",
+    "created_at",
+    "updated_at",
+)
+
+
+def _row_to_assessment(row: tuple, columns: Sequence[str] = ASSESSMENT_FIELDS) -> Dict[str, Any]:
+    # Raw DB values; FastJSONProvider encodes dates and DECIMAL scores
+    return dict(zip(columns, row))
+
 
-def _row_to_assessment(row: tuple) -> Dict[str, Any]:
-    (
-        aid,
-        student_id,
-        programme_id,
-        assessment_type,
-        assessment_name,
-        assessment_date,
-        score,
-        max_score,
-        result,
-        moderation_outcome,
-        created_at,
-    ) = row
-
-    return {
-        "id": aid,
-        "student_id": student_id,
-        "programme_id": programme_id,
-        "assessment_type": assessment_type,
-        "assessment_name": assessment_name,
-        "assessment_date": assessment_date.isoformat() if assessment_date else None,
-        "score": float(score) if score is not None else None,
-        "max_score": float(max_score) if max_score is not None else None,
-        "result": result,
-        "moderation_outcome": moderation_outcome,
-        "created_at": created_at.isoformat() if created_at else None,
-    }
+# GET /assessments/changes
+ASSESSMENT_FEED = ChangeFeed("assessments", ASSESSMENT_FIELDS, _row_to_assessment)
 
 
 # ---------- CREATE ----------
@@ -83,6 +97,7 @@ def create_assessment(
                 moderation_outcome,
             ),
         )
+        touch_tables(connection, "assessments")
         connection.commit()
         new_id = cursor.lastrowid
         cursor.close()
@@ -91,56 +106,42 @@ def create_assessment(
 
 
 # ---------- READ ALL ----------
-def list_assessments() -> List[Dict[str, Any]]:
-    sql = """
-        SELECT
-            id,
-            student_id,
-            programme_id,
-            assessment_type,
-            assessment_name,
-            assessment_date,
-            score,
-            max_score,
-            result,
-            moderation_outcome,
-            created_at
-        FROM assessments
-        ORDER BY assessment_date DESC, id DESC
-    """
-
-    with get_connection() as connection:
+def list_assessments(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    columns = select_columns(ASSESSMENT_FIELDS, fields, ASSESSMENT_ORDER)
+    where, params = filter_where(filters or {}, ASSESSMENT_FILTERS)
+    sql, params = keyset_query(
+        select_sql("assessments", columns),
+        ASSESSMENT_ORDER,
+        after=after,
+        limit=limit,
+        where=where,
+        params=params,
+        nullable={"assessment_date"},
+    )
+
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
-        cursor.execute(sql)
+        cursor.execute(sql, params)
         rows = cursor.fetchall()
         cursor.close()
 
-    return [_row_to_assessment(r) for r in rows]
+    return [_row_to_assessment(r, columns) for r in rows]
 
 
 # ---------- READ ONE ----------
-def get_assessment(assessment_id: int) -> Optional[Dict[str, Any]]:
-    sql = """
-        SELECT
-            id,
-            student_id,
-            programme_id,
-            assessment_type,
-            assessment_name,
-            assessment_date,
-            score,
-            max_score,
-            result,
-            moderation_outcome,
-            created_at
-        FROM assessments
-        WHERE id = %s
-    """
+def get_assessment(assessment_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    columns = select_columns(ASSESSMENT_FIELDS, fields)
+    sql = select_sql("assessments", columns) + "\nWHERE id = %s"
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
@@ -149,7 +150,7 @@ def get_assessment(assessment_id: int) -> Optional[Dict[str, Any]]:
         row = cursor.fetchone()
         cursor.close()
 
-    return _row_to_assessment(row) if row else None
+    return _row_to_assessment(row, columns) if row else None
 
 
 # ---------- UPDATE ----------
@@ -200,6 +201,7 @@ def update_assessment(
                 assessment_id,
             ),
         )
+        touch_tables(connection, "assessments")
         connection.commit()
         updated_rows = cursor.rowcount
         cursor.close()
@@ -220,6 +222,7 @@ def delete_assessment(assessment_id: int) -> bool:
 
         cursor = connection.cursor()
         cursor.execute(sql, (assessment_id,))
+        touch_tables(connection, "assessments")
         connection.commit()
         deleted = cursor.rowcount > 0
         cursor.close()
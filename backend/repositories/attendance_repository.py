@@ -1,22 +1,60 @@
 # repositories/attendance_repository.py
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
-from db import get_connection
+from db import get_connection, get_read_connection
+from fields import select_columns, select_sql
+from filters import Filter, choice, filter_where, iso_date, positive_int
+from pagination import keyset_query
+from streaming import STREAM_BATCH_SIZE
+from sync import ChangeFeed
+
+from repositories.summaries_repository import adjust_attendance_summary
+from repositories.table_versions_repository import touch_tables
 
 log = logging.getLogger(__name__)
 
+ATTENDANCE_STATUSES = ("present", "absent", "late", "excused")
 
-def _row_to_attendance(row: tuple) -> Dict[str, Any]:
-    (aid, student_id, attendance_date, status, created_at) = row
+ATTENDANCE_ORDER = (("attendance_date", "DESC"), ("student_id", "ASC"))
+STUDENT_ATTENDANCE_ORDER = (("attendance_date", "DESC"),)
+
+
+ATTENDANCE_FILTERS = {
+    "student_id": Filter("student_id = %s", positive_int),
+    "status": Filter("status = %s", choice(*ATTENDANCE_STATUSES)),
+    "attendance_date_from": Filter("attendance_date >= %s", iso_date),
+    "attendance_date_to": Filter("attendance_date <= %s", iso_date),
+}
+
+# Whitelist for ?fields= (also the SELECT order)
+ATTENDANCE_FIELDS = ("id", "student_id", "attendance_date", "status", "created_at", "updated_at")
+
+
+class UnknownStudentsError(Exception):
+    """Raised when a register references student ids that do not exist."""
+
+    def __init__(self, student_ids: Sequence[int]):
+        super().__init__(f"Unknown student ids: {sorted(student_ids)}")
+        self.student_ids = sorted(student_ids)
 
-    return {
-        "id": aid,
-        "student_id": student_id,
-        "attendance_date": attendance_date.isoformat() if attendance_date else None,
-        "status": status,
-        "created_at": created_at.isoformat() if created_at else None,
-    }
+
+# Current values of a row about to change, for the summary deltas
+_LOCK_ROW_SQL = """
+    SELECT student_id, attendance_date, status
+    FROM attendance
+    WHERE id = %s
+    FOR UPDATE
+  """
+
+
+def _row_to_attendance(row: tuple, columns: Sequence[str] = ATTENDANCE_FIELDS) -> Dict[str, Any]:
+    # Raw DB values; FastJSONProvider encodes the dates
+    return dict(zip(columns, row))
+
+
+# GET /attendance/changes
+ATTENDANCE_FEED = ChangeFeed("attendance", ATTENDANCE_FIELDS, _row_to_attendance)
 
 
 # ---------- CREATE ----------
@@ -39,19 +77,43 @@ def create_attendance(
 
         cursor = connection.cursor()
         cursor.execute(sql, (student_id, attendance_date, status))
-        connection.commit()
         new_id = cursor.lastrowid
+        adjust_attendance_summary(cursor, [(student_id, attendance_date, status, 1)])
+        touch_tables(connection, "attendance")
+        connection.commit()
         cursor.close()
 
     return new_id
 
 
-# ---------- READ ALL ----------
-def list_attendance() -> List[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id, attendance_date, status, created_at
-    FROM attendance
-    ORDER BY attendance_date DESC, student_id ASC
+# ---------- REGISTER (batch upsert) ----------
+def upsert_attendance_register(
+    attendance_date: str,  # 'YYYY-MM-DD'
+    entries: Sequence[Tuple[int, str]],  # (student_id, status), unique student ids
+) -> Dict[str, int]:
+    """
+    Record one day's register: insert missing rows and update changed
+    statuses with a single INSERT ... ON DUPLICATE KEY UPDATE batch.
+    Returns {"inserted", "updated", "unchanged"} counts.
+    """
+    student_ids = [sid for sid, _ in entries]
+    placeholders = ", ".join(["%s"] * len(student_ids))
+    # Current state for the day. The day's attendance rows (and the gaps
+    # where they are missing) are locked so the counts match what we write;
+    # students are only share-locked, to keep them from being deleted, so
+    # the register does not block other writes to them.
+    current_sql = f"""
+    SELECT s.id, a.status
+    FROM students s
+    LEFT JOIN attendance a ON a.student_id = s.id AND a.attendance_date = %s
+    WHERE s.id IN ({placeholders})
+    FOR UPDATE OF a
+    FOR SHARE OF s
+  """  # nosec B608 - placeholders only
+    upsert_sql = """
+    INSERT INTO attendance (student_id, attendance_date, status)
+    VALUES (%s, %s, %s) AS new
+    ON DUPLICATE KEY UPDATE status = new.status
   """
 
     with get_connection() as connection:
@@ -59,32 +121,156 @@ def list_attendance() -> List[Dict[str, Any]]:
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
-        cursor.execute(sql)
+        try:
+            cursor.execute(current_sql, (attendance_date, *student_ids))
+            current = dict(cursor.fetchall())
+
+            unknown = set(student_ids) - set(current)
+            if unknown:
+                connection.rollback()  # release the locks before the 4xx
+                raise UnknownStudentsError(unknown)
+
+            changes = [(sid, attendance_date, status) for sid, status in entries if current[sid] != status]
+            if changes:
+                cursor.executemany(upsert_sql, changes)
+                adjust_attendance_summary(
+                    cursor,
+                    [(sid, attendance_date, status, 1) for sid, _, status in changes]
+                    + [(sid, attendance_date, current[sid], -1) for sid, _, _ in changes],
+                )
+            touch_tables(connection, "attendance")
+            connection.commit()
+        finally:
+            cursor.close()
+
+    inserted = sum(1 for sid, _ in entries if current[sid] is None)
+    return {
+        "inserted": inserted,
+        "updated": len(changes) - inserted,
+        "unchanged": len(entries) - len(changes),
+    }
+
+
+# ---------- READ ALL ----------
+def list_attendance(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    columns = select_columns(ATTENDANCE_FIELDS, fields, ATTENDANCE_ORDER)
+    where, params = filter_where(filters or {}, ATTENDANCE_FILTERS)
+    sql, params = keyset_query(
+        select_sql("attendance", columns),
+        ATTENDANCE_ORDER,
+        after=after,
+        limit=limit,
+        where=where,
+        params=params,
+    )
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
         rows = cursor.fetchall()
         cursor.close()
 
-    return [_row_to_attendance(r) for r in rows]
+    return [_row_to_attendance(r, columns) for r in rows]
 
 
 # ---------- READ BY STUDENT ----------
-def list_attendance_for_student(student_id: int) -> List[Dict[str, Any]]:
+def list_attendance_for_student(
+    student_id: int,
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+) -> List[Dict[str, Any]]:
+    sql, params = keyset_query(
+        select_sql("attendance", ATTENDANCE_FIELDS),
+        STUDENT_ATTENDANCE_ORDER,
+        after=after,
+        limit=limit,
+        where=["student_id = %s"],
+        params=[student_id],
+    )
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    return [_row_to_attendance(r) for r in rows]
+
+
+# ---------- SUMMARY BY STUDENT ----------
+def summarise_attendance_for_student(student_id: int, since: str) -> Dict[str, Any]:
+    """
+    Count a learner's attendance by status from `since` ('YYYY-MM-DD') on.
+    """
     sql = """
-    SELECT id, student_id, attendance_date, status, created_at
+    SELECT status, COUNT(*)
     FROM attendance
-    WHERE student_id = %s
-    ORDER BY attendance_date DESC
+    WHERE student_id = %s AND attendance_date >= %s
+    GROUP BY status
   """
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
-        cursor.execute(sql, (student_id,))
+        cursor.execute(sql, (student_id, since))
         rows = cursor.fetchall()
         cursor.close()
 
-    return [_row_to_attendance(r) for r in rows]
+    counts = {status: 0 for status in ATTENDANCE_STATUSES}
+    counts.update({status: int(n) for status, n in rows})
+    recorded = sum(counts.values())
+    attended = counts["present"] + counts["late"]
+
+    return {
+        "since": since,
+        "days_recorded": recorded,
+        **counts,
+        "attendance_percentage": round(100.0 * attended / recorded, 2) if recorded else None,
+    }
+
+
+# ---------- STREAM ALL ----------
+def iter_attendance(
+    filters: Optional[Mapping[str, Any]] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    fields: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every matching attendance row without materialising the table:
+    rows are read from an unbuffered (server-side) cursor `batch_size` at a time.
+    """
+    columns = select_columns(ATTENDANCE_FIELDS, fields)
+    where, params = filter_where(filters or {}, ATTENDANCE_FILTERS)
+    sql, params = keyset_query(select_sql("attendance", columns), ATTENDANCE_ORDER, where=where, params=params)
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for r in rows:
+                    yield _row_to_attendance(r, columns)
+        finally:
+            cursor.close()
 
 
 # ---------- UPDATE ----------
@@ -107,9 +293,14 @@ def update_attendance(
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
+        cursor.execute(_LOCK_ROW_SQL, (attendance_id,))
+        old = cursor.fetchone()
         cursor.execute(sql, (student_id, attendance_date, status, attendance_id))
-        connection.commit()
         updated_rows = cursor.rowcount
+        if old:
+            adjust_attendance_summary(cursor, [(*old, -1), (student_id, attendance_date, status, 1)])
+        touch_tables(connection, "attendance")
+        connection.commit()
         cursor.close()
 
     if updated_rows == 0:
@@ -119,14 +310,11 @@ def update_attendance(
 
 
 # ---------- READ ONE ----------
-def get_attendance(attendance_id: int) -> Optional[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id, attendance_date, status, created_at
-    FROM attendance
-    WHERE id = %s
-  """
+def get_attendance(attendance_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    columns = select_columns(ATTENDANCE_FIELDS, fields)
+    sql = select_sql("attendance", columns) + "\nWHERE id = %s"
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
@@ -135,7 +323,7 @@ def get_attendance(attendance_id: int) -> Optional[Dict[str, Any]]:
         row = cursor.fetchone()
         cursor.close()
 
-    return _row_to_attendance(row) if row else None
+    return _row_to_attendance(row, columns) if row else None
 
 
 # ---------- DELETE ----------
@@ -147,9 +335,14 @@ def delete_attendance(attendance_id: int) -> bool:
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
+        cursor.execute(_LOCK_ROW_SQL, (attendance_id,))
+        old = cursor.fetchone()
         cursor.execute(sql, (attendance_id,))
-        connection.commit()
         deleted = cursor.rowcount > 0
+        if deleted:
+            adjust_attendance_summary(cursor, [(*old, -1)])
+        touch_tables(connection, "attendance")
+        connection.commit()
         cursor.close()
 
     return deleted
@@ -0,0 +1,136 @@
+# repositories/changes_repository.py
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from db import get_connection
+from fields import select_sql
+from pagination import keyset_query
+from sync import (
+    SYNC_ORDER,
+    SYNC_SETTLE_SECONDS,
+    SYNC_TOMBSTONE_RETENTION_DAYS,
+    TOMBSTONE_ORDER,
+    ChangeFeed,
+    SyncRequest,
+    SyncTokenExpired,
+)
+
+log = logging.getLogger(__name__)
+
+# (cutoff, retention horizon). Rows and tombstones are stamped when their
+# statement runs, not when it commits: one stamped before the start of a
+# transaction still open may yet appear, so pages stop short of it.
+# Needs the PROCESS privilege.
+_CUTOFF_SQL = """
+    SELECT
+        LEAST(NOW(6), COALESCE(MIN(trx_started), NOW(6))) - INTERVAL %s MICROSECOND,
+        NOW(6) - INTERVAL %s DAY
+    FROM information_schema.innodb_trx
+    WHERE trx_mysql_thread_id <> CONNECTION_ID()
+"""
+
+_TOMBSTONES_SELECT = "SELECT id, row_id, deleted_at\nFROM deleted_rows"
+
+_PRUNE_SQL = """
+    DELETE FROM deleted_rows
+    WHERE deleted_at < NOW(6) - INTERVAL %s DAY
+    ORDER BY deleted_at
+    LIMIT %s
+"""
+
+
+# ---------- READ ----------
+def list_changes(feed: ChangeFeed, sync: SyncRequest) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], datetime]:
+    """
+    Rows of `feed.table` created/updated after `sync.after` and its
+    tombstones after `sync.deleted_after`, each up to `sync.fetch_size`,
+    plus the time up to which both are complete (pass all three to
+    sync.changes_page). Raises SyncTokenExpired when tombstones the token
+    has not seen may have been pruned.
+    """
+    settle = int(SYNC_SETTLE_SECONDS * 1_000_000)
+    row_to_dict = feed.row_to_dict or (lambda row: dict(zip(feed.columns, row)))
+
+    # Primary only: the cutoff does not cover replica lag, and a row
+    # replicated late would fall behind a watermark already handed out.
+    with get_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        # Ends any read view opened earlier in the request, so the reads
+        # below see every transaction that had committed by the cutoff
+        connection.rollback()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(_CUTOFF_SQL, (settle, SYNC_TOMBSTONE_RETENTION_DAYS))
+            cutoff, horizon = cursor.fetchone()
+            if sync.deleted_after is not None and sync.deleted_after[0] < horizon:
+                raise SyncTokenExpired("since token has expired; start again without since")
+
+            sql, params = keyset_query(
+                select_sql(feed.table, feed.columns),
+                SYNC_ORDER,
+                after=sync.after,
+                limit=sync.fetch_size,
+                where=["updated_at <= %s"],
+                params=[cutoff],
+            )
+            cursor.execute(sql, params)
+            rows = [row_to_dict(r) for r in cursor.fetchall()]
+
+            # A full sync has no rows to delete yet
+            tombstones = []
+            if sync.deleted_after is not None:
+                deleted_at, seq = sync.deleted_after
+                where = ["table_name = %s", "deleted_at <= %s"]
+                if seq is None:
+                    where.append("deleted_at > %s")  # every tombstone up to deleted_at was seen
+                sql, params = keyset_query(
+                    _TOMBSTONES_SELECT,
+                    TOMBSTONE_ORDER,
+                    after=None if seq is None else sync.deleted_after,
+                    limit=sync.fetch_size,
+                    where=where,
+                    params=[feed.table, cutoff] + ([deleted_at] if seq is None else []),
+                )
+                cursor.execute(sql, params)
+                tombstones = [
+                    {"seq": seq, "id": row_id, "deleted_at": deleted_at}
+                    for seq, row_id, deleted_at in cursor.fetchall()
+                ]
+        finally:
+            cursor.close()
+
+    return rows, tombstones, cutoff
+
+
+# ---------- RETENTION ----------
+def prune_tombstones(retention_days: int = SYNC_TOMBSTONE_RETENTION_DAYS, batch_size: int = 10000) -> int:
+    """
+    Delete tombstones older than `retention_days`, `batch_size` rows per
+    transaction so deleted_rows is never locked for long. Returns the
+    number deleted.
+    """
+    deleted = 0
+    with get_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        try:
+            while True:
+                cursor.execute(_PRUNE_SQL, (retention_days, batch_size))
+                count = cursor.rowcount
+                connection.commit()
+                deleted += count
+                if count < batch_size:
+                    break
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    log.info("Tombstones pruned", extra={"sync.tombstones_pruned": deleted, "sync.retention_days": retention_days})
+    return deleted
@@ -1,92 +1,201 @@
+# repositories/documents_repository.py
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
-log = logging.getLogger(__name__)
+from db import get_connection, get_read_connection
+from fields import select_columns, select_sql
+from filters import Filter, filter_where, positive_int
+from pagination import keyset_query
+from sync import ChangeFeed
 
-# NOTE:
-# This is a placeholder implementation so that `main.py` can import
-# the document repository functions without crashing.
-# Replace the bodies with real DB code once you're ready.
+from repositories.table_versions_repository import touch_tables
 
+log = logging.getLogger(__name__)
 
-def list_documents() -> List[Dict[str, Any]]:
-    """
-    Return all documents in the system.
+DOCUMENT_ORDER = (("id", "DESC"),)
 
-    Placeholder implementation: returns an empty list and logs a warning.
-    """
-    log.warning("list_documents() called, but documents_repository is not implemented yet.")
-    return []
 
+DOCUMENT_FILTERS = {
+    "student_id": Filter("student_id = %s", positive_int),
+    "document_type": Filter("document_type = %s"),
+}
 
-def list_documents_for_student(student_id: int) -> List[Dict[str, Any]]:
-    """
-    Return all documents for a given student.
+# Whitelist for ?fields= (also the SELECT order)
+DOCUMENT_FIELDS = (
+    "id",
+    "student_id",
+    "document_name",
+    "document_type",
+    "file_path",
+    "uploaded_by",
+    "uploaded_at",
+    "updated_at",
+)
 
-    Placeholder implementation: returns an empty list and logs a warning.
-    """
-    log.warning(
-        "list_documents_for_student(%s) called, but documents_repository is not implemented yet.",
-        student_id,
-    )
-    return []
+_UPDATABLE_FIELDS = ("student_id", "document_name", "document_type", "file_path", "uploaded_by")
 
 
-def get_document(document_id: int) -> Optional[Dict[str, Any]]:
-    """
-    Return a single document by ID, or None if not found.
+def _row_to_document(row: tuple, columns: Sequence[str] = DOCUMENT_FIELDS) -> Dict[str, Any]:
+    # Raw DB values; FastJSONProvider encodes the dates
+    return dict(zip(columns, row))
 
-    Placeholder implementation: always returns None.
-    """
-    log.warning(
-        "get_document(%s) called, but documents_repository is not implemented yet.",
-        document_id,
-    )
-    return None
 
+# GET /documents/changes
+DOCUMENT_FEED = ChangeFeed("documents", DOCUMENT_FIELDS, _row_to_document)
 
+
+# ---------- CREATE ----------
 def create_document(
     student_id: int,
-    document_type: str,
-    file_name: str,
+    document_name: str,
     file_path: str,
-    description: Optional[str] = None,
+    document_type: Optional[str] = None,
+    uploaded_by: Optional[str] = None,
 ) -> int:
     """
-    Create a new document record and return its ID.
-
-    Placeholder implementation: logs and raises NotImplementedError so you
-    don't accidentally rely on it in production.
+    Insert a document row and return its ID.
     """
-    log.error("create_document(...) called, but documents_repository is not implemented yet.")
-    raise NotImplementedError("create_document is not implemented yet.")
+    sql = """
+    INSERT INTO documents (student_id, document_name, document_type, file_path, uploaded_by)
+    VALUES (%s, %s, %s, %s, %s)
+  """
+
+    with get_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        cursor.execute(sql, (student_id, document_name, document_type, file_path, uploaded_by))
+        touch_tables(connection, "documents")
+        connection.commit()
+        new_id = cursor.lastrowid
+        cursor.close()
+
+    return new_id
+
+
+# ---------- READ ALL ----------
+def list_documents(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    columns = select_columns(DOCUMENT_FIELDS, fields, DOCUMENT_ORDER)
+    where, params = filter_where(filters or {}, DOCUMENT_FILTERS)
+    sql, params = keyset_query(
+        select_sql("documents", columns),
+        DOCUMENT_ORDER,
+        after=after,
+        limit=limit,
+        where=where,
+        params=params,
+    )
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    return [_row_to_document(r, columns) for r in rows]
+
+
+# ---------- READ BY STUDENT ----------
+def list_documents_for_student(
+    student_id: int,
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+) -> List[Dict[str, Any]]:
+    sql, params = keyset_query(
+        select_sql("documents", DOCUMENT_FIELDS),
+        DOCUMENT_ORDER,
+        after=after,
+        limit=limit,
+        where=["student_id = %s"],
+        params=[student_id],
+    )
 
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
 
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    return [_row_to_document(r) for r in rows]
+
+
+# ---------- READ ONE ----------
+def get_document(document_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    columns = select_columns(DOCUMENT_FIELDS, fields)
+    sql = select_sql("documents", columns) + "\nWHERE id = %s"
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        cursor.execute(sql, (document_id,))
+        row = cursor.fetchone()
+        cursor.close()
+
+    return _row_to_document(row, columns) if row else None
+
+
+# ---------- UPDATE ----------
 def update_document(
     document_id: int,
     **fields: Any,
 ) -> Optional[Dict[str, Any]]:
     """
-    Update an existing document. Returns the updated document or None.
-
-    Placeholder implementation: logs and raises NotImplementedError.
+    Update the given columns of a document. Returns the updated document or None.
     """
-    log.error(
-        "update_document(%s, %s) called, but documents_repository is not implemented yet.",
-        document_id,
-        fields,
-    )
-    raise NotImplementedError("update_document is not implemented yet.")
+    unknown = set(fields) - set(_UPDATABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown document fields: {sorted(unknown)}")
+    if not fields:
+        return get_document(document_id)
 
+    columns = [c for c in _UPDATABLE_FIELDS if c in fields]
+    assignments = ", ".join(f"{c} = %s" for c in columns)
+    sql = f"UPDATE documents SET {assignments} WHERE id = %s"  # nosec B608 - whitelisted columns
 
+    with get_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        cursor.execute(sql, (*[fields[c] for c in columns], document_id))
+        touch_tables(connection, "documents")
+        connection.commit()
+        updated_rows = cursor.rowcount
+        cursor.close()
+
+    if updated_rows == 0:
+        return None
+
+    return get_document(document_id)
+
+
+# ---------- DELETE ----------
 def delete_document(document_id: int) -> bool:
-    """
-    Delete a document by ID. Returns True if something was deleted.
+    sql = "DELETE FROM documents WHERE id = %s"
 
-    Placeholder implementation: logs and raises NotImplementedError.
-    """
-    log.error(
-        "delete_document(%s) called, but documents_repository is not implemented yet.",
-        document_id,
-    )
-    raise NotImplementedError("delete_document is not implemented yet.")
+    with get_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        cursor.execute(sql, (document_id,))
+        touch_tables(connection, "documents")
+        connection.commit()
+        deleted = cursor.rowcount > 0
+        cursor.close()
+
+    return deleted
@@ -1,32 +1,51 @@
 # repositories/enrolments_repository.py
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
-from db import get_connection
+from db import get_connection, get_read_connection
+from fields import select_columns, select_sql
+from filters import Filter, choice, filter_where, iso_date, positive_int
+from pagination import keyset_query
+from sync import ChangeFeed
+
+from repositories.table_versions_repository import touch_tables
 
 log = logging.getLogger(__name__)
 
+ENROLMENT_STATUSES = ("applied", "enrolled", "completed", "withdrawn")
+
+ENROLMENT_ORDER = (("id", "DESC"),)
+
+
+ENROLMENT_FILTERS = {
+    "student_id": Filter("student_id = %s", positive_int),
+    "programme_id": Filter("programme_id = %s", positive_int),
+    "enrolment_status": Filter("enrolment_status = %s", choice(*ENROLMENT_STATUSES)),
+    "enrolment_date_from": Filter("enrolment_date >= %s", iso_date),
+    "enrolment_date_to": Filter("enrolment_date <= %s", iso_date),
+}
+
+
+# Whitelist for ?fields= (also the SELECT order)
+ENROLMENT_FIELDS = (
+    "id",
+    "student_id",
+    "programme_id",
+    "enrolment_status",
+    "enrolment_date",
+    "completion_date",
+    "created_at",
+    "updated_at",
+)
+
+
+def _row_to_enrolment(row: tuple, columns: Sequence[str] = ENROLMENT_FIELDS) -> Dict[str, Any]:
+    # Raw DB values; FastJSONProvider encodes the dates
+    return dict(zip(columns, row))
+
 
-def _row_to_enrolment(row: tuple) -> Dict[str, Any]:
-    (
-        eid,
-        student_id,
-        programme_id,
-        enrolment_status,
-        enrolment_date,
-        completion_date,
-        created_at,
-    ) = row
-
-    return {
-        "id": eid,
-        "student_id": student_id,
-        "programme_id": programme_id,
-        "enrolment_status": enrolment_status,
-        "enrolment_date": enrolment_date.isoformat() if enrolment_date else None,
-        "completion_date": completion_date.isoformat() if completion_date else None,
-        "created_at": created_at.isoformat() if created_at else None,
-    }
+# GET /enrolments/changes
+ENROLMENT_FEED = ChangeFeed("enrolments", ENROLMENT_FIELDS, _row_to_enrolment)
 
 
 # ---------- CREATE ----------
@@ -60,6 +79,7 @@ def create_enrolment(
             sql,
             (student_id, programme_id, enrolment_status, enrolment_date, completion_date),
         )
+        touch_tables(connection, "enrolments")
         connection.commit()
         new_id = cursor.lastrowid
         cursor.close()
@@ -68,36 +88,41 @@ def create_enrolment(
 
 
 # ---------- READ ALL ----------
-def list_enrolments() -> List[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id, programme_id,
-           enrolment_status, enrolment_date, completion_date, created_at
-    FROM enrolments
-    ORDER BY id DESC
-  """
+def list_enrolments(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    columns = select_columns(ENROLMENT_FIELDS, fields, ENROLMENT_ORDER)
+    where, params = filter_where(filters or {}, ENROLMENT_FILTERS)
+    sql, params = keyset_query(
+        select_sql("enrolments", columns),
+        ENROLMENT_ORDER,
+        after=after,
+        limit=limit,
+        where=where,
+        params=params,
+    )
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
-        cursor.execute(sql)
+        cursor.execute(sql, params)
         rows = cursor.fetchall()
         cursor.close()
 
-    return [_row_to_enrolment(r) for r in rows]
+    return [_row_to_enrolment(r, columns) for r in rows]
 
 
 # ---------- READ ONE ----------
-def get_enrolment(enrolment_id: int) -> Optional[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id, programme_id,
-           enrolment_status, enrolment_date, completion_date, created_at
-    FROM enrolments
-    WHERE id = %s
-  """
+def get_enrolment(enrolment_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    columns = select_columns(ENROLMENT_FIELDS, fields)
+    sql = select_sql("enrolments", columns) + "\nWHERE id = %s"
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
@@ -106,7 +131,7 @@ def get_enrolment(enrolment_id: int) -> Optional[Dict[str, Any]]:
         row = cursor.fetchone()
         cursor.close()
 
-    return _row_to_enrolment(row) if row else None
+    return _row_to_enrolment(row, columns) if row else None
 
 
 # ---------- UPDATE ----------
@@ -144,6 +169,7 @@ def update_enrolment(
                 enrolment_id,
             ),
         )
+        touch_tables(connection, "enrolments")
         connection.commit()
         updated_rows = cursor.rowcount
         cursor.close()
@@ -164,6 +190,7 @@ def delete_enrolment(enrolment_id: int) -> bool:
 
         cursor = connection.cursor()
         cursor.execute(sql, (enrolment_id,))
+        touch_tables(connection, "enrolments")
         connection.commit()
         deleted = cursor.rowcount > 0
         cursor.close()
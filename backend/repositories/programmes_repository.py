@@ -1,11 +1,55 @@
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import os
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
 
-from db import create_db_connection
+from cache import CacheBackend, RedisCache, TTLCache, read_through
+from db import after_commit, get_connection, in_transaction
+from filters import Filter, boolean, filter_where, positive_int
 from mysql.connector import Error as MySQLError
+from pagination import keyset_query
+from sync import ChangeFeed
+
+from repositories.table_versions_repository import read_table_versions, touch_tables
 
 log = logging.getLogger(__name__)
 
+# Read-through cache for the catalogue (changes a few times a term). Entries
+# are keyed by the programmes table version, itself cached for
+# PROGRAMME_VERSION_TTL seconds and dropped by each write once it commits,
+# so a hit costs no DB read; the TTL bounds how long superseded entries linger.
+PROGRAMME_CACHE_TTL = float(os.getenv("PROGRAMME_CACHE_TTL", "300"))
+PROGRAMME_CACHE_SIZE = int(os.getenv("PROGRAMME_CACHE_SIZE", "256"))
+# Longest a worker serves a version another worker (without a shared cache)
+# or plain SQL has moved on from
+PROGRAMME_VERSION_TTL = float(os.getenv("PROGRAMME_VERSION_TTL", "5"))
+# Optional shared cache so workers reuse each other's entries and see each
+# other's invalidations at once
+PROGRAMME_CACHE_URL = os.getenv("PROGRAMME_CACHE_URL", "").strip()
+
+PROGRAMME_ORDER = (("programme_name", "ASC"), ("id", "ASC"))
+
+
+PROGRAMME_FILTERS = {
+    "programme_code": Filter("programme_code = %s"),
+    "nqf_level": Filter("nqf_level = %s", positive_int),
+    "is_active": Filter("is_active = %s", boolean),
+}
+
+# Whitelist for ?fields=. Programmes are cached whole and narrowed per
+# request, so one cached row serves every field selection.
+PROGRAMME_FIELDS = (
+    "id",
+    "programme_code",
+    "programme_name",
+    "nqf_level",
+    "credits",
+    "description",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+
 
 class ProgrammeCodeAlreadyExistsError(Exception):
     """Raised when trying to create/update a programme with a duplicate code."""
@@ -27,6 +71,7 @@ def _row_to_dict(row) -> Dict[str, Any]:
         description,
         is_active,
         created_at,
+        updated_at,
     ) = row
 
     return {
@@ -37,90 +82,260 @@ def _row_to_dict(row) -> Dict[str, Any]:
         "credits": credits,
         "description": description,
         "is_active": bool(is_active),
-        "created_at": created_at.isoformat() if created_at else None,
+        "created_at": created_at,
+        "updated_at": updated_at,
     }
 
 
+# GET /programmes/changes (read from the table, not the cache)
+PROGRAMME_FEED = ChangeFeed("programmes", PROGRAMME_FIELDS, _row_to_dict)
+
+
 # ---------------------------------------------------------------------
-# CRUD helpers
+# Cache
 # ---------------------------------------------------------------------
 
 
-def list_programmes() -> List[Dict[str, Any]]:
+def _default_cache() -> CacheBackend:
+    if PROGRAMME_CACHE_URL:
+        return RedisCache(PROGRAMME_CACHE_URL, namespace="programmes", ttl=PROGRAMME_CACHE_TTL)
+    return TTLCache(maxsize=PROGRAMME_CACHE_SIZE, ttl=PROGRAMME_CACHE_TTL)
+
+
+_cache: CacheBackend = _default_cache()
+_VERSION_KEY = "version"
+
+
+def configure_cache(backend: CacheBackend) -> None:
     """
-    Return all programmes as a list of dicts.
+    Swap the programmes cache backend (e.g. a shared RedisCache).
     """
-    conn = None
-    cursor = None
-    try:
-        conn = create_db_connection()
-        cursor = conn.cursor()
+    global _cache
+    _cache = backend
 
-        query = """
-            SELECT
-                id,
-                programme_code,
-                programme_name,
-                nqf_level,
-                credits,
-                description,
-                is_active,
-                created_at
-            FROM programmes
-            ORDER BY programme_name ASC
-        """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        return [_row_to_dict(row) for row in rows]
-
-    except MySQLError:
-        log.exception("Error listing programmes from DB")
-        raise
-    finally:
-        if cursor:
+
+def _version() -> Optional[int]:
+    """
+    Version of the programmes table (V11) the cache keys carry. Served from
+    the cache and read from table_versions at most every
+    PROGRAMME_VERSION_TTL seconds, or after invalidate_cache(). None (do not
+    cache) inside a transaction() block, whose own uncommitted writes the
+    version does not cover yet, or when the version is unavailable.
+    """
+    if in_transaction():
+        return None
+
+    version = _cache.get(_VERSION_KEY)
+    if version is not None:
+        return version
+
+    # Read before the data, so an entry is never filed under a newer
+    # version than its rows
+    with get_connection() as conn:
+        if conn is None or not conn.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = conn.cursor()
+        try:
+            versions = read_table_versions(cursor, ("programmes",))
+        finally:
             cursor.close()
-        if conn:
-            conn.close()
+
+    if "programmes" not in versions:
+        return None
+    version = versions["programmes"][0]
+    _cache.set(_VERSION_KEY, version, ttl=PROGRAMME_VERSION_TTL)
+    return version
+
+
+def invalidate_cache() -> None:
+    """
+    Drop the cached version, so the next read picks up the one a write just
+    committed (and new keys with it). Called by the write helpers through
+    after_commit().
+    """
+    _cache.delete(_VERSION_KEY)
+
+
+def _cached(key: str, load: Callable[[], Any]) -> Any:
+    """read_through() under `key` plus the current programmes version."""
+    version = _version()
+    if version is None:
+        return load()
+    return read_through("programmes", _cache, f"{key}:v{version}", load)
+
+
+# ---------------------------------------------------------------------
+# CRUD helpers
+# ---------------------------------------------------------------------
+# Reads stay on the primary (get_connection), where writes bump the
+# version the cache keys carry. Every write drops the cached version once
+# it commits.
+
+
+def list_programmes(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Return programmes as a list of dicts, ordered by name. Pass `limit` and
+    the previous page's last (programme_name, id) as `after` to page through.
+    Served from the read-through cache when possible.
+    """
+    key = "list:" + json.dumps([limit, after, filters or {}], sort_keys=True, default=str)
+    return _cached(key, lambda: _query_programmes(limit, after, filters))
 
 
 def get_programme(programme_id: int) -> Optional[Dict[str, Any]]:
     """
-    Fetch a single programme by ID.
+    Fetch a single programme by ID (cached).
     Returns dict or None.
     """
-    conn = None
+    return _cached(f"get:{programme_id}", lambda: _fetch_programme(programme_id))
+
+
+def get_programmes_by_ids(programme_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Batch lookup for embedding: {id: programme}. Cached programmes are
+    reused; the rest are loaded with one IN (...) query and cached.
+    """
+    version = _version()
+    if version is None:
+        return {programme["id"]: programme for programme in _fetch_programmes(programme_ids)}
+
+    found: Dict[int, Dict[str, Any]] = {}
+    missing = []
+    for pid in programme_ids:
+        cached = _cache.get(f"get:{pid}:v{version}")
+        if cached is not None:
+            found[pid] = cached
+        else:
+            missing.append(pid)
+
+    if missing:
+        for programme in _fetch_programmes(missing):
+            _cache.set(f"get:{programme['id']}:v{version}", programme)
+            found[programme["id"]] = programme
+    return found
+
+
+def _query_programmes(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+) -> List[Dict[str, Any]]:
     cursor = None
-    try:
-        conn = create_db_connection()
-        cursor = conn.cursor()
+    with get_connection() as conn:
+        if conn is None or not conn.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        try:
+            cursor = conn.cursor()
+
+            where, params = filter_where(filters or {}, PROGRAMME_FILTERS)
+            query, params = keyset_query(
+                """
+                SELECT
+                    id,
+                    programme_code,
+                    programme_name,
+                    nqf_level,
+                    credits,
+                    description,
+                    is_active,
+                    created_at,
+                    updated_at
+                FROM programmes
+                """,
+                PROGRAMME_ORDER,
+                after=after,
+                limit=limit,
+                where=where,
+                params=params,
+            )
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return [_row_to_dict(row) for row in rows]
 
-        query = """
-            SELECT
-                id,
-                programme_code,
-                programme_name,
-                nqf_level,
-                credits,
-                description,
-                is_active,
-                created_at
-            FROM programmes
-            WHERE id = %s
-        """
-        cursor.execute(query, (programme_id,))
-        row = cursor.fetchone()
-        if not row:
-            return None
-        return _row_to_dict(row)
+        except MySQLError:
+            log.exception("Error listing programmes from DB")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
 
-    except MySQLError:
-        log.exception("Error fetching programme id=%s", programme_id)
-        raise
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+def _fetch_programme(programme_id: int) -> Optional[Dict[str, Any]]:
+    cursor = None
+    with get_connection() as conn:
+        if conn is None or not conn.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        try:
+            cursor = conn.cursor()
+
+            query = """
+                SELECT
+                    id,
+                    programme_code,
+                    programme_name,
+                    nqf_level,
+                    credits,
+                    description,
+                    is_active,
+                    created_at,
+                    updated_at
+                FROM programmes
+                WHERE id = %s
+            """
+            cursor.execute(query, (programme_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return _row_to_dict(row)
+
+        except MySQLError:
+            log.exception("Error fetching programme id=%s", programme_id)
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+
+
+def _fetch_programmes(programme_ids: Sequence[int]) -> List[Dict[str, Any]]:
+    cursor = None
+    with get_connection() as conn:
+        if conn is None or not conn.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        try:
+            cursor = conn.cursor()
+
+            placeholders = ", ".join(["%s"] * len(programme_ids))
+            query = f"""
+                SELECT
+                    id,
+                    programme_code,
+                    programme_name,
+                    nqf_level,
+                    credits,
+                    description,
+                    is_active,
+                    created_at,
+                    updated_at
+                FROM programmes
+                WHERE id IN ({placeholders})
+            """  # nosec B608 - placeholders only
+            cursor.execute(query, tuple(programme_ids))
+            return [_row_to_dict(row) for row in cursor.fetchall()]
+
+        except MySQLError:
+            log.exception("Error fetching programmes by id")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
 
 
 def _ensure_unique_code(conn, programme_code: str, exclude_id: Optional[int] = None):
@@ -165,52 +380,55 @@ def create_programme(
     """
     Insert a new programme and return its new ID.
     """
-    conn = None
     cursor = None
-    try:
-        conn = create_db_connection()
+    with get_connection() as conn:
+        if conn is None or not conn.is_connected():
+            raise RuntimeError("DB connection failed")
 
-        # Check uniqueness of programme_code
-        _ensure_unique_code(conn, programme_code)
+        try:
+            # Check uniqueness of programme_code
+            _ensure_unique_code(conn, programme_code)
 
-        cursor = conn.cursor()
-        query = """
-            INSERT INTO programmes (
-                programme_code,
-                programme_name,
-                nqf_level,
-                credits,
-                description,
-                is_active
+            cursor = conn.cursor()
+            query = """
+                INSERT INTO programmes (
+                    programme_code,
+                    programme_name,
+                    nqf_level,
+                    credits,
+                    description,
+                    is_active
+                )
+                VALUES (%s, %s, %s, %s, %s, 1)
+            """
+            cursor.execute(
+                query,
+                (
+                    programme_code,
+                    programme_name,
+                    nqf_level,
+                    credits,
+                    description,
+                ),
             )
-            VALUES (%s, %s, %s, %s, %s, 1)
-        """
-        cursor.execute(
-            query,
-            (
-                programme_code,
-                programme_name,
-                nqf_level,
-                credits,
-                description,
-            ),
-        )
-        conn.commit()
-        return cursor.lastrowid
-
-    except ProgrammeCodeAlreadyExistsError:
-        # Let the caller handle this explicitly
-        raise
-    except MySQLError:
-        log.exception("Error creating programme in DB")
-        if conn:
+            touch_tables(conn, "programmes")
+            conn.commit()
+            after_commit(invalidate_cache)
+            return cursor.lastrowid
+
+        except ProgrammeCodeAlreadyExistsError:
+            # Let the caller handle this explicitly
+            raise
+        except MySQLError as e:
             conn.rollback()
-        raise
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+            if "Duplicate entry" in str(e):
+                # Lost a race with a concurrent create (uq_programmes_code)
+                raise ProgrammeCodeAlreadyExistsError(f"Programme code '{programme_code}' already exists") from e
+            log.exception("Error creating programme in DB")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
 
 
 def update_programme(
@@ -224,56 +442,59 @@ def update_programme(
     """
     Update an existing programme. Returns updated dict, or None if not found.
     """
-    conn = None
     cursor = None
-    try:
-        conn = create_db_connection()
+    with get_connection() as conn:
+        if conn is None or not conn.is_connected():
+            raise RuntimeError("DB connection failed")
 
-        # Ensure code uniqueness (excluding this programme)
-        _ensure_unique_code(conn, programme_code, exclude_id=programme_id)
+        try:
+            # Ensure code uniqueness (excluding this programme)
+            _ensure_unique_code(conn, programme_code, exclude_id=programme_id)
 
-        cursor = conn.cursor()
-        query = """
-            UPDATE programmes
-            SET
-                programme_code = %s,
-                programme_name = %s,
-                nqf_level = %s,
-                credits = %s,
-                description = %s
-            WHERE id = %s
-        """
-        cursor.execute(
-            query,
-            (
-                programme_code,
-                programme_name,
-                nqf_level,
-                credits,
-                description,
-                programme_id,
-            ),
-        )
-        conn.commit()
-
-        if cursor.rowcount == 0:
-            # No rows updated => not found
-            return None
-
-        return get_programme(programme_id)
-
-    except ProgrammeCodeAlreadyExistsError:
-        raise
-    except MySQLError:
-        log.exception("Error updating programme id=%s", programme_id)
-        if conn:
+            cursor = conn.cursor()
+            query = """
+                UPDATE programmes
+                SET
+                    programme_code = %s,
+                    programme_name = %s,
+                    nqf_level = %s,
+                    credits = %s,
+                    description = %s
+                WHERE id = %s
+            """
+            cursor.execute(
+                query,
+                (
+                    programme_code,
+                    programme_name,
+                    nqf_level,
+                    credits,
+                    description,
+                    programme_id,
+                ),
+            )
+            touch_tables(conn, "programmes")
+            conn.commit()
+            after_commit(invalidate_cache)
+
+            if cursor.rowcount == 0:
+                # No rows updated => not found
+                return None
+
+            # Read past the cache: the version may not cover an open transaction's write
+            return _fetch_programme(programme_id)
+
+        except ProgrammeCodeAlreadyExistsError:
+            raise
+        except MySQLError as e:
             conn.rollback()
-        raise
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+            if "Duplicate entry" in str(e):
+                raise ProgrammeCodeAlreadyExistsError(f"Programme code '{programme_code}' already exists") from e
+            log.exception("Error updating programme id=%s", programme_id)
+            raise
+        finally:
+            if cursor:
+                cursor.close()
 
 
 def delete_programme(programme_id: int) -> bool:
@@ -281,25 +502,26 @@ def delete_programme(programme_id: int) -> bool:
     Delete a programme by ID.
     Returns True if deleted, False if not found.
     """
-    conn = None
     cursor = None
-    try:
-        conn = create_db_connection()
-        cursor = conn.cursor()
+    with get_connection() as conn:
+        if conn is None or not conn.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        try:
+            cursor = conn.cursor()
 
-        query = "DELETE FROM programmes WHERE id = %s"
-        cursor.execute(query, (programme_id,))
-        conn.commit()
+            query = "DELETE FROM programmes WHERE id = %s"
+            cursor.execute(query, (programme_id,))
+            touch_tables(conn, "programmes", "assessments")  # assessments cascade
+            conn.commit()
+            after_commit(invalidate_cache)
 
-        return cursor.rowcount > 0
+            return cursor.rowcount > 0
 
-    except MySQLError:
-        log.exception("Error deleting programme id=%s", programme_id)
-        if conn:
+        except MySQLError:
+            log.exception("Error deleting programme id=%s", programme_id)
             conn.rollback()
-        raise
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+            raise
+        finally:
+            if cursor:
+                cursor.close()
@@ -0,0 +1,315 @@
+# repositories/reports_repository.py
+import json
+import logging
+import os
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cache import CacheBackend, RedisCache, TTLCache, read_through
+from db import get_read_connection
+from filters import Filter, InvalidFilter, year_month
+
+from repositories.enrolments_repository import ENROLMENT_STATUSES
+from repositories.stipends_repository import STIPEND_STATUSES
+from repositories.summaries_repository import SUMMARY_STATUSES
+from repositories.table_versions_repository import read_table_versions
+
+log = logging.getLogger(__name__)
+
+# Short-lived cache. Entries are keyed by the versions of the tables they
+# were computed from, so a write to any of them is never served stale;
+# the TTL bounds how long superseded entries linger.
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "60"))
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "128"))
+REPORT_CACHE_URL = os.getenv("REPORT_CACHE_URL", "").strip()
+
+# Attendance / stipend window when ?month_from / ?month_to are not given
+REPORT_DEFAULT_MONTHS = int(os.getenv("REPORT_DEFAULT_MONTHS", "12"))
+
+# Tables the reports read (also their conditional-GET dependencies)
+REPORT_TABLES = ("programmes", "enrolments", "assessments", "attendance", "stipends")
+
+# Parsed only: the period is applied to attendance and stipends by _aggregate()
+REPORT_FILTERS = {
+    "month_from": Filter("", year_month),
+    "month_to": Filter("", year_month),
+}
+
+# Attendance and stipends belong to learners, not programmes: a programme's
+# learners are the students whose enrolment in it got past the application
+_LEARNERS_SQL = """
+    SELECT DISTINCT programme_id, student_id
+    FROM enrolments
+    WHERE enrolment_status IN ('enrolled', 'completed', 'withdrawn'){scope}
+"""
+
+_PROGRAMMES_SQL = """
+    SELECT id, programme_code, programme_name, is_active
+    FROM programmes{scope}
+    ORDER BY programme_name, id
+"""
+
+_ENROLMENTS_SQL = """
+    SELECT programme_id, enrolment_status, COUNT(*)
+    FROM enrolments{scope}
+    GROUP BY programme_id, enrolment_status
+"""
+
+_ASSESSMENTS_SQL = """
+    SELECT
+        programme_id,
+        COUNT(*),
+        AVG(CASE WHEN max_score > 0 THEN 100 * score / max_score END),
+        COALESCE(SUM(result = 'Competent'), 0),
+        COALESCE(SUM(result = 'Not Yet Competent'), 0)
+    FROM assessments{scope}
+    GROUP BY programme_id
+"""
+
+# From the per-learner monthly summary (V14), not the attendance rows
+_ATTENDANCE_SQL = """
+    SELECT e.programme_id, a.month, SUM(a.present), SUM(a.absent), SUM(a.late), SUM(a.excused)
+    FROM ({learners}) e
+    JOIN attendance_daily_summary a ON a.student_id = e.student_id
+    WHERE a.month >= %s AND a.month <= %s
+    GROUP BY e.programme_id, a.month
+"""
+
+_STIPENDS_SQL = """
+    SELECT e.programme_id, s.status, COUNT(*), COALESCE(SUM(s.amount), 0)
+    FROM ({learners}) e
+    JOIN stipends s ON s.student_id = e.student_id
+    WHERE s.month >= %s AND s.month <= %s
+    GROUP BY e.programme_id, s.status
+"""
+
+# Every stipend in the period, whether or not its learner is enrolled (V14)
+_STIPEND_TOTALS_SQL = """
+    SELECT status, SUM(stipend_count), SUM(total_amount)
+    FROM stipend_month_totals
+    WHERE month >= %s AND month <= %s
+    GROUP BY status
+"""
+
+# Counted towards the attendance percentage
+ATTENDED_STATUSES = ("present", "late")
+
+
+# ---------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------
+
+
+def _default_cache() -> CacheBackend:
+    if REPORT_CACHE_URL:
+        return RedisCache(REPORT_CACHE_URL, namespace="reports", ttl=REPORT_CACHE_TTL)
+    return TTLCache(maxsize=REPORT_CACHE_SIZE, ttl=REPORT_CACHE_TTL)
+
+
+_cache: CacheBackend = _default_cache()
+
+
+def configure_cache(backend: CacheBackend) -> None:
+    """
+    Swap the reports cache backend (e.g. a shared RedisCache).
+    """
+    global _cache
+    _cache = backend
+
+
+def _cached(cursor, key: str, load: Callable[[], Any]) -> Any:
+    """
+    read_through() under `key` plus the current versions of REPORT_TABLES.
+    The versions are read on the report's own connection before `load`
+    runs, so an entry is never filed under newer versions than its data.
+    Uncached when the versions are unavailable.
+    """
+    versions = read_table_versions(cursor, REPORT_TABLES)
+    if len(versions) != len(REPORT_TABLES):
+        return load()
+    key += ":" + ",".join(str(versions[table][0]) for table in REPORT_TABLES)
+    return read_through("reports", _cache, key, load)
+
+
+# ---------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------
+
+
+def report_period(month_from: Optional[str] = None, month_to: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Inclusive ('YYYY-MM', 'YYYY-MM') window for attendance and stipends,
+    defaulting to the REPORT_DEFAULT_MONTHS months up to the current one.
+    """
+    if month_to is None:
+        month_to = date.today().strftime("%Y-%m")
+    if month_from is None:
+        year, month = (int(part) for part in month_to.split("-"))
+        index = year * 12 + month - REPORT_DEFAULT_MONTHS  # months since 0000-01, zero-based
+        month_from = f"{index // 12:04d}-{index % 12 + 1:02d}"
+    if month_from > month_to:
+        raise InvalidFilter("Invalid month_from: must not be after month_to")
+    return month_from, month_to
+
+
+def _percentage(part: int, whole: int) -> Optional[float]:
+    return round(100.0 * part / whole, 2) if whole else None
+
+
+def _attendance(counts: Dict[str, int]) -> Dict[str, Any]:
+    recorded = sum(counts.values())
+    attended = sum(counts[status] for status in ATTENDED_STATUSES)
+    return {"days_recorded": recorded, **counts, "attendance_percentage": _percentage(attended, recorded)}
+
+
+def _add_stipend_total(stipends: Dict[str, Dict[str, Any]]) -> None:
+    stipends["total"] = {
+        "count": sum(line["count"] for line in stipends.values()),
+        "amount": sum((line["amount"] for line in stipends.values()), Decimal("0.00")),
+    }
+
+
+def _empty_report(pid: int, code: str, name: str, is_active: int) -> Dict[str, Any]:
+    return {
+        "programme": {"id": pid, "programme_code": code, "programme_name": name, "is_active": bool(is_active)},
+        "enrolments": dict.fromkeys(ENROLMENT_STATUSES, 0),
+        "assessments": {"count": 0, "average_score_percentage": None, "competent": 0, "not_yet_competent": 0},
+        "attendance": {},
+        "stipends": {status: {"count": 0, "amount": Decimal("0.00")} for status in STIPEND_STATUSES},
+    }
+
+
+def _aggregate(cursor, period: Tuple[str, str], programme_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Every report section for one programme (or all of them, in name order),
+    with one GROUP BY per table however many learners there are.
+    """
+    scoped = programme_id is not None
+    scope_params = [programme_id] if scoped else []
+    where = "\n    WHERE programme_id = %s" if scoped else ""
+    learners = _LEARNERS_SQL.format(scope="\n      AND programme_id = %s" if scoped else "")
+
+    cursor.execute(_PROGRAMMES_SQL.format(scope="\n    WHERE id = %s" if scoped else ""), scope_params)
+    reports = {row[0]: _empty_report(*row) for row in cursor.fetchall()}
+    if not reports:
+        return []
+
+    cursor.execute(_ENROLMENTS_SQL.format(scope=where), scope_params)  # nosec B608 - fixed fragments only
+    for pid, status, count in cursor.fetchall():
+        if pid in reports:
+            reports[pid]["enrolments"][status] = int(count)
+
+    cursor.execute(_ASSESSMENTS_SQL.format(scope=where), scope_params)  # nosec B608 - fixed fragments only
+    for pid, count, average, competent, not_yet_competent in cursor.fetchall():
+        if pid in reports:
+            reports[pid]["assessments"] = {
+                "count": int(count),
+                "average_score_percentage": round(float(average), 2) if average is not None else None,
+                "competent": int(competent),
+                "not_yet_competent": int(not_yet_competent),
+            }
+
+    month_from, month_to = period
+    # programme -> month -> status -> days
+    months: Dict[int, Dict[str, Dict[str, int]]] = {pid: {} for pid in reports}
+    sql = _ATTENDANCE_SQL.format(learners=learners)  # nosec B608 - fixed fragments only
+    cursor.execute(sql, [*scope_params, month_from, month_to])
+    for pid, month, *counts in cursor.fetchall():
+        if pid in months and any(counts):  # zeroed summary rows are left behind by deletes
+            months[pid][month] = {status: int(days) for status, days in zip(SUMMARY_STATUSES, counts)}
+
+    sql = _STIPENDS_SQL.format(learners=learners)  # nosec B608 - fixed fragments only
+    cursor.execute(sql, [*scope_params, month_from, month_to])
+    for pid, status, count, amount in cursor.fetchall():
+        if pid in reports:
+            reports[pid]["stipends"][status] = {"count": int(count), "amount": amount}
+
+    for pid, report in reports.items():
+        report["enrolments"]["total"] = sum(report["enrolments"].values())
+
+        assessments = report["assessments"]
+        graded = assessments["competent"] + assessments["not_yet_competent"]
+        assessments["competency_rate"] = _percentage(assessments["competent"], graded)
+
+        totals = dict.fromkeys(SUMMARY_STATUSES, 0)
+        for counts in months[pid].values():
+            for status, days in counts.items():
+                totals[status] += days
+        report["attendance"] = {
+            **_attendance(totals),
+            "months": [{"month": month, **_attendance(counts)} for month, counts in sorted(months[pid].items())],
+        }
+
+        _add_stipend_total(report["stipends"])
+
+    return list(reports.values())
+
+
+def _stipend_totals(cursor, period: Tuple[str, str]) -> Dict[str, Any]:
+    """All stipends in `period` by status, from the monthly totals."""
+    totals = {status: {"count": 0, "amount": Decimal("0.00")} for status in STIPEND_STATUSES}
+    cursor.execute(_STIPEND_TOTALS_SQL, list(period))
+    for status, count, amount in cursor.fetchall():
+        totals[status] = {"count": int(count), "amount": amount}
+    _add_stipend_total(totals)
+    return totals
+
+
+# ---------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------
+
+
+def get_programme_summary(programme_id: int, period: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Dashboard summary for one programme: enrolments by status, average
+    assessment score and competency rate, attendance per month and
+    stipends by status over `period` (see report_period()).
+    Returns None if the programme does not exist.
+    """
+
+    def load(cursor) -> Optional[Dict[str, Any]]:
+        reports = _aggregate(cursor, period, programme_id)
+        if not reports:
+            return None
+        return {"period": {"month_from": period[0], "month_to": period[1]}, **reports[0]}
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        try:
+            key = "summary:" + json.dumps([programme_id, *period])
+            return _cached(cursor, key, lambda: load(cursor))
+        finally:
+            cursor.close()
+
+
+def get_programmes_overview(period: Tuple[str, str]) -> Dict[str, Any]:
+    """
+    The same figures for every programme side by side; attendance is given
+    for the whole period, without the monthly breakdown.
+    """
+
+    def load(cursor) -> Dict[str, Any]:
+        reports = _aggregate(cursor, period)
+        for report in reports:
+            del report["attendance"]["months"]
+        return {
+            "period": {"month_from": period[0], "month_to": period[1]},
+            "stipends": _stipend_totals(cursor, period),
+            "programmes": reports,
+        }
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        try:
+            key = "overview:" + json.dumps(list(period))
+            return _cached(cursor, key, lambda: load(cursor))
+        finally:
+            cursor.close()
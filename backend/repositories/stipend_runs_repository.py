@@ -0,0 +1,211 @@
+# repositories/stipend_runs_repository.py
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from db import get_connection
+from opentelemetry import metrics
+from opentelemetry.trace import get_current_span
+
+from repositories.summaries_repository import adjust_stipend_totals
+from repositories.table_versions_repository import touch_tables
+
+log = logging.getLogger(__name__)
+meter = metrics.get_meter("student-registration-stipends", "0.1.0")
+
+stipend_run_duration = meter.create_histogram(
+    name="stipend_run_duration_ms",
+    unit="ms",
+    description="Stipend run time per phase (aggregate, upsert)",
+)
+stipend_run_rows = meter.create_counter(
+    name="stipend_run_rows_total",
+    unit="1",
+    description="Stipend lines computed by stipend runs",
+)
+
+# Only stipends still awaiting approval may be recalculated by a run (the
+# upsert re-checks this, so a stipend approved mid-run is never overwritten)
+RECALCULABLE_STATUSES = ("submitted",)
+
+_AGGREGATE_SQL = """
+    SELECT
+        e.student_id,
+        COUNT(a.id) AS recorded_days,
+        COALESCE(SUM(a.status IN ({attended})), 0) AS attended_days
+    FROM (
+        SELECT DISTINCT student_id
+        FROM enrolments
+        WHERE enrolment_status = 'enrolled'{programme_clause}
+    ) e
+    LEFT JOIN attendance a
+        ON a.student_id = e.student_id
+       AND a.attendance_date >= %s
+       AND a.attendance_date < %s
+    GROUP BY e.student_id
+    ORDER BY e.student_id
+"""
+
+_EXISTING_SQL = """
+    SELECT student_id, amount, status
+    FROM stipends
+    WHERE month = %s
+"""
+
+_UPSERT_SQL = """
+    INSERT INTO stipends (student_id, month, amount, status)
+    VALUES (%s, %s, %s, 'submitted') AS new
+    ON DUPLICATE KEY UPDATE
+        amount = IF(stipends.status = 'submitted', new.amount, stipends.amount)
+"""
+
+
+@dataclass(frozen=True)
+class ProRataRule:
+    """
+    Monthly stipend as a function of attendance percentage: nothing below
+    `min_percentage`, the full amount from `full_percentage`, linear between.
+    """
+
+    monthly_amount: Decimal = Decimal(os.getenv("STIPEND_MONTHLY_AMOUNT", "2500.00"))
+    min_percentage: float = float(os.getenv("STIPEND_MIN_ATTENDANCE_PCT", "50"))
+    full_percentage: float = float(os.getenv("STIPEND_FULL_ATTENDANCE_PCT", "90"))
+    attended_statuses: Sequence[str] = tuple(os.getenv("STIPEND_ATTENDED_STATUSES", "present,late").split(","))
+
+    def amount_for(self, percentage: float) -> Decimal:
+        if percentage < self.min_percentage:
+            return Decimal("0.00")
+        if percentage >= self.full_percentage:
+            return self.monthly_amount.quantize(Decimal("0.01"))
+        share = Decimal(str(percentage)) / Decimal(str(self.full_percentage))
+        return (self.monthly_amount * share).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _month_bounds(month: str) -> tuple:
+    year, mon = (int(part) for part in month.split("-"))
+    start = date(year, mon, 1)
+    end = date(year + (mon == 12), mon % 12 + 1, 1)
+    return start, end
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000.0
+
+
+# ---------- RUN ----------
+def run_stipends(
+    month: str,  # 'YYYY-MM'
+    rule: Optional[ProRataRule] = None,
+    programme_id: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Compute every enrolled learner's attendance percentage for `month` with
+    one GROUP BY over attendance, price it with `rule`, and upsert the
+    stipends in one batch. Approved / paid / rejected stipends are never
+    changed. With dry_run nothing is written.
+    """
+    rule = rule or ProRataRule()
+    start, end = _month_bounds(month)
+    span = get_current_span()
+    timings: Dict[str, float] = {}
+
+    attended = ", ".join(["%s"] * len(rule.attended_statuses))
+    programme_clause = "\n          AND programme_id = %s" if programme_id is not None else ""
+    aggregate_sql = _AGGREGATE_SQL.format(attended=attended, programme_clause=programme_clause)  # nosec B608
+    aggregate_params = [*rule.attended_statuses, *([programme_id] if programme_id is not None else []), start, end]
+
+    with get_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        try:
+            started = time.perf_counter()
+            cursor.execute(aggregate_sql, aggregate_params)
+            aggregates = cursor.fetchall()
+            # Locked when writing: the month totals are adjusted from these
+            cursor.execute(_EXISTING_SQL + ("" if dry_run else "    FOR UPDATE\n"), (month,))
+            existing = {sid: (amount, status) for sid, amount, status in cursor.fetchall()}
+            timings["aggregate"] = _elapsed_ms(started)
+
+            lines = _price_lines(aggregates, existing, rule)
+            writes = [
+                (line["student_id"], month, line["amount"]) for line in lines if line["action"] in ("insert", "update")
+            ]
+
+            started = time.perf_counter()
+            if writes and not dry_run:
+                cursor.executemany(_UPSERT_SQL, writes)
+                replaced = [existing[sid] for sid, _, _ in writes if sid in existing]
+                adjust_stipend_totals(
+                    cursor,
+                    [(month, "submitted", amount, 1) for _, _, amount in writes]
+                    + [(month, status, amount, -1) for amount, status in replaced],
+                )
+                touch_tables(connection, "stipends")
+                connection.commit()
+            timings["upsert"] = _elapsed_ms(started)
+        finally:
+            cursor.close()
+
+    attributes = {"dry_run": dry_run}
+    for phase, ms in timings.items():
+        stipend_run_duration.record(ms, {**attributes, "phase": phase})
+    stipend_run_rows.add(len(lines), attributes)
+
+    counts = {
+        action: sum(1 for line in lines if line["action"] == action)
+        for action in ("insert", "update", "unchanged", "locked")
+    }
+    span.set_attribute("stipend_run.month", month)
+    span.set_attribute("stipend_run.students", len(lines))
+    span.set_attribute("stipend_run.dry_run", dry_run)
+    log.info("Stipend run computed", extra={"stipend_run.month": month, "stipend_run.dry_run": dry_run, **counts})
+
+    return {
+        "month": month,
+        "dry_run": dry_run,
+        "students": len(lines),
+        "inserted": counts["insert"],
+        "updated": counts["update"],
+        "unchanged": counts["unchanged"],
+        "locked": counts["locked"],
+        "total_amount": float(sum((line["amount"] for line in lines if line["action"] != "locked"), Decimal("0"))),
+        "timings_ms": {phase: round(ms, 2) for phase, ms in timings.items()},
+        "lines": [{**line, "amount": float(line["amount"])} for line in lines],
+    }
+
+
+def _price_lines(aggregates: Sequence[tuple], existing: Dict[int, tuple], rule: ProRataRule) -> List[Dict[str, Any]]:
+    lines = []
+    for student_id, recorded_days, attended_days in aggregates:
+        recorded_days, attended_days = int(recorded_days), int(attended_days)
+        percentage = round(100.0 * attended_days / recorded_days, 2) if recorded_days else 0.0
+        amount = rule.amount_for(percentage)
+
+        current = existing.get(student_id)
+        if current is None:
+            action = "insert"
+        elif current[1] not in RECALCULABLE_STATUSES:
+            action = "locked"
+        elif Decimal(current[0]) == amount:
+            action = "unchanged"
+        else:
+            action = "update"
+
+        lines.append(
+            {
+                "student_id": student_id,
+                "recorded_days": recorded_days,
+                "attended_days": attended_days,
+                "attendance_percentage": percentage,
+                "amount": amount,
+                "action": action,
+            }
+        )
+    return lines
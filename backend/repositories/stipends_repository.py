@@ -1,23 +1,56 @@
 # repositories/stipends_repository.py
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
 
-from db import get_connection
+from db import get_connection, get_read_connection
+from fields import select_columns, select_sql
+from filters import Filter, choice, filter_where, positive_int, year_month
+from pagination import keyset_query
+from streaming import STREAM_BATCH_SIZE
+from sync import ChangeFeed
+
+from repositories.summaries_repository import adjust_stipend_totals
+from repositories.table_versions_repository import touch_tables
 
 log = logging.getLogger(__name__)
 
+STIPEND_STATUSES = ("submitted", "approved", "paid", "rejected")
+
+STIPEND_ORDER = (("month", "DESC"), ("student_id", "ASC"))
+STUDENT_STIPEND_ORDER = (("month", "DESC"),)
+
+
+STIPEND_FILTERS = {
+    "student_id": Filter("student_id = %s", positive_int),
+    "status": Filter("status = %s", choice(*STIPEND_STATUSES)),
+    "month": Filter("month = %s", year_month),
+    "month_from": Filter("month >= %s", year_month),
+    "month_to": Filter("month <= %s", year_month),
+}
+
+# Whitelist for ?fields= (also the SELECT order)
+STIPEND_FIELDS = ("id", "student_id", "month", "amount", "status", "created_at", "updated_at")
+
+
+# Current values of a row about to change, for the month-total deltas
+_LOCK_ROW_SQL = """
+    SELECT month, status, amount
+    FROM stipends
+    WHERE id = %s
+    FOR UPDATE
+  """
+
+
+def _row_to_stipend(row: tuple, columns: Sequence[str] = STIPEND_FIELDS) -> Dict[str, Any]:
+    # Raw DB values; FastJSONProvider encodes DECIMAL amounts and dates
+    record = dict(zip(columns, row))
+    if "amount" in record and record["amount"] is None:
+        record["amount"] = 0.0
+    return record
 
-def _row_to_stipend(row: tuple) -> Dict[str, Any]:
-    (sid, student_id, month, amount, status, created_at) = row
 
-    return {
-        "id": sid,
-        "student_id": student_id,
-        "month": month,
-        "amount": float(amount) if amount is not None else 0.0,
-        "status": status,
-        "created_at": created_at.isoformat() if created_at else None,
-    }
+# GET /stipends/changes
+STIPEND_FEED = ChangeFeed("stipends", STIPEND_FIELDS, _row_to_stipend)
 
 
 # ---------- CREATE ----------
@@ -38,54 +71,103 @@ def create_stipend(
 
         cursor = connection.cursor()
         cursor.execute(sql, (student_id, month, amount, status))
-        connection.commit()
         new_id = cursor.lastrowid
+        adjust_stipend_totals(cursor, [(month, status, amount, 1)])
+        touch_tables(connection, "stipends")
+        connection.commit()
         cursor.close()
 
     return new_id
 
 
 # ---------- READ ALL ----------
-def list_stipends() -> List[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id, month, amount, status, created_at
-    FROM stipends
-    ORDER BY month DESC, student_id ASC
-  """
-
-    with get_connection() as connection:
+def list_stipends(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    columns = select_columns(STIPEND_FIELDS, fields, STIPEND_ORDER)
+    where, params = filter_where(filters or {}, STIPEND_FILTERS)
+    sql, params = keyset_query(
+        select_sql("stipends", columns),
+        STIPEND_ORDER,
+        after=after,
+        limit=limit,
+        where=where,
+        params=params,
+    )
+
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
-        cursor.execute(sql)
+        cursor.execute(sql, params)
         rows = cursor.fetchall()
         cursor.close()
 
-    return [_row_to_stipend(r) for r in rows]
+    return [_row_to_stipend(r, columns) for r in rows]
 
 
 # ---------- READ BY STUDENT ----------
-def list_stipends_for_student(student_id: int) -> List[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id, month, amount, status, created_at
-    FROM stipends
-    WHERE student_id = %s
-    ORDER BY month DESC
-  """
-
-    with get_connection() as connection:
+def list_stipends_for_student(
+    student_id: int,
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+) -> List[Dict[str, Any]]:
+    sql, params = keyset_query(
+        select_sql("stipends", STIPEND_FIELDS),
+        STUDENT_STIPEND_ORDER,
+        after=after,
+        limit=limit,
+        where=["student_id = %s"],
+        params=[student_id],
+    )
+
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
-        cursor.execute(sql, (student_id,))
+        cursor.execute(sql, params)
         rows = cursor.fetchall()
         cursor.close()
 
     return [_row_to_stipend(r) for r in rows]
 
 
+# ---------- STREAM ALL ----------
+def iter_stipends(
+    filters: Optional[Mapping[str, Any]] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    fields: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every matching stipends row without materialising the table:
+    rows are read from an unbuffered (server-side) cursor `batch_size` at a time.
+    """
+    columns = select_columns(STIPEND_FIELDS, fields)
+    where, params = filter_where(filters or {}, STIPEND_FILTERS)
+    sql, params = keyset_query(select_sql("stipends", columns), STIPEND_ORDER, where=where, params=params)
+
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor(buffered=False)
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for r in rows:
+                    yield _row_to_stipend(r, columns)
+        finally:
+            cursor.close()
+
+
 # ---------- UPDATE ----------
 def update_stipend(
     stipend_id: int,
@@ -108,9 +190,14 @@ def update_stipend(
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
+        cursor.execute(_LOCK_ROW_SQL, (stipend_id,))
+        old = cursor.fetchone()
         cursor.execute(sql, (student_id, month, amount, status, stipend_id))
-        connection.commit()
         updated_rows = cursor.rowcount
+        if old:
+            adjust_stipend_totals(cursor, [(*old, -1), (month, status, amount, 1)])
+        touch_tables(connection, "stipends")
+        connection.commit()
         cursor.close()
 
     if updated_rows == 0:
@@ -120,14 +207,11 @@ def update_stipend(
 
 
 # ---------- READ ONE ----------
-def get_stipend(stipend_id: int) -> Optional[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id, month, amount, status, created_at
-    FROM stipends
-    WHERE id = %s
-  """
+def get_stipend(stipend_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    columns = select_columns(STIPEND_FIELDS, fields)
+    sql = select_sql("stipends", columns) + "\nWHERE id = %s"
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
@@ -136,7 +220,7 @@ def get_stipend(stipend_id: int) -> Optional[Dict[str, Any]]:
         row = cursor.fetchone()
         cursor.close()
 
-    return _row_to_stipend(row) if row else None
+    return _row_to_stipend(row, columns) if row else None
 
 
 # ---------- DELETE ----------
@@ -148,9 +232,14 @@ def delete_stipend(stipend_id: int) -> bool:
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
+        cursor.execute(_LOCK_ROW_SQL, (stipend_id,))
+        old = cursor.fetchone()
         cursor.execute(sql, (stipend_id,))
-        connection.commit()
         deleted = cursor.rowcount > 0
+        if deleted:
+            adjust_stipend_totals(cursor, [(*old, -1)])
+        touch_tables(connection, "stipends")
+        connection.commit()
         cursor.close()
 
     return deleted
@@ -0,0 +1,126 @@
+# repositories/student_search_repository.py
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from mappers.students_mapper import StudentMapper
+from search_index import SearchIndex
+from sync import ChangeFeed, SyncRequest, SyncTokenExpired, next_sync
+
+from repositories.changes_repository import list_changes
+
+log = logging.getLogger(__name__)
+
+# How stale the index may get with respect to writes made by other workers
+STUDENT_SEARCH_REFRESH_INTERVAL = float(os.getenv("STUDENT_SEARCH_REFRESH_INTERVAL", "5"))
+# Results returned when ?limit= is not given
+STUDENT_SEARCH_DEFAULT_LIMIT = int(os.getenv("STUDENT_SEARCH_DEFAULT_LIMIT", "20"))
+# Rows fetched per round trip while building / catching up
+STUDENT_SEARCH_BATCH_SIZE = int(os.getenv("STUDENT_SEARCH_BATCH_SIZE", "5000"))
+
+# Same rows as STUDENT_FEED; declared here because students_repository
+# imports this module for its write hooks.
+_FEED = ChangeFeed("students", StudentMapper.COLUMNS)
+
+_index = SearchIndex()
+_refresh_lock = threading.Lock()
+_sync: Optional[SyncRequest] = None  # None until the first build
+_refreshed_at = 0.0
+
+
+def _index_row(student: Dict[str, Any]) -> None:
+    email = student["email"] or ""
+    _index.add(
+        student["id"],
+        # The local part only: every address shares the domain
+        (student["first_name"], student["last_name"], email.split("@", 1)[0]),
+        {k: student[k] for k in ("id", "first_name", "last_name", "email")},
+    )
+
+
+def _catch_up(sync: SyncRequest) -> SyncRequest:
+    # Replay the students delta feed from `sync` until it runs dry
+    while True:
+        rows, tombstones, synced_to = list_changes(_FEED, sync)
+        has_more = len(rows) > sync.limit or len(tombstones) > sync.limit
+        following = next_sync(rows, tombstones, sync, synced_to)
+
+        for tombstone in tombstones[: sync.limit]:
+            _index.remove(tombstone["id"])
+        for row in rows[: sync.limit]:
+            _index_row(row)
+
+        sync = following
+        if not has_more:
+            return sync
+
+
+def _refresh() -> None:
+    """
+    Build the index on first use, then pull other workers' writes from the
+    delta feed at most every STUDENT_SEARCH_REFRESH_INTERVAL seconds.
+    """
+    global _sync, _refreshed_at
+    if _sync is not None and time.monotonic() - _refreshed_at < STUDENT_SEARCH_REFRESH_INTERVAL:
+        return
+
+    with _refresh_lock:
+        if _sync is not None and time.monotonic() - _refreshed_at < STUDENT_SEARCH_REFRESH_INTERVAL:
+            return
+
+        started = time.perf_counter()
+        try:
+            try:
+                _sync = _catch_up(_sync or SyncRequest(limit=STUDENT_SEARCH_BATCH_SIZE))
+            except SyncTokenExpired:
+                # Idle past the tombstone retention: rebuild from scratch
+                _index.clear()
+                _sync = None
+                _sync = _catch_up(SyncRequest(limit=STUDENT_SEARCH_BATCH_SIZE))
+        except Exception as e:
+            if _sync is None:
+                raise
+            # Serve the last good index rather than failing the search
+            log.warning(f"Student search index refresh failed: {e}", extra={"search.error": str(e)})
+        _refreshed_at = time.monotonic()
+
+        log.debug(
+            "Student search index refreshed",
+            extra={"search.documents": len(_index), "search.refresh_ms": (time.perf_counter() - started) * 1000},
+        )
+
+
+def reset_index() -> None:
+    """Drop the index; the next search rebuilds it from the table."""
+    global _sync, _refreshed_at
+    with _refresh_lock:
+        _index.clear()
+        _sync = None
+        _refreshed_at = 0.0
+
+
+# ---------- WRITE HOOKS ----------
+def index_student(student: Dict[str, Any]) -> None:
+    """
+    Make a committed create/update visible to this worker's searches
+    straight away. A no-op until the index is built (the build reads it).
+    """
+    if _sync is not None:
+        _index_row(student)
+
+
+def unindex_student(student_id: int) -> None:
+    if _sync is not None:
+        _index.remove(student_id)
+
+
+# ---------- READ ----------
+def search_students(query: str, limit: int = STUDENT_SEARCH_DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Students matching every term of `query` by name or email (exact,
+    prefix or one typo), best match first, each with a "score".
+    """
+    _refresh()
+    return _index.search(query, limit)
@@ -1,13 +1,44 @@
 # repositories/students_repository.py
 import logging
-from typing import Dict, List, Optional
+import re
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
-from db import get_connection
+from async_db import get_async_connection
+from db import after_commit, get_connection, get_read_connection
+from fields import project, select_columns
+from filters import Filter, filter_where
 from mappers.students_mapper import DuplicateEmailError, Student, StudentMapper
+from sync import ChangeFeed
+
+from repositories.student_search_repository import index_student, unindex_student
+from repositories.summaries_repository import remove_student_stipends
+from repositories.table_versions_repository import touch_tables
+
+# Tables whose rows go with a student by FK cascade
+_CASCADED_TABLES = ("workplace_placements", "attendance", "stipends", "documents", "assessments")
 
 log = logging.getLogger(__name__)
 _mapper = StudentMapper()
 
+STUDENT_ORDER = StudentMapper.LIST_ORDER
+
+# Whitelist for ?fields= (also the SELECT order)
+STUDENT_FIELDS = StudentMapper.COLUMNS
+
+# GET /students/changes
+STUDENT_FEED = ChangeFeed("students", STUDENT_FIELDS)
+
+STUDENT_FILTERS = {
+    "email": Filter("email = %s"),
+}
+
+# Column sizes (V2__create_students_table.sql)
+NAME_MAX_LENGTH = 100
+EMAIL_MAX_LENGTH = 150
+
+# local@domain.tld, no whitespace; deliverability is not checked
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
 
 class EmailAlreadyExistsError(Exception):
     """Domain-level exception for duplicate email."""
@@ -21,10 +52,17 @@ def _student_to_dict(student: Student) -> Dict:
         "first_name": student.first_name,
         "last_name": student.last_name,
         "email": student.email,
-        "registration_date": (student.registration_date.isoformat() if student.registration_date is not None else None),
+        "registration_date": student.registration_date,
+        "updated_at": student.updated_at,
     }
 
 
+def _index_created(students: Sequence[Student]) -> None:
+    for student in students:
+        if student.id is not None:
+            index_student(_student_to_dict(student))
+
+
 # ---------- CREATE ----------
 def register_student(first_name: str, last_name: str, email: str) -> Optional[int]:
     student = Student(first_name=first_name, last_name=last_name, email=email)
@@ -34,10 +72,15 @@ def register_student(first_name: str, last_name: str, email: str) -> Optional[in
             raise RuntimeError("DB connection failed")
 
         try:
+            # The mapper commits; the version bump is made with that commit
+            touch_tables(connection, "students")
             student_id = _mapper.insert(connection, student)
         except DuplicateEmailError as e:
             raise EmailAlreadyExistsError(str(e)) from e
 
+        student.id = student_id
+        after_commit(lambda: index_student(_student_to_dict(student)))
+
     log.debug(
         "Student persisted in repository",
         extra={"student.email": email, "student.id": student_id},
@@ -45,25 +88,141 @@ def register_student(first_name: str, last_name: str, email: str) -> Optional[in
     return student_id
 
 
+def _row_error(first_name: str, last_name: str, email: str) -> Optional[str]:
+    # Checked per row up front: a value the columns reject would fail the
+    # whole multi-row INSERT
+    if not all([first_name, last_name, email]):
+        return "first_name, last_name, and email required"
+    if len(first_name) > NAME_MAX_LENGTH or len(last_name) > NAME_MAX_LENGTH:
+        return f"first_name and last_name must be at most {NAME_MAX_LENGTH} characters"
+    if len(email) > EMAIL_MAX_LENGTH:
+        return f"email must be at most {EMAIL_MAX_LENGTH} characters"
+    if not _EMAIL_RE.fullmatch(email):
+        return "email is not a valid address"
+    return None
+
+
+def register_students_bulk(rows: Sequence[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validate and insert many students at once. Returns one result per input
+    row, in order: {"index", "status": "created" | "conflict" | "invalid", ...}.
+    Invalid rows and duplicate emails are reported, not raised, so one bad
+    row never aborts the batch.
+    """
+    results: List[Dict[str, Any]] = [{} for _ in rows]
+    students: List[Student] = []
+    positions: List[int] = []
+    seen = set()
+
+    for i, row in enumerate(rows):
+        if not isinstance(row, Mapping):
+            results[i] = {"index": i, "status": "invalid", "error": "row must be an object"}
+            continue
+
+        first_name, last_name, email = (str(row.get(k) or "").strip() for k in ("first_name", "last_name", "email"))
+        error = _row_error(first_name, last_name, email)
+        if error:
+            results[i] = {"index": i, "status": "invalid", "error": error}
+            continue
+        if email.lower() in seen:
+            results[i] = {"index": i, "status": "conflict", "email": email, "error": "Duplicate email in batch"}
+            continue
+
+        seen.add(email.lower())
+        students.append(Student(first_name=first_name, last_name=last_name, email=email))
+        positions.append(i)
+
+    if students:
+        with get_connection() as connection:
+            if connection is None or not connection.is_connected():
+                raise RuntimeError("DB connection failed")
+
+            touch_tables(connection, "students")
+            ids = _mapper.insert_many(connection, students)
+            for student, student_id in zip(students, ids):
+                student.id = student_id
+            after_commit(lambda: _index_created(students))
+
+        for i, student, student_id in zip(positions, students, ids):
+            if student_id is None:
+                results[i] = {"index": i, "status": "conflict", "email": student.email, "error": "Email already exists"}
+            else:
+                results[i] = {"index": i, "status": "created", "id": student_id, "email": student.email}
+
+    log.debug(
+        "Bulk student registration persisted",
+        extra={"students.rows": len(rows), "students.inserted": sum(r["status"] == "created" for r in results)},
+    )
+    return results
+
+
 # ---------- READ ----------
-def get_student(student_id: int) -> Optional[Dict]:
-    with get_connection() as connection:
+def get_student(student_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
+    columns = select_columns(STUDENT_FIELDS, fields)
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
-        student = _mapper.get_by_id(connection, student_id)
+        student = _mapper.get_by_id(connection, student_id, columns=columns)
 
-    return _student_to_dict(student) if student else None
+    return project(_student_to_dict(student), columns) if student else None
 
 
-def list_students() -> List[Dict]:
-    with get_connection() as connection:
+def get_students_by_ids(student_ids: Sequence[int]) -> Dict[int, Dict]:
+    """
+    Batch lookup for embedding: {id: student} for the ids that exist.
+    """
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
-        students = _mapper.list_all(connection)
+        students = _mapper.get_by_ids(connection, list(student_ids))
+
+    return {s.id: _student_to_dict(s) for s in students}
+
 
-    return [_student_to_dict(s) for s in students]
+def list_students(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict]:
+    columns = select_columns(STUDENT_FIELDS, fields, STUDENT_ORDER)
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        where, params = filter_where(filters or {}, STUDENT_FILTERS)
+        students = _mapper.list_all(connection, limit=limit, after=after, where=where, params=params, columns=columns)
+
+    return [project(_student_to_dict(s), columns) for s in students]
+
+
+# ---------- READ (async) ----------
+# For the async app (asgi.py): same results as get_student / list_students,
+# read through the aiomysql pool without blocking the event loop.
+async def get_student_async(student_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
+    columns = select_columns(STUDENT_FIELDS, fields)
+    async with get_async_connection() as connection:
+        student = await _mapper.get_by_id_async(connection, student_id, columns=columns)
+
+    return project(_student_to_dict(student), columns) if student else None
+
+
+async def list_students_async(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict]:
+    columns = select_columns(STUDENT_FIELDS, fields, STUDENT_ORDER)
+    where, params = filter_where(filters or {}, STUDENT_FILTERS)
+    async with get_async_connection() as connection:
+        students = await _mapper.list_all_async(
+            connection, limit=limit, after=after, where=where, params=params, columns=columns
+        )
+
+    return [project(_student_to_dict(s), columns) for s in students]
 
 
 # ---------- UPDATE ----------
@@ -80,6 +239,7 @@ def update_student(
             raise RuntimeError("DB connection failed")
 
         try:
+            touch_tables(connection, "students")
             updated = _mapper.update(connection, student_id, student)
         except DuplicateEmailError as e:
             raise EmailAlreadyExistsError(str(e)) from e
@@ -88,6 +248,8 @@ def update_student(
             return None
 
         fresh = _mapper.get_by_id(connection, student_id)
+        if fresh:
+            after_commit(lambda: index_student(_student_to_dict(fresh)))
 
     return _student_to_dict(fresh) if fresh else None
 
@@ -98,6 +260,18 @@ def delete_student(student_id: int) -> bool:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
-        deleted = _mapper.delete(connection, student_id)
+        cursor = connection.cursor()
+        try:
+            remove_student_stipends(cursor, student_id)
+            touch_tables(connection, "students", *_CASCADED_TABLES)
+            # Commits the totals adjustment and version bumps together with the delete
+            deleted = _mapper.delete(connection, student_id)
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        if deleted:
+            after_commit(lambda: unindex_student(student_id))
 
     return deleted
@@ -0,0 +1,236 @@
+# repositories/summaries_repository.py
+"""
+Summary tables kept next to the fast-growing attendance and stipends tables
+(V14__create_summary_tables.sql):
+
+    attendance_daily_summary (student_id, month) -> days per status
+    stipend_month_totals     (month, status)     -> stipend count, amount
+
+The attendance / stipends write helpers adjust them with the deltas of each
+write, on the same connection before they commit, so a summary never
+disagrees with a committed base table. rebuild_summaries() recomputes both
+from scratch and reports how far they had drifted.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from db import get_connection
+
+from repositories.table_versions_repository import touch_tables
+
+log = logging.getLogger(__name__)
+
+# attendance_daily_summary's count columns, one per attendance status
+SUMMARY_STATUSES = ("present", "absent", "late", "excused")
+
+_ATTENDANCE_UPSERT_SQL = """
+    INSERT INTO attendance_daily_summary (student_id, month, present, absent, late, excused)
+    VALUES (%s, %s, %s, %s, %s, %s) AS d
+    ON DUPLICATE KEY UPDATE
+        present = attendance_daily_summary.present + d.present,
+        absent  = attendance_daily_summary.absent + d.absent,
+        late    = attendance_daily_summary.late + d.late,
+        excused = attendance_daily_summary.excused + d.excused
+"""
+
+_STIPEND_UPSERT_SQL = """
+    INSERT INTO stipend_month_totals (month, status, stipend_count, total_amount)
+    VALUES (%s, %s, %s, %s) AS d
+    ON DUPLICATE KEY UPDATE
+        stipend_count = stipend_month_totals.stipend_count + d.stipend_count,
+        total_amount  = stipend_month_totals.total_amount + d.total_amount
+"""
+
+_STUDENT_STIPENDS_SQL = """
+    SELECT month, status, amount
+    FROM stipends
+    WHERE student_id = %s
+    FOR UPDATE
+"""
+
+# Recomputations from the base tables; also the V14 backfill
+_ATTENDANCE_REBUILD_SQL = """
+    INSERT INTO attendance_daily_summary (student_id, month, present, absent, late, excused)
+    SELECT
+        student_id,
+        DATE_FORMAT(attendance_date, '%Y-%m') AS month,
+        SUM(status = 'present'),
+        SUM(status = 'absent'),
+        SUM(status = 'late'),
+        SUM(status = 'excused')
+    FROM attendance
+    WHERE status IS NOT NULL
+    GROUP BY student_id, month
+"""
+
+_STIPEND_REBUILD_SQL = """
+    INSERT INTO stipend_month_totals (month, status, stipend_count, total_amount)
+    SELECT month, status, COUNT(*), SUM(amount)
+    FROM stipends
+    WHERE status IS NOT NULL
+    GROUP BY month, status
+"""
+
+# Keys whose summary differs from a recomputation: the summary minus the
+# recomputation, summed per key, is non-zero. Zeroed rows left behind by
+# deletes count as matching a missing key.
+_ATTENDANCE_DRIFT_SQL = """
+    SELECT COUNT(*) FROM (
+        SELECT student_id, month
+        FROM (
+            SELECT student_id, month, present, absent, late, excused
+            FROM attendance_daily_summary
+            UNION ALL
+            SELECT
+                student_id,
+                DATE_FORMAT(attendance_date, '%Y-%m'),
+                -SUM(status = 'present'),
+                -SUM(status = 'absent'),
+                -SUM(status = 'late'),
+                -SUM(status = 'excused')
+            FROM attendance
+            WHERE status IS NOT NULL
+            GROUP BY student_id, DATE_FORMAT(attendance_date, '%Y-%m')
+        ) d
+        GROUP BY student_id, month
+        HAVING SUM(present) <> 0 OR SUM(absent) <> 0 OR SUM(late) <> 0 OR SUM(excused) <> 0
+    ) drift
+"""
+
+_STIPEND_DRIFT_SQL = """
+    SELECT COUNT(*) FROM (
+        SELECT month, status
+        FROM (
+            SELECT month, status, stipend_count, total_amount
+            FROM stipend_month_totals
+            UNION ALL
+            SELECT month, status, -COUNT(*), -SUM(amount)
+            FROM stipends
+            WHERE status IS NOT NULL
+            GROUP BY month, status
+        ) d
+        GROUP BY month, status
+        HAVING SUM(stipend_count) <> 0 OR SUM(total_amount) <> 0
+    ) drift
+"""
+
+# table -> (lock the base table, empty the summary, recompute, count drift)
+_SUMMARIES = {
+    "attendance_daily_summary": (
+        "SELECT COUNT(*) FROM attendance FOR SHARE",
+        "DELETE FROM attendance_daily_summary",
+        _ATTENDANCE_REBUILD_SQL,
+        _ATTENDANCE_DRIFT_SQL,
+    ),
+    "stipend_month_totals": (
+        "SELECT COUNT(*) FROM stipends FOR SHARE",
+        "DELETE FROM stipend_month_totals",
+        _STIPEND_REBUILD_SQL,
+        _STIPEND_DRIFT_SQL,
+    ),
+}
+
+
+# ---------- INCREMENTAL ----------
+def adjust_attendance_summary(cursor, changes: Iterable[Tuple[int, Any, Optional[str], int]]) -> None:
+    """
+    Apply attendance row changes to attendance_daily_summary on `cursor`'s
+    connection (call before it commits). `changes` are
+    (student_id, attendance_date, status, +1 for a row added / -1 removed);
+    an update is its old row removed plus its new row added.
+    """
+    deltas: Dict[Tuple[int, str], Dict[str, int]] = {}
+    for student_id, attendance_date, status, sign in changes:
+        if status is None:
+            continue
+        key = (student_id, str(attendance_date)[:7])
+        deltas.setdefault(key, dict.fromkeys(SUMMARY_STATUSES, 0))[status] += sign
+
+    # Key order, so concurrent writers lock summary rows in the same order
+    rows = [(*key, *counts.values()) for key, counts in sorted(deltas.items()) if any(counts.values())]
+    if rows:
+        cursor.executemany(_ATTENDANCE_UPSERT_SQL, rows)
+
+
+def adjust_stipend_totals(cursor, changes: Iterable[Tuple[str, Optional[str], Any, int]]) -> None:
+    """
+    Apply stipend row changes to stipend_month_totals on `cursor`'s
+    connection (call before it commits). `changes` are
+    (month, status, amount, +1 / -1), as for adjust_attendance_summary().
+    """
+    deltas: Dict[Tuple[str, str], list] = {}
+    for month, status, amount, sign in changes:
+        if status is None:
+            continue
+        delta = deltas.setdefault((month, status), [0, Decimal("0.00")])
+        delta[0] += sign
+        delta[1] += sign * Decimal(str(amount or 0))
+
+    rows = [(*key, count, amount) for key, (count, amount) in sorted(deltas.items()) if count or amount]
+    if rows:
+        cursor.executemany(_STIPEND_UPSERT_SQL, rows)
+
+
+def remove_student_stipends(cursor, student_id: int) -> None:
+    """
+    Take a student's stipends out of the month totals before the student is
+    deleted (the stipends go by FK cascade, which runs no application code).
+    Their attendance summary rows cascade with the student themselves.
+    """
+    cursor.execute(_STUDENT_STIPENDS_SQL, (student_id,))
+    adjust_stipend_totals(cursor, [(month, status, amount, -1) for month, status, amount in cursor.fetchall()])
+
+
+# ---------- REBUILD / VERIFY ----------
+def rebuild_summaries(check_only: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Count the drifted keys of each summary table and, unless `check_only`,
+    recompute the tables from the base tables in one transaction. The base
+    tables are share-locked first (writers lock them before the summaries,
+    so the rebuild cannot deadlock with them), and the result is verified
+    before it commits. Returns {table: {"drifted": n, "after": n}}.
+    """
+    report: Dict[str, Dict[str, int]] = {}
+    with get_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        try:
+            if not check_only:
+                # Before the first plain read, so the transaction's snapshot
+                # already includes every write the locks waited for
+                for lock_sql, *_ in _SUMMARIES.values():
+                    cursor.execute(lock_sql)
+                    cursor.fetchall()
+
+            for table, (_, clear_sql, rebuild_sql, drift_sql) in _SUMMARIES.items():
+                cursor.execute(drift_sql)
+                drifted = int(cursor.fetchone()[0])
+                report[table] = {"drifted": drifted, "after": drifted}
+                if check_only:
+                    continue
+
+                cursor.execute(clear_sql)
+                cursor.execute(rebuild_sql)
+                cursor.execute(drift_sql)
+                report[table]["after"] = int(cursor.fetchone()[0])
+                if report[table]["after"]:
+                    raise RuntimeError(f"{table} still differs from its base table after rebuild")
+
+            if check_only:
+                connection.rollback()
+            else:
+                # Reports cached under the base tables' versions read the summaries
+                touch_tables(connection, "attendance", "stipends")
+                connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    log.info("Summary tables checked" if check_only else "Summary tables rebuilt", extra={"summaries": report})
+    return report
@@ -0,0 +1,76 @@
+# repositories/table_versions_repository.py
+import logging
+from datetime import datetime
+from typing import Dict, Sequence, Tuple
+
+from async_db import get_async_connection
+from db import before_commit, get_read_connection
+
+log = logging.getLogger(__name__)
+
+_BUMP_SQL = """
+    UPDATE table_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = %s
+"""
+
+
+def _versions_sql(tables: Sequence[str]) -> str:
+    placeholders = ", ".join(["%s"] * len(tables))
+    return f"SELECT table_name, version, updated_at FROM table_versions WHERE table_name IN ({placeholders})"  # nosec B608
+
+
+def read_table_versions(cursor, tables: Sequence[str]) -> Dict[str, Tuple[int, datetime]]:
+    """
+    get_table_versions() on a caller's cursor, e.g. to pair the versions
+    with other reads on the same connection.
+    """
+    cursor.execute(_versions_sql(tables), tuple(tables))
+    return {name: (version, updated_at) for name, version, updated_at in cursor.fetchall()}
+
+
+# ---------- WRITE ----------
+def _bump(connection, table: str) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.execute(_BUMP_SQL, (table,))
+    finally:
+        cursor.close()
+
+
+def touch_tables(connection, *tables: str) -> None:
+    """
+    Mark `tables` as written by the unit of work open on `connection`. Each
+    version row is bumped once, right before that unit of work commits (see
+    db.before_commit()), so writers hold it only for their commit rather
+    than for every row they write.
+    """
+    for table in tables:
+        before_commit(connection, f"table_versions:{table}", lambda conn, table=table: _bump(conn, table))
+
+
+# ---------- READ ----------
+def get_table_versions(tables: Sequence[str]) -> Dict[str, Tuple[int, datetime]]:
+    """
+    Return {table_name: (version, updated_at)} for the given tables. Versions
+    are bumped by the repository write helpers through touch_tables().
+    """
+    with get_read_connection() as connection:
+        if connection is None or not connection.is_connected():
+            raise RuntimeError("DB connection failed")
+
+        cursor = connection.cursor()
+        try:
+            return read_table_versions(cursor, tables)
+        finally:
+            cursor.close()
+
+
+async def get_table_versions_async(tables: Sequence[str]) -> Dict[str, Tuple[int, datetime]]:
+    """Async get_table_versions(), for the async app (asgi.py)."""
+    async with get_async_connection() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(_versions_sql(tables), tuple(tables))
+            rows = await cursor.fetchall()
+
+    return {name: (version, updated_at) for name, version, updated_at in rows}
@@ -1,36 +1,50 @@
 # repositories/workplace_placements_repository.py
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
-from db import get_connection
+from db import get_connection, get_read_connection
+from fields import select_columns, select_sql
+from filters import Filter, filter_where, iso_date, positive_int
+from pagination import keyset_query
+from sync import ChangeFeed
+
+from repositories.table_versions_repository import touch_tables
 
 log = logging.getLogger(__name__)
 
+PLACEMENT_ORDER = (("id", "DESC"),)
+
+
+PLACEMENT_FILTERS = {
+    "student_id": Filter("student_id = %s", positive_int),
+    "employer_name": Filter("employer_name = %s"),
+    "start_date_from": Filter("start_date >= %s", iso_date),
+    "start_date_to": Filter("start_date <= %s", iso_date),
+}
+
+
+# Whitelist for ?fields= (also the SELECT order)
+PLACEMENT_FIELDS = (
+    "id",
+    "student_id",
+    "employer_name",
+    "employer_contact",
+    "supervisor_name",
+    "supervisor_phone",
+    "start_date",
+    "end_date",
+    "created_at",
+    "updated_at",
+)
+
+
+def _row_to_placement(row: tuple, columns: Sequence[str] = PLACEMENT_FIELDS) -> Dict[str, Any]:
+    # Raw DB values; FastJSONProvider encodes the dates
+    return dict(zip(columns, row))
+
 
-def _row_to_placement(row: tuple) -> Dict[str, Any]:
-    (
-        pid,
-        student_id,
-        employer_name,
-        employer_contact,
-        supervisor_name,
-        supervisor_phone,
-        start_date,
-        end_date,
-        created_at,
-    ) = row
-
-    return {
-        "id": pid,
-        "student_id": student_id,
-        "employer_name": employer_name,
-        "employer_contact": employer_contact,
-        "supervisor_name": supervisor_name,
-        "supervisor_phone": supervisor_phone,
-        "start_date": start_date.isoformat() if start_date else None,
-        "end_date": end_date.isoformat() if end_date else None,
-        "created_at": created_at.isoformat() if created_at else None,
-    }
+# GET /workplace-placements/changes
+PLACEMENT_FEED = ChangeFeed("workplace_placements", PLACEMENT_FIELDS, _row_to_placement)
 
 
 # ---------- CREATE ----------
@@ -73,6 +87,7 @@ def create_placement(
                 end_date,
             ),
         )
+        touch_tables(connection, "workplace_placements")
         connection.commit()
         new_id = cursor.lastrowid
         cursor.close()
@@ -81,40 +96,41 @@ def create_placement(
 
 
 # ---------- READ ALL ----------
-def list_placements() -> List[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id,
-           employer_name, employer_contact,
-           supervisor_name, supervisor_phone,
-           start_date, end_date, created_at
-    FROM workplace_placements
-    ORDER BY id DESC
-  """
+def list_placements(
+    limit: Optional[int] = None,
+    after: Optional[Sequence[Any]] = None,
+    filters: Optional[Mapping[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    columns = select_columns(PLACEMENT_FIELDS, fields, PLACEMENT_ORDER)
+    where, params = filter_where(filters or {}, PLACEMENT_FILTERS)
+    sql, params = keyset_query(
+        select_sql("workplace_placements", columns),
+        PLACEMENT_ORDER,
+        after=after,
+        limit=limit,
+        where=where,
+        params=params,
+    )
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
         cursor = connection.cursor()
-        cursor.execute(sql)
+        cursor.execute(sql, params)
         rows = cursor.fetchall()
         cursor.close()
 
-    return [_row_to_placement(r) for r in rows]
+    return [_row_to_placement(r, columns) for r in rows]
 
 
 # ---------- READ ONE ----------
-def get_placement(placement_id: int) -> Optional[Dict[str, Any]]:
-    sql = """
-    SELECT id, student_id,
-           employer_name, employer_contact,
-           supervisor_name, supervisor_phone,
-           start_date, end_date, created_at
-    FROM workplace_placements
-    WHERE id = %s
-  """
+def get_placement(placement_id: int, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    columns = select_columns(PLACEMENT_FIELDS, fields)
+    sql = select_sql("workplace_placements", columns) + "\nWHERE id = %s"
 
-    with get_connection() as connection:
+    with get_read_connection() as connection:
         if connection is None or not connection.is_connected():
             raise RuntimeError("DB connection failed")
 
@@ -123,7 +139,7 @@ def get_placement(placement_id: int) -> Optional[Dict[str, Any]]:
         row = cursor.fetchone()
         cursor.close()
 
-    return _row_to_placement(row) if row else None
+    return _row_to_placement(row, columns) if row else None
 
 
 # ---------- UPDATE ----------
@@ -167,6 +183,7 @@ def update_placement(
                 placement_id,
             ),
         )
+        touch_tables(connection, "workplace_placements")
         connection.commit()
         updated_rows = cursor.rowcount
         cursor.close()
@@ -187,6 +204,7 @@ def delete_placement(placement_id: int) -> bool:
 
         cursor = connection.cursor()
         cursor.execute(sql, (placement_id,))
+        touch_tables(connection, "workplace_placements")
         connection.commit()
         deleted = cursor.rowcount > 0
         cursor.close()
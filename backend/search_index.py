@@ -0,0 +1,167 @@
+# search_index.py
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_SPLIT = re.compile(r"[\W_]+")
+
+# Per-term scores; a document's score is the sum over its query terms
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.0
+
+
+def normalise(text: str) -> str:
+    """Lowercase and strip accents ("Zoë" -> "zoe")."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split names / emails into terms ("mary-jane.o@x.io" -> mary, jane, o, x, io)."""
+    return [token for token in _SPLIT.split(normalise(text)) if token]
+
+
+def _deletes(token: str) -> Set[str]:
+    # The token with each single character removed
+    return {token[:i] + token[i + 1 :] for i in range(len(token))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True when a and b differ by one insert, delete, substitution or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    short, long_ = (a, b) if len(a) < len(b) else (b, a)
+    i = 0
+    while i < len(short) and short[i] == long_[i]:
+        i += 1
+    return short[i:] == long_[i + 1 :]
+
+
+class SearchIndex:
+    """
+    In-memory prefix + fuzzy index over short text documents (names,
+    emails). Every query term must match a document token exactly, as a
+    prefix, or within one typo (SymSpell-style delete neighbourhoods), and
+    results are ranked by the summed per-term scores. Thread-safe.
+    """
+
+    def __init__(self, min_fuzzy_length: int = 4):
+        self.min_fuzzy_length = min_fuzzy_length
+        self._lock = threading.Lock()
+        self._docs: Dict[Any, Tuple[Dict[str, Any], Tuple[str, ...]]] = {}
+        self._postings: Dict[str, Set[Any]] = {}
+        self._sorted_tokens: List[str] = []  # unique tokens, for prefix range scans
+        self._by_delete: Dict[str, Set[str]] = defaultdict(set)  # one-char deletion -> tokens
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ---------- WRITE ----------
+    def add(self, doc_id: Any, texts: Iterable[str], payload: Dict[str, Any]) -> None:
+        """Index (or re-index) `doc_id` under the tokens of `texts`."""
+        tokens = tuple(dict.fromkeys(token for text in texts if text for token in tokenize(text)))
+        with self._lock:
+            self._remove(doc_id)
+            self._docs[doc_id] = (payload, tokens)
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    bisect.insort(self._sorted_tokens, token)
+                    if len(token) >= self.min_fuzzy_length:
+                        for variant in _deletes(token):
+                            self._by_delete[variant].add(token)
+                postings.add(doc_id)
+
+    def remove(self, doc_id: Any) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._sorted_tokens.clear()
+            self._by_delete.clear()
+
+    def _remove(self, doc_id: Any) -> None:
+        entry = self._docs.pop(doc_id, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            postings = self._postings[token]
+            postings.discard(doc_id)
+            if postings:
+                continue
+            del self._postings[token]
+            del self._sorted_tokens[bisect.bisect_left(self._sorted_tokens, token)]
+            if len(token) >= self.min_fuzzy_length:
+                for variant in _deletes(token):
+                    self._by_delete[variant].discard(token)
+                    if not self._by_delete[variant]:
+                        del self._by_delete[variant]
+
+    # ---------- READ ----------
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Top `limit` payloads for `query`, best first (ties by doc id), each
+        with its "score".
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            scores: Optional[Dict[Any, float]] = None
+            for term in terms:
+                term_scores = self._term_scores(term)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+                if not scores:
+                    return []
+
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [{**self._docs[doc_id][0], "score": score} for doc_id, score in best]
+
+    def _term_scores(self, term: str) -> Dict[Any, float]:
+        # Best score of `term` against each document's tokens
+        matches: Dict[str, float] = {}
+
+        tokens = self._sorted_tokens
+        i = bisect.bisect_left(tokens, term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            matches[tokens[i]] = EXACT_SCORE if tokens[i] == term else PREFIX_SCORE
+            i += 1
+
+        if len(term) >= self.min_fuzzy_length:
+            candidates = set(self._by_delete.get(term, ()))  # term is a token minus one char
+            if term in self._postings:
+                candidates.add(term)
+            for variant in _deletes(term):
+                if variant in self._postings:  # token is the term minus one char
+                    candidates.add(variant)
+                candidates.update(self._by_delete.get(variant, ()))
+            for token in candidates:
+                if token not in matches and _within_one_edit(term, token):
+                    matches[token] = FUZZY_SCORE
+
+        scores: Dict[Any, float] = {}
+        for token, score in matches.items():
+            for doc_id in self._postings[token]:
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
@@ -0,0 +1,66 @@
+# streaming.py
+import logging
+import os
+from typing import Any, Dict, Iterable, Iterator
+
+from flask import Response, current_app, request, stream_with_context
+
+log = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Rows fetched from the server-side cursor / encoded per chunk
+STREAM_BATCH_SIZE = int(os.getenv("API_STREAM_BATCH_SIZE", "500"))
+
+
+def wants_stream() -> bool:
+    """
+    True when the client asked for a streamed export, via `?stream=1` or
+    `Accept: application/x-ndjson`.
+    """
+    return request.args.get("stream", "").lower() in ("1", "true") or wants_ndjson()
+
+
+def wants_ndjson() -> bool:
+    # Only an explicit NDJSON Accept switches format; */* keeps a JSON array.
+    return any(value == NDJSON_MIMETYPE for value in request.accept_mimetypes.values())
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], ndjson: bool) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    separator = "\n" if ndjson else ","
+    batch = []
+    first = True
+
+    if not ndjson:
+        yield "["
+
+    try:
+        for row in rows:
+            batch.append(dumps(row))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                chunk = separator.join(batch)
+                yield (chunk + "\n") if ndjson else (chunk if first else "," + chunk)
+                first = False
+                batch = []
+
+        if batch:
+            chunk = separator.join(batch)
+            yield (chunk + "\n") if ndjson else (chunk if first else "," + chunk)
+    except Exception as e:
+        # Headers are already sent; the truncated body is all we can signal.
+        log.error("Streaming response aborted", extra={"error": str(e)})
+        raise
+
+    if not ndjson:
+        yield "]"
+
+
+def stream_response(rows: Iterable[Dict[str, Any]]) -> Response:
+    """
+    Stream rows as NDJSON (one object per line) or as a single JSON array,
+    encoding them in chunks so worker memory stays flat.
+    """
+    ndjson = wants_ndjson()
+    mimetype = NDJSON_MIMETYPE if ndjson else "application/json"
+    return Response(stream_with_context(_chunks(rows, ndjson)), mimetype=mimetype)
@@ -0,0 +1,139 @@
+# sync.py
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+from pagination import InvalidPageRequest, decode_cursor, encode_cursor, parse_limit
+
+# A page only reaches up to the start of the oldest open transaction (whose
+# rows carry earlier updated_at / deleted_at stamps than rows committed
+# since), less this margin for the gap between a statement's timestamp and
+# its transaction's start.
+SYNC_SETTLE_SECONDS = float(os.getenv("API_SYNC_SETTLE_SECONDS", "1"))
+
+# Tombstones older than this are pruned (prune_tombstones.py); tokens that
+# have not seen the tombstones up to then can no longer be continued.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("API_SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# Delta feeds walk each table in (updated_at, id) order, tombstones in
+# (deleted_at, id) order
+SYNC_ORDER = (("updated_at", "ASC"), ("id", "ASC"))
+TOMBSTONE_ORDER = (("deleted_at", "ASC"), ("id", "ASC"))
+
+
+class InvalidSyncToken(ValueError):
+    """Raised when `since` is not a token returned by a /changes call."""
+
+    pass
+
+
+class SyncTokenExpired(Exception):
+    """
+    Raised when the tombstones a `since` token still needs may have been
+    pruned; the client has to start again with a full sync.
+    """
+
+    pass
+
+
+@dataclass(frozen=True)
+class ChangeFeed:
+    """
+    What GET /<resource>/changes reads: the table (which must have
+    updated_at and deleted_rows triggers, see V12), its columns in SELECT
+    order and the repository's row converter (dict(zip(...)) when None).
+    """
+
+    table: str
+    columns: Sequence[str]
+    row_to_dict: Optional[Callable[[tuple], Dict[str, Any]]] = None
+
+
+@dataclass
+class SyncRequest:
+    limit: int
+    after: Optional[List[Any]] = None  # last (updated_at, id) seen
+    # Last (deleted_at, deleted_rows.id) seen, or (deleted_at, None) once
+    # every tombstone up to deleted_at has been; None on a full sync, which
+    # needs no tombstones
+    deleted_after: Optional[List[Any]] = None
+
+    @property
+    def fetch_size(self) -> int:
+        # One extra row tells us whether more changes are waiting.
+        return self.limit + 1
+
+
+def parse_sync_request(args: Mapping[str, str]) -> SyncRequest:
+    """
+    Read `since` (an opaque token from the previous call's `next`; absent
+    for a full initial sync) and `limit` from request args.
+    """
+    limit = parse_limit(args)
+    token = args.get("since")
+    if not token:
+        return SyncRequest(limit=limit)
+
+    try:
+        values = decode_cursor(token)
+    except InvalidPageRequest as e:
+        raise InvalidSyncToken("Invalid since token") from e
+    if len(values) == 3 and isinstance(values[2], int):
+        # Tokens from before tombstones were ordered by time
+        raise SyncTokenExpired("since token has expired; start again without since")
+    if len(values) != 4 or not isinstance(values[2], str) or not isinstance(values[3], (int, type(None))):
+        raise InvalidSyncToken("Invalid since token")
+
+    updated_at, row_id, deleted_at, deleted_id = values
+    try:
+        deleted_at = datetime.fromisoformat(deleted_at)
+    except ValueError as e:
+        raise InvalidSyncToken("Invalid since token") from e
+    after = None if updated_at is None else [updated_at, row_id]
+    return SyncRequest(limit=limit, after=after, deleted_after=[deleted_at, deleted_id])
+
+
+def next_sync(
+    rows: List[Dict[str, Any]],
+    tombstones: List[Dict[str, Any]],
+    sync: SyncRequest,
+    synced_to: datetime,
+) -> SyncRequest:
+    """
+    The request that continues after a list_changes() page: `rows` and
+    `tombstones` as returned (look-ahead rows included) and `synced_to`,
+    the time up to which the page was complete.
+    """
+    rows = rows[: sync.limit]
+    after = [rows[-1]["updated_at"], rows[-1]["id"]] if rows else sync.after
+    if len(tombstones) > sync.limit:
+        last = tombstones[sync.limit - 1]
+        deleted_after = [last["deleted_at"], last["seq"]]
+    else:
+        deleted_after = [synced_to, None]
+    return SyncRequest(limit=sync.limit, after=after, deleted_after=deleted_after)
+
+
+def changes_page(
+    rows: List[Dict[str, Any]],
+    tombstones: List[Dict[str, Any]],
+    sync: SyncRequest,
+    synced_to: datetime,
+) -> Dict[str, Any]:
+    """
+    Trim the look-ahead rows and build the response body:
+    {"changes": [...], "deleted": [...], "next": token, "has_more": bool}.
+    `tombstones` carry their deleted_rows id as "seq".
+    """
+    has_more = len(rows) > sync.limit or len(tombstones) > sync.limit
+    following = next_sync(rows, tombstones, sync, synced_to)
+    rows = rows[: sync.limit]
+    tombstones = tombstones[: sync.limit]
+
+    return {
+        "changes": rows,
+        "deleted": [{"id": t["id"], "deleted_at": t["deleted_at"]} for t in tombstones],
+        "next": encode_cursor([*(following.after or [None, None]), *following.deleted_after]),
+        "has_more": has_more,
+    }
@@ -1,10 +1,58 @@
+import asyncio
+import gzip
 import json
+import threading
+import time
+from contextlib import asynccontextmanager, nullcontext
+from datetime import date, datetime
+from decimal import Decimal
 
+import auth
+import compression
+import conditional
+import db
+import includes
+import json_provider
+import jwt
 import main
+import pagination
 import pytest
-from db import create_db_connection
+from cache import RedisCache, TTLCache
+from cryptography.hazmat.primitives.asymmetric import rsa
+from db import (
+    ConnectionPool,
+    PoolExhaustedError,
+    ScopedConnection,
+    after_commit,
+    create_db_connection,
+    get_connection,
+    get_read_connection,
+    transaction,
+)
+from filters import parse_filters
+from flask import has_app_context
 from main import app
+from mappers.students_mapper import Student, StudentMapper
+from pagination import decode_cursor, encode_cursor, keyset_clause
+from repositories import (
+    assessments_repository,
+    attendance_repository,
+    changes_repository,
+    documents_repository,
+    enrolments_repository,
+    programmes_repository,
+    reports_repository,
+    stipend_runs_repository,
+    stipends_repository,
+    student_search_repository,
+    students_repository,
+    summaries_repository,
+    workplace_placements_repository,
+)
 from repositories.students_repository import EmailAlreadyExistsError
+from repositories.table_versions_repository import touch_tables
+from search_index import SearchIndex
+from sync import ChangeFeed, SyncRequest, next_sync
 
 
 @pytest.fixture
@@ -129,3 +177,1562 @@ def test_create_db_connection_failure(monkeypatch):
 
     conn = create_db_connection()
     assert conn is None
+
+
+# ---------- connection pool ----------
+class FakePooledConnection:
+    def __init__(self):
+        self.closed = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return not self.closed
+
+    def ping(self, reconnect=False):
+        if self.closed:
+            raise Exception("gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_returned_connection():
+    created = []
+
+    def fake_connect():
+        conn = FakePooledConnection()
+        created.append(conn)
+        return conn
+
+    pool = ConnectionPool(connect=fake_connect, pool_size=1, max_overflow=0)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is first
+    assert len(created) == 1
+    assert first.rollbacks == 1  # reset on return
+
+
+def test_pool_exhaustion_and_overflow():
+    pool = ConnectionPool(connect=FakePooledConnection, pool_size=1, max_overflow=1, timeout=0.01)
+
+    a = pool.acquire()
+    b = pool.acquire()  # overflow connection
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+
+    pool.release(a)
+    pool.release(b)
+    assert b.closed  # overflow connections are not kept idle
+    assert not a.closed
+
+
+# ---------- one connection per request / unit of work ----------
+class FakeCursor:
+    """Records statements on its connection and reads from its canned results."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rows = []
+        self.lastrowid = None
+        self.rowcount = 1
+        self.closed = False
+
+    def execute(self, sql, params=()):
+        params = list(params or ())
+        self.connection.executed.append((sql, params))
+        self.rows = list(self.connection.answer(sql, params))
+
+    def executemany(self, sql, seq):
+        self.connection.batched.append((sql, list(seq)))
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection(FakePooledConnection):
+    """
+    Shared stand-in for a MySQL connection. Its cursors record execute()
+    calls in `executed` and executemany() calls in `batched`, as
+    (sql, params) pairs, and answer reads from `results`: {SQL fragment:
+    rows}, the first fragment found in the statement winning. Rows may be
+    a callable of the params, for answers that depend on them or on the
+    test's progress. Statements matching no fragment return no rows.
+    """
+
+    def __init__(self, results=None):
+        super().__init__()
+        self.results = results or {}
+        self.commits = 0
+        self.executed = []
+        self.batched = []
+
+    def commit(self):
+        self.commits += 1
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def answer(self, sql, params):
+        for fragment, rows in self.results.items():
+            if fragment in sql:
+                return rows(params) if callable(rows) else rows
+        return []
+
+    def batches(self, fragment):
+        """The rows of each executemany() whose SQL contains `fragment`."""
+        return [rows for sql, rows in self.batched if fragment in sql]
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = ConnectionPool(connect=FakeConnection, pool_size=2, max_overflow=0)
+    monkeypatch.setattr(db, "_pool", pool)
+    return pool
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """
+    fake_db(*repositories, results=None) -> a FakeConnection answering
+    `results`, handed out by the repositories' get_connection and
+    get_read_connection.
+    """
+
+    def serve(*repositories, results=None):
+        connection = FakeConnection(results)
+        for repository in repositories:
+            for name in ("get_connection", "get_read_connection"):
+                monkeypatch.setattr(repository, name, lambda: nullcontext(connection), raising=False)
+        return connection
+
+    return serve
+
+
+def test_request_reuses_one_connection(fake_pool):
+    with app.test_request_context("/"):
+        with get_connection() as first:
+            pass
+        with get_connection() as second:
+            pass
+        assert first is second
+        assert fake_pool._open == 1
+
+    # released back to the pool on teardown
+    assert len(fake_pool._idle) == 1
+
+
+def test_transaction_defers_commits_until_block_ends(fake_pool):
+    with transaction() as tx:
+        with get_connection() as conn:
+            conn.commit()
+            assert conn is tx
+        assert tx.raw.commits == 0
+
+    assert tx.raw.commits == 1
+    assert len(fake_pool._idle) == 1
+
+
+def test_transaction_rolls_back_on_error(fake_pool):
+    with pytest.raises(ValueError):
+        with transaction() as tx:
+            raise ValueError("boom")
+
+    assert tx.raw.commits == 0
+    assert tx.raw.rollbacks >= 1
+
+
+# ---------- keyset pagination ----------
+def test_list_students_paginates_with_next_link(monkeypatch, client):
+    calls = {}
+
+    def fake_list_students(limit=None, after=None, filters=None, fields=None):
+        calls["limit"], calls["after"] = limit, after
+        return [{"id": i, "first_name": "L", "last_name": str(i), "email": f"{i}@x.io"} for i in (1, 2, 3)]
+
+    monkeypatch.setattr(main, "list_students", fake_list_students)
+
+    response = client.get("/students?limit=2")
+
+    assert response.status_code == 200
+    assert [s["id"] for s in response.get_json()] == [1, 2]
+    assert calls == {"limit": 3, "after": None}  # one look-ahead row
+
+    link = response.headers["Link"]
+    assert 'rel="next"' in link
+    cursor = link.split("cursor=")[1].split("&")[0].split(">")[0]
+    assert decode_cursor(cursor) == [2]
+
+    # Without limit the first page has API_DEFAULT_PAGE_SIZE rows; limit is capped
+    client.get("/students")
+    assert calls == {"limit": pagination.DEFAULT_PAGE_SIZE + 1, "after": None}
+    client.get(f"/students?limit={pagination.MAX_PAGE_SIZE + 1000}")
+    assert calls["limit"] == pagination.MAX_PAGE_SIZE + 1
+
+
+def test_list_rejects_bad_page_params(client):
+    assert client.get("/attendance?limit=abc").status_code == 400
+    assert client.get("/attendance?cursor=not-a-cursor").status_code == 400
+
+
+def test_keyset_clause_mixed_directions():
+    clause, params = keyset_clause(
+        (("attendance_date", "DESC"), ("student_id", "ASC")),
+        ["2025-01-31", 7],
+    )
+    assert clause == "((attendance_date < %s) OR (attendance_date = %s AND student_id > %s))"
+    assert params == ["2025-01-31", "2025-01-31", 7]
+
+
+# ---------- streamed exports ----------
+def test_attendance_streams_ndjson(monkeypatch, client):
+    def fake_iter_attendance(filters=None, fields=None):
+        assert filters == {"student_id": 5}
+        for day in (1, 2, 3):
+            yield {"id": day, "student_id": 5, "attendance_date": f"2025-01-0{day}", "status": "present"}
+
+    monkeypatch.setattr(main, "iter_attendance", fake_iter_attendance)
+
+    response = client.get("/attendance?student_id=5", headers={"Accept": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.data.decode().strip().split("\n")
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+
+
+def test_stipends_stream_as_json_array(monkeypatch, client):
+    monkeypatch.setattr(main, "iter_stipends", lambda filters=None, fields=None: iter([{"id": 1}, {"id": 2}]))
+
+    response = client.get("/stipends?stream=1")
+
+    assert response.status_code == 200
+    assert json.loads(response.data) == [{"id": 1}, {"id": 2}]
+
+
+# ---------- list filters ----------
+def test_list_filters_are_parsed_and_pushed_down(monkeypatch, client):
+    seen = {}
+
+    def fake_list_enrolments(limit=None, after=None, filters=None, fields=None):
+        seen.update(filters)
+        return []
+
+    monkeypatch.setattr(main, "list_enrolments", fake_list_enrolments)
+
+    response = client.get("/enrolments?programme_id=3&enrolment_status=enrolled&enrolment_date_from=2025-02-01")
+
+    assert response.status_code == 200
+    assert seen == {"programme_id": 3, "enrolment_status": "enrolled", "enrolment_date_from": "2025-02-01"}
+
+
+def test_list_rejects_invalid_filter_values(client):
+    assert client.get("/enrolments?enrolment_status=bogus").status_code == 400
+    assert client.get("/stipends?month_from=2025-13").status_code == 400
+    assert client.get("/attendance?attendance_date_to=yesterday").status_code == 400
+
+
+# ---------- token and JWKS caches ----------
+def test_ttl_cache_expires_and_evicts_lru():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)  # capped at the cache TTL
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+
+    now[0] = 11
+    assert cache.get("a") is None and cache.get("c") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+@pytest.fixture
+def signed_token(monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return {"k1": private_key.public_key()}
+
+    discovery = auth.OIDCDiscovery("https://idp.test/.well-known/openid-configuration", refresh_interval=0)
+    discovery.issuer = "https://issuer.test/"
+    discovery.jwks_cache = auth.JWKSCache(
+        "https://idp.test/keys", refresh_interval=0, min_refetch_interval=60, fetch=fetch
+    )
+    monkeypatch.setattr(auth, "discovery", discovery)
+    monkeypatch.setattr(auth, "token_cache", TTLCache(maxsize=10, ttl=300))
+
+    def make(kid="k1", expires_in=600):
+        claims = {"iss": "https://issuer.test/", "scp": auth.EXPECTED_SCOPE, "exp": int(time.time()) + expires_in}
+        return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+    make.fetches = fetches
+    return make
+
+
+def test_requires_auth_verifies_each_token_once(monkeypatch, signed_token):
+    monkeypatch.setattr(main, "list_programmes", lambda limit=None, after=None, filters=None, fields=None: [])
+    decodes = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **kw: decodes.append(1) or real_decode(*a, **kw))
+
+    app.config["BYPASS_AUTH"] = False
+    try:
+        with app.test_client() as c:
+            headers = {"Authorization": f"Bearer {signed_token()}"}
+            assert c.get("/programmes", headers=headers).status_code == 200
+            assert c.get("/programmes", headers=headers).status_code == 200
+    finally:
+        app.config["BYPASS_AUTH"] = True
+
+    assert len(decodes) == 1
+    assert auth.token_cache.stats()["hits"] == 1
+    assert len(signed_token.fetches) == 1
+
+
+def test_unknown_kid_refetch_is_throttled(signed_token):
+    jwks_cache = auth.discovery.jwks_cache
+    assert jwks_cache.get_signing_key("k1") is not None
+    for _ in range(3):
+        with pytest.raises(jwt.PyJWKClientError):
+            jwks_cache.get_signing_key("rotated")
+    assert len(signed_token.fetches) == 1  # initial fetch only; refetch throttled
+
+
+def test_replaced_jwks_cache_stops_refreshing():
+    discovery = auth.OIDCDiscovery("https://idp.test/", refresh_interval=0, fetch_config=lambda: {})
+    discovery._apply_config({"issuer": "https://issuer.test/v2.0", "jwks_uri": "https://idp.test/keys"})
+    first = discovery.jwks_cache
+    first.refresh_interval = 0.01
+    fetches = []
+    first._fetch = lambda: fetches.append(1) or {"k1": "key"}
+    first.get_signing_key("k1")  # starts the refresh thread
+
+    discovery._apply_config({"issuer": "https://issuer.test/v2.0", "jwks_uri": "https://idp.test/rotated"})
+
+    assert discovery.jwks_cache is not first
+    assert discovery.jwks_cache.get_signing_key("k1") == "key"  # keys carried over
+    assert first._stopped.is_set()
+    assert not discovery.jwks_cache._stopped.is_set()
+    time.sleep(0.05)  # lets the old thread see the stop
+    stopped_at = len(fetches)
+    time.sleep(0.05)
+    assert len(fetches) == stopped_at
+
+
+# ---------- OIDC discovery ----------
+def test_oidc_discovery_seeds_from_local_files(tmp_path):
+    public_key = rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key()
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(public_key))
+    jwk.update({"kid": "seed-1", "use": "sig"})
+
+    config_file = tmp_path / "openid-configuration.json"
+    config_file.write_text(json.dumps({"issuer": "https://issuer.test/v2.0", "jwks_uri": "https://idp.test/keys"}))
+    jwks_file = tmp_path / "jwks.json"
+    jwks_file.write_text(json.dumps({"keys": [jwk]}))
+
+    def offline():
+        raise ConnectionError("no network")
+
+    discovery = auth.OIDCDiscovery(
+        "https://idp.test/.well-known/openid-configuration",
+        config_file=str(config_file),
+        jwks_file=str(jwks_file),
+        refresh_interval=0,
+        fetch_config=offline,
+    )
+
+    assert discovery.ensure_loaded()
+    assert discovery.issuer == "https://issuer.test/v2.0"
+    assert discovery.jwks_cache.get_signing_key("seed-1") is not None
+
+
+def test_oidc_discovery_retries_with_backoff():
+    now = [0.0]
+    attempts = []
+
+    def flaky():
+        attempts.append(now[0])
+        if len(attempts) < 3:
+            raise ConnectionError("IdP down")
+        return {"issuer": "https://issuer.test/v2.0", "jwks_uri": "https://idp.test/keys"}
+
+    discovery = auth.OIDCDiscovery("https://idp.test/", refresh_interval=0, fetch_config=flaky, clock=lambda: now[0])
+
+    assert not discovery.ensure_loaded()  # attempt 1 fails, retry in 1s
+    assert not discovery.ensure_loaded()  # still backing off: no attempt
+    now[0] = 1.0
+    assert not discovery.ensure_loaded()  # attempt 2 fails, retry in 2s
+    now[0] = 3.0
+    assert discovery.ensure_loaded()
+    assert attempts == [0.0, 1.0, 3.0]
+
+
+# ---------- programmes cache ----------
+def test_after_commit_waits_for_outer_transaction(fake_pool):
+    ran = []
+    with transaction():
+        after_commit(lambda: ran.append("committed"))
+        assert ran == []
+    assert ran == ["committed"]
+
+    with pytest.raises(ValueError):
+        with transaction():
+            after_commit(lambda: ran.append("rolled back"))
+            raise ValueError("boom")
+    assert ran == ["committed"]
+
+
+def test_programmes_read_through_cache(monkeypatch):
+    queries = []
+    version = [7]
+
+    def fake_query(limit=None, after=None, filters=None):
+        queries.append((limit, after, filters))
+        return [{"id": 1, "programme_name": "Welding"}]
+
+    monkeypatch.setattr(programmes_repository, "_query_programmes", fake_query)
+    monkeypatch.setattr(programmes_repository, "_version", lambda: version[0])
+    monkeypatch.setattr(programmes_repository, "_cache", TTLCache(maxsize=8, ttl=60))
+
+    assert programmes_repository.list_programmes(limit=10) == [{"id": 1, "programme_name": "Welding"}]
+    programmes_repository.list_programmes(limit=10)
+    programmes_repository.list_programmes(limit=10, filters={"is_active": 1})
+    assert len(queries) == 2  # second identical call was a hit
+
+    version[0] = 8  # a write in any worker moves every key on
+    programmes_repository.list_programmes(limit=10)
+    assert len(queries) == 3
+    assert programmes_repository._cache.stats()["hits"] == 1
+
+    version[0] = None  # inside a transaction: past the cache
+    programmes_repository.list_programmes(limit=10)
+    programmes_repository.list_programmes(limit=10)
+    assert len(queries) == 5
+
+
+def test_programmes_version_is_skipped_inside_transactions(fake_pool):
+    with transaction():
+        assert programmes_repository._version() is None
+
+
+def test_programmes_version_is_cached_until_a_write_or_its_ttl(monkeypatch, fake_db):
+    now = [0.0]
+    version = [7]
+    monkeypatch.setattr(programmes_repository, "_cache", TTLCache(maxsize=8, ttl=60, clock=lambda: now[0]))
+    conn = fake_db(
+        programmes_repository,
+        results={"FROM table_versions": lambda params: [("programmes", version[0], datetime(2025, 3, 1))]},
+    )
+
+    def version_reads():
+        return sum("table_versions" in sql and "SELECT" in sql for sql, _ in conn.executed)
+
+    assert [programmes_repository._version() for _ in range(3)] == [7, 7, 7]
+    assert version_reads() == 1  # hits cost no DB read
+
+    # this worker's write drops the version once committed
+    version[0] = 8
+    programmes_repository.delete_programme(3)
+    assert programmes_repository._version() == 8
+    assert version_reads() == 2
+
+    # another worker's write is picked up within PROGRAMME_VERSION_TTL
+    version[0] = 9
+    assert programmes_repository._version() == 8
+    now[0] += programmes_repository.PROGRAMME_VERSION_TTL + 0.1
+    assert programmes_repository._version() == 9
+    assert version_reads() == 3
+
+
+class DownRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        return fail
+
+
+def test_redis_cache_outage_is_logged_not_raised():
+    cache = RedisCache("redis://cache.test/0", namespace="programmes", client=DownRedis())
+    assert cache.get("k") is None
+    cache.set("k", 1)
+    cache.delete("k")  # after a commit: must not fail the write
+    cache.clear()
+
+
+# ---------- conditional GET ----------
+def test_table_versions_bumped_once_per_unit_of_work():
+    conn = ScopedConnection(FakeConnection())
+    conn.transaction_depth = 1
+    touch_tables(conn, "students")
+    touch_tables(conn, "stipends", "students")
+    conn.commit()
+    assert conn.raw.executed == []  # deferred to the outer commit
+
+    conn.transaction_depth = 0
+    conn.commit()
+    assert [params for _, params in conn.raw.executed] == [["stipends"], ["students"]]  # once each, in key order
+    assert conn.raw.commits == 1
+
+    touch_tables(conn, "students")
+    conn.rollback()
+    conn.commit()
+    assert len(conn.raw.executed) == 2  # dropped on rollback
+
+
+def test_conditional_get_returns_304_without_running_query(monkeypatch, client):
+    versions = {"students": (7, datetime(2025, 3, 1, 12, 0, 0))}
+    monkeypatch.setattr(conditional, "get_table_versions", lambda tables: versions)
+    calls = []
+    monkeypatch.setattr(
+        main, "list_students", lambda limit=None, after=None, filters=None, fields=None: calls.append(1) or [{"id": 1}]
+    )
+
+    first = client.get("/students")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Last-Modified"]
+
+    revalidated = client.get("/students", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert len(calls) == 1  # query skipped on 304
+
+    since = client.get("/students", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+    versions["students"] = (8, datetime(2025, 3, 2, 9, 0, 0))  # a write bumps the version
+    changed = client.get("/students", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_conditional_get_etag_varies_by_query(monkeypatch, client):
+    monkeypatch.setattr(conditional, "get_table_versions", lambda tables: {"students": (1, datetime(2025, 1, 1))})
+    monkeypatch.setattr(main, "list_students", lambda limit=None, after=None, filters=None, fields=None: [])
+
+    assert client.get("/students?limit=5").headers["ETag"] != client.get("/students?limit=6").headers["ETag"]
+
+
+# ---------- bulk student registration ----------
+def test_student_mapper_insert_many_batches_and_skips_existing(monkeypatch):
+    # students: ids in insertion order, emails unique (case-insensitive)
+    def ids_by_email(emails):
+        inserted = [row[2] for rows in conn.batches("INSERT INTO students") for row in rows]
+        ids = {email.lower(): n for n, email in enumerate(["taken@x.io", *inserted], 1)}
+        return [(ids[email.lower()], email) for email in emails if email.lower() in ids]
+
+    conn = FakeConnection({"WHERE email IN": ids_by_email})
+    monkeypatch.setattr(StudentMapper, "BULK_BATCH_SIZE", 2)
+
+    students = [Student(first_name="A", last_name="B", email=e) for e in ("a@x.io", "TAKEN@x.io", "c@x.io")]
+    ids = StudentMapper().insert_many(conn, students)
+
+    assert ids == [2, None, 3]
+    assert len(conn.batches("INSERT INTO students")) == 2  # one multi-row INSERT per batch
+    assert conn.commits == 1
+
+
+def test_bulk_students_endpoint_accepts_csv(monkeypatch, client, fake_pool):
+    seen = {}
+
+    def fake_bulk(rows):
+        seen["rows"] = rows
+        return [
+            {"index": 0, "status": "created", "id": 10, "email": "a@x.io"},
+            {"index": 1, "status": "conflict", "email": "b@x.io", "error": "Email already exists"},
+        ]
+
+    monkeypatch.setattr(main, "register_students_bulk", fake_bulk)
+
+    body = "first_name,last_name,email\nAna,Moyo,a@x.io\nBen,Dube,b@x.io\n"
+    response = client.post("/students/bulk", data=body, content_type="text/csv")
+
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 1 and response.get_json()["conflict"] == 1
+    assert seen["rows"][1] == {"first_name": "Ben", "last_name": "Dube", "email": "b@x.io"}
+
+
+def test_register_students_bulk_reports_invalid_and_in_batch_duplicates(monkeypatch, fake_db):
+    monkeypatch.setattr(students_repository._mapper, "insert_many", lambda conn, students: [7])
+    fake_db(students_repository)
+
+    results = students_repository.register_students_bulk(
+        [
+            {"first_name": "A", "last_name": "B", "email": "a@x.io"},
+            {"first_name": "A", "last_name": "B", "email": "A@x.io"},
+            {"first_name": "", "last_name": "B", "email": "c@x.io"},
+        ]
+    )
+
+    assert [r["status"] for r in results] == ["created", "conflict", "invalid"]
+    assert results[0]["id"] == 7
+
+
+def test_register_students_bulk_rejects_oversized_rows_without_aborting_batch(monkeypatch, fake_db):
+    inserted = []
+    monkeypatch.setattr(
+        students_repository._mapper, "insert_many", lambda conn, students: inserted.extend(students) or [7, 8]
+    )
+    fake_db(students_repository)
+
+    results = students_repository.register_students_bulk(
+        [
+            {"first_name": "A", "last_name": "B", "email": "a@x.io"},
+            {"first_name": "A", "last_name": "B", "email": "l" * 145 + "@x.io"},  # 150 chars: fits
+            {"first_name": "A", "last_name": "B", "email": "l" * 146 + "@x.io"},  # VARCHAR(150) overflow
+            {"first_name": "A" * 101, "last_name": "B", "email": "d@x.io"},
+            {"first_name": "A", "last_name": "B", "email": "not-an-email"},
+        ]
+    )
+
+    assert [r["status"] for r in results] == ["created", "created", "invalid", "invalid", "invalid"]
+    assert "150" in results[2]["error"] and "100" in results[3]["error"]
+    assert [student.email for student in inserted] == ["a@x.io", "l" * 145 + "@x.io"]
+
+
+# ---------- attendance register ----------
+def test_attendance_register_counts_and_skips_unchanged(fake_db):
+    # student 1: no row yet, 2: absent -> present, 3: already present
+    conn = fake_db(attendance_repository, results={"FROM students": [(1, None), (2, "absent"), (3, "present")]})
+
+    counts = attendance_repository.upsert_attendance_register(
+        "2025-03-03", [(1, "present"), (2, "present"), (3, "present")]
+    )
+
+    assert counts == {"inserted": 1, "updated": 1, "unchanged": 1}
+    # only attendance is locked for update; students are share-locked
+    assert "FOR UPDATE OF a\n    FOR SHARE OF s" in conn.executed[0][0]
+    assert conn.batches("INTO attendance (") == [[(1, "2025-03-03", "present"), (2, "2025-03-03", "present")]]
+    # (student_id, month, present, absent, late, excused) deltas
+    assert conn.batches("attendance_daily_summary") == [[(1, "2025-03", 1, 0, 0, 0), (2, "2025-03", 1, -1, 0, 0)]]
+
+
+def test_attendance_register_rejects_unknown_students(fake_db):
+    conn = fake_db(attendance_repository, results={"FROM students": [(1, None)]})
+
+    with pytest.raises(attendance_repository.UnknownStudentsError) as err:
+        attendance_repository.upsert_attendance_register("2025-03-03", [(1, "present"), (9, "absent")])
+    assert err.value.student_ids == [9]
+    assert conn.batched == [] and conn.rollbacks == 1 and conn.commits == 0
+
+
+def test_attendance_register_validates_body(client):
+    def post(body):
+        return client.post("/attendance/register", json=body)
+
+    entries = [{"student_id": 1, "status": "present"}, {"student_id": 1, "status": "late"}]
+    assert post({"attendance_date": "2025-03-03", "entries": entries}).status_code == 400  # duplicate student
+    assert post({"attendance_date": "03/03/2025", "entries": entries[:1]}).status_code == 400
+    assert post({"attendance_date": "2025-03-03", "entries": [{"student_id": 1, "status": "sick"}]}).status_code == 400
+    assert post([{"student_id": 1, "status": "present"}]).status_code == 400  # not an object
+    assert post({"attendance_date": "2025-03-03", "entries": ["1"]}).status_code == 400
+
+
+# ---------- stipend run ----------
+def test_pro_rata_rule():
+    rule = stipend_runs_repository.ProRataRule(monthly_amount=Decimal("1000"), min_percentage=50, full_percentage=80)
+    assert rule.amount_for(40) == Decimal("0.00")
+    assert rule.amount_for(60) == Decimal("750.00")
+    assert rule.amount_for(95) == Decimal("1000.00")
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+def test_stipend_run_aggregates_once_and_upserts(fake_db, dry_run):
+    conn = fake_db(
+        stipend_runs_repository,
+        results={
+            # (student_id, recorded_days, attended_days)
+            "FROM enrolments": [(1, 20, 20), (2, 20, 13), (3, 20, 5), (4, 20, 20)],
+            # (student_id, amount, status)
+            "FROM stipends": [
+                (2, Decimal("0.00"), "submitted"),
+                (3, Decimal("0.00"), "submitted"),
+                (4, Decimal("900"), "paid"),
+            ],
+        },
+    )
+
+    rule = stipend_runs_repository.ProRataRule(monthly_amount=Decimal("1000"), min_percentage=50, full_percentage=100)
+    report = stipend_runs_repository.run_stipends("2025-02", rule=rule, dry_run=dry_run)
+
+    assert (report["inserted"], report["updated"], report["unchanged"], report["locked"]) == (1, 1, 1, 1)
+    assert report["total_amount"] == 1650.0
+    aggregate_sql, params = conn.executed[0]
+    assert "GROUP BY e.student_id" in aggregate_sql
+    assert params[-2:] == [datetime(2025, 2, 1).date(), datetime(2025, 3, 1).date()]
+    if dry_run:
+        assert conn.batched == []
+    else:
+        assert conn.batches("INSERT INTO stipends") == [
+            [(1, "2025-02", Decimal("1000.00")), (2, "2025-02", Decimal("650.00"))]
+        ]
+        # one new row, one repriced
+        assert conn.batches("stipend_month_totals") == [[("2025-02", "submitted", 1, Decimal("1650.00"))]]
+
+
+def test_stipend_run_validates_body(monkeypatch, client, fake_pool):
+    runs = []
+    monkeypatch.setattr(main, "run_stipends", lambda month, rule, programme_id, dry_run: runs.append(dry_run) or {})
+
+    def post(body):
+        return client.post("/stipends/run", json=body)
+
+    assert post({"month": "2025-02", "dry_run": "no"}).status_code == 400  # truthy, but not a boolean
+    assert post({"month": "2025-02", "dry_run": 1}).status_code == 400
+    assert post({"month": "2025-02", "rule": {"monthly_amount": 0}}).status_code == 400
+    assert post({"month": "2025-02", "rule": {"monthly_amount": "-100"}}).status_code == 400
+    assert post({"month": "2025-02", "rule": {"min_percentage": 95, "full_percentage": 90}}).status_code == 400
+    assert post({"month": "2025-02", "rule": {"min_percentage": -1}}).status_code == 400
+    assert post({"month": "2025-02", "rule": {"full_percentage": 101}}).status_code == 400
+    assert post({"month": "2025-02", "rule": [50]}).status_code == 400
+    assert post(["2025-02"]).status_code == 400
+    assert runs == []
+
+    assert post({"month": "2025-02", "dry_run": True}).status_code == 200
+    assert post({"month": "2025-02", "dry_run": "false"}).status_code == 200
+    assert post({"month": "2025-02"}).status_code == 200
+    assert runs == [True, False, False]
+
+
+# ---------- learner profile ----------
+def test_student_profile_fans_out_concurrently(monkeypatch, client):
+    seen = []
+
+    def slow(value):
+        def section(*args, **kwargs):
+            seen.append((threading.current_thread().name, has_app_context()))
+            time.sleep(0.05)
+            return value
+
+        return section
+
+    monkeypatch.setattr(main, "get_student", slow({"id": 3, "first_name": "Lee"}))
+    for name in ("list_enrolments", "list_placements", "list_assessments", "list_attendance", "list_stipends"):
+        monkeypatch.setattr(main, name, slow([]))
+    monkeypatch.setattr(main, "list_documents", slow([{"id": 9}]))
+    monkeypatch.setattr(main, "summarise_attendance_for_student", slow({"days_recorded": 0}))
+
+    started = time.perf_counter()
+    response = client.get("/students/3/profile")
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["first_name"] == "Lee" and body["documents"] == [{"id": 9}]
+    assert elapsed < 8 * 0.05  # sections overlapped
+    assert all(name.startswith("fanout") and not in_app for name, in_app in seen)
+
+
+def test_student_profile_404(monkeypatch, client):
+    monkeypatch.setattr(main, "get_student", lambda student_id: None)
+    for name in ("list_enrolments", "list_placements", "list_assessments", "list_attendance", "list_stipends"):
+        monkeypatch.setattr(main, name, lambda **kwargs: [])
+    monkeypatch.setattr(main, "list_documents", lambda **kwargs: [])
+    monkeypatch.setattr(main, "summarise_attendance_for_student", lambda student_id, since: {})
+
+    assert client.get("/students/404/profile").status_code == 404
+
+
+# ---------- include= ----------
+def test_include_embeds_with_one_batched_lookup(monkeypatch, client):
+    lookups = []
+
+    def fake_students_by_ids(ids):
+        lookups.append(list(ids))
+        return {i: {"id": i, "first_name": f"S{i}"} for i in ids}
+
+    monkeypatch.setattr(includes, "get_students_by_ids", fake_students_by_ids)
+    monkeypatch.setattr(
+        includes, "get_programmes_by_ids", lambda ids: {i: {"id": i, "programme_name": "Welding"} for i in ids}
+    )
+    rows = [{"id": n, "student_id": sid, "programme_id": 4} for n, sid in enumerate((1, 2, 1, 3))]
+    monkeypatch.setattr(
+        main, "list_enrolments", lambda limit=None, after=None, filters=None, fields=None: [dict(r) for r in rows]
+    )
+
+    response = client.get("/enrolments?include=student,programme")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert lookups == [[1, 2, 3]]  # one IN (...) for all rows, ids de-duplicated
+    assert body[2]["student"] == {"id": 1, "first_name": "S1"}
+    assert body[0]["programme"]["programme_name"] == "Welding"
+
+
+def test_include_rejects_unknown_relation(client):
+    assert client.get("/attendance?include=programme").status_code == 400
+
+
+# ---------- sparse fieldsets ----------
+def test_sparse_fields_narrow_select_and_payload(fake_db, client):
+    # assessment_date is fetched only because the keyset cursor needs it
+    conn = fake_db(assessments_repository, results={"FROM assessments": [(9, date(2025, 3, 1), "competent")]})
+
+    response = client.get("/assessments?fields=id,result")
+
+    assert response.status_code == 200
+    assert conn.executed[-1][0].startswith("SELECT id, assessment_date, result\nFROM assessments")
+    assert response.get_json() == [{"id": 9, "result": "competent"}]
+
+
+def test_sparse_fields_reject_unknown_columns(client):
+    assert client.get("/assessments?fields=id,password").status_code == 400
+    assert client.get("/students/1?fields=").status_code == 400
+
+
+# ---------- JSON provider ----------
+@pytest.mark.parametrize("encoder", ["orjson", "stdlib"])
+def test_json_provider_encodes_raw_db_values(monkeypatch, encoder):
+    if encoder == "orjson":
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(json_provider, "JSON_ENCODER", encoder)
+    provider = json_provider.FastJSONProvider(app)
+    row = {"id": 1, "month": date(2025, 3, 1), "created_at": datetime(2025, 3, 1, 8, 5), "amount": Decimal("12.50")}
+
+    with app.app_context():
+        body = provider.response([row]).get_data()
+
+    assert provider.backend == encoder
+    assert json.loads(body) == [{"id": 1, "month": "2025-03-01", "created_at": "2025-03-01T08:05:00", "amount": 12.5}]
+
+
+# ---------- compression ----------
+def test_compression_respects_threshold_and_accept_encoding(monkeypatch, client):
+    rows = [{"id": i, "student_id": 5, "status": "present"} for i in range(200)]
+    monkeypatch.setattr(main, "list_attendance", lambda **kwargs: [dict(r) for r in rows])
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+
+    big = client.get("/attendance?limit=200", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in big.headers["Vary"]
+    assert json.loads(gzip.decompress(big.data)) == rows
+
+    small = client.get("/attendance?limit=1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers  # under API_COMPRESS_MIN_SIZE
+
+    plain = client.get("/attendance?limit=200")
+    assert "Content-Encoding" not in plain.headers
+
+
+def test_compressed_200_and_its_304_carry_the_same_etag(monkeypatch, client):
+    monkeypatch.setattr(conditional, "get_table_versions", lambda tables: {"attendance": (3, datetime(2025, 3, 1))})
+    monkeypatch.setattr(main, "list_attendance", lambda **kwargs: [{"id": i, "status": "present"} for i in range(200)])
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+
+    first = client.get("/attendance?limit=200", headers={"Accept-Encoding": "gzip"})
+    etag = first.headers["ETag"]
+    assert first.headers["Content-Encoding"] == "gzip" and etag.startswith('W/"')
+
+    for sent in (etag, etag[2:]):  # the weak value, or its strong form from an older response
+        revalidated = client.get("/attendance?limit=200", headers={"Accept-Encoding": "gzip", "If-None-Match": sent})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["ETag"] == etag
+
+    # uncompressed, the 200 carries the same value too
+    assert client.get("/attendance?limit=200").headers["ETag"] == etag
+
+
+def test_compression_streams_chunk_by_chunk(monkeypatch, client):
+    def fake_iter_attendance(filters=None, fields=None):
+        for day in range(1, 4):
+            yield {"id": day, "status": "present"}
+
+    monkeypatch.setattr(main, "iter_attendance", fake_iter_attendance)
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+
+    response = client.get(
+        "/attendance", headers={"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"}, buffered=False
+    )
+
+    assert response.is_streamed and response.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(response.data).decode().strip().split("\n")
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+
+
+# ---------- delta sync ----------
+def test_changes_returns_rows_tombstones_and_next_token(fake_db, client):
+    stamp = datetime(2025, 3, 1, 8, 0, 0, 250000)
+    cutoff = datetime(2025, 3, 1, 9, 0, 0)
+    rows = [(n, 5, date(2025, 3, 1), "present", stamp, stamp) for n in (11, 12, 13)]
+    conn = fake_db(
+        changes_repository,
+        results={
+            "innodb_trx": [(cutoff, datetime(2025, 1, 30))],
+            "FROM attendance": rows,
+            "FROM deleted_rows": [(40, 9, datetime(2025, 3, 1, 9, 30))],
+        },
+    )
+
+    # a full sync: rows up to the cutoff and no tombstones; the token marks
+    # every tombstone up to the cutoff as seen
+    response = client.get("/attendance/changes?limit=2")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [row["id"] for row in body["changes"]] == [11, 12] and body["has_more"] is True
+    assert body["deleted"] == []
+    assert decode_cursor(body["next"]) == ["2025-03-01 08:00:00.250000", 12, "2025-03-01 09:00:00", None]
+    (cutoff_sql, _), (changes_sql, changes_params) = conn.executed
+    assert "innodb_trx" in cutoff_sql
+    assert "updated_at <= %s" in changes_sql and changes_params[0] == cutoff
+
+    # the token resumes rows after (stamp, 12) and tombstones after the cutoff
+    conn.executed.clear()
+    body = client.get(f"/attendance/changes?limit=2&since={body['next']}").get_json()
+    assert body["deleted"] == [{"id": 9, "deleted_at": "2025-03-01T09:30:00"}]
+    _, (changes_sql, changes_params), (tombstone_sql, tombstone_params) = conn.executed
+    assert "ORDER BY updated_at ASC, id ASC" in changes_sql
+    assert "2025-03-01 08:00:00.250000" in changes_params and 12 in changes_params
+    assert "ORDER BY deleted_at ASC, id ASC" in tombstone_sql
+    assert tombstone_params[:3] == ["attendance", cutoff, cutoff]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        ["2025-03-01 08:00:00", 12, "2025-01-01 00:00:00", None],  # before the retention horizon
+        ["2025-03-01 08:00:00", 12, 40],  # issued before tombstones were keyed by time
+    ],
+)
+def test_changes_rejects_expired_since(fake_db, client, token):
+    fake_db(changes_repository, results={"innodb_trx": [(datetime(2025, 3, 1, 9), datetime(2025, 1, 30))]})
+
+    response = client.get(f"/attendance/changes?since={encode_cursor(token)}")
+
+    assert response.status_code == 410
+
+
+def test_changes_rejects_bad_since(client):
+    assert client.get("/stipends/changes?since=not-a-token").status_code == 400
+
+
+def test_changes_wait_for_transactions_open_past_the_settle_window(monkeypatch):
+    """
+    A row written early in a transaction that commits late is stamped
+    before rows already committed: the feed must not hand out a watermark
+    past it while it is still open. Uses a real table, sync_probe, since
+    the transactions need separate sessions.
+    """
+    reader, slow, fast = connections = [create_db_connection() for _ in range(3)]
+    if None in connections:
+        pytest.skip("needs the migrated MySQL (docker compose --profile test)")
+
+    monkeypatch.setattr(changes_repository, "SYNC_SETTLE_SECONDS", 0.1)
+    monkeypatch.setattr(changes_repository, "get_connection", lambda: nullcontext(reader))
+    feed = ChangeFeed("sync_probe", ("id", "updated_at"))
+    setup = reader.cursor()
+    setup.execute(
+        """
+        CREATE TABLE sync_probe (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+        )
+        """
+    )
+    try:
+        sync = SyncRequest(limit=10)
+        sync = next_sync(*changes_repository.list_changes(feed, sync), sync)
+
+        slow_cursor = slow.cursor()
+        slow_cursor.execute("INSERT INTO sync_probe () VALUES ()")
+        slow_cursor.execute("INSERT INTO deleted_rows (table_name, row_id) VALUES ('sync_probe', 100)")
+        time.sleep(1.5)  # well past the settle window
+        fast_cursor = fast.cursor()
+        fast_cursor.execute("INSERT INTO sync_probe () VALUES ()")
+        fast.commit()
+        time.sleep(0.2)
+
+        rows, tombstones, synced_to = changes_repository.list_changes(feed, sync)
+        assert rows == [] and tombstones == []
+        sync = next_sync(rows, tombstones, sync, synced_to)
+
+        slow.commit()
+        time.sleep(0.2)
+
+        rows, tombstones, _ = changes_repository.list_changes(feed, sync)
+        assert len(rows) == 2
+        assert [t["id"] for t in tombstones] == [100]
+    finally:
+        for connection in (slow, fast):
+            connection.rollback()
+            connection.close()
+        setup.execute("DROP TABLE sync_probe")
+        setup.execute("DELETE FROM deleted_rows WHERE table_name = 'sync_probe'")
+        reader.commit()
+        setup.close()
+        reader.close()
+
+
+# ---------- student search ----------
+def test_search_index_ranks_exact_prefix_and_typo_matches():
+    index = SearchIndex()
+    index.add(1, ["John", "Smith"], {"id": 1})
+    index.add(2, ["Johnson", "Mokoena"], {"id": 2})
+    index.add(3, ["Zoë", "Naidoo"], {"id": 3})
+
+    assert [r["id"] for r in index.search("john")] == [1, 2]  # exact beats prefix
+    assert [r["id"] for r in index.search("jhon")] == [1]  # transposition
+    assert [r["id"] for r in index.search("zoe naid")] == [3]  # accents folded, every term must match
+    assert index.search("john naidoo") == []
+
+    index.remove(1)
+    assert [r["id"] for r in index.search("jo")] == [2]
+
+
+def test_student_search_builds_from_feed_and_tracks_writes(monkeypatch, client):
+    stamp = datetime(2025, 3, 1, 8, 0, 0)
+    feed = [
+        {"id": 1, "first_name": "Thabo", "last_name": "Mokoena", "email": "thabo.m@example.com", "updated_at": stamp},
+        {"id": 2, "first_name": "Lerato", "last_name": "Mokoena", "email": "lerato@example.com", "updated_at": stamp},
+    ]
+    calls = []
+
+    def fake_list_changes(_feed, sync):
+        calls.append(sync)
+        return (feed, [], stamp) if len(calls) == 1 else ([], [], stamp)
+
+    monkeypatch.setattr(student_search_repository, "list_changes", fake_list_changes)
+    student_search_repository.reset_index()
+
+    response = client.get("/students/search?q=mokoena%20thab")
+    assert response.status_code == 200
+    assert [(s["id"], s["email"]) for s in response.get_json()] == [(1, "thabo.m@example.com")]
+
+    # local writes show up without waiting for the next refresh
+    student_search_repository.index_student({**feed[1], "id": 3, "first_name": "Thabiso"})
+    student_search_repository.unindex_student(1)
+    assert [s["id"] for s in client.get("/students/search?q=thab").get_json()] == [3]
+    assert len(calls) == 1
+
+    student_search_repository.reset_index()
+
+
+def test_student_search_requires_query(client):
+    assert client.get("/students/search?q=%20").status_code == 400
+
+
+# ---------- EXPLAIN regression (needs the migrated MySQL) ----------
+# Synthetic rows per table: on a near-empty table a full scan is the
+# cheapest plan whatever the indexes, so EXPLAIN would prove nothing.
+EXPLAIN_ROWS = 5000
+
+# (columns, SELECT expressions over n = 0 .. EXPLAIN_ROWS - 1)
+_SCRATCH_ROWS = {
+    "students": (
+        "first_name, last_name, email",
+        "CONCAT('First', n), CONCAT('Last', n), CONCAT('student', n, '@example.com')",
+    ),
+    "programmes": (
+        "programme_code, programme_name, nqf_level, is_active",
+        "CONCAT('P', n), CONCAT('Programme ', n), n % 8 + 1, n % 2",
+    ),
+    "enrolments": (
+        "student_id, programme_id, enrolment_status, enrolment_date",
+        "n % 1000 + 1, n % 50 + 1, ELT(n % 4 + 1, 'applied', 'enrolled', 'completed', 'withdrawn'),"
+        " CURRENT_DATE - INTERVAL n % 700 DAY",
+    ),
+    "attendance": (
+        "student_id, attendance_date, status",
+        "n % 1000 + 1, CURRENT_DATE - INTERVAL n DIV 1000 DAY, ELT(n % 4 + 1, 'present', 'absent', 'late', 'excused')",
+    ),
+    "stipends": (
+        "student_id, month, amount, status",
+        "n % 1000 + 1, DATE_FORMAT(CURRENT_DATE - INTERVAL n DIV 1000 MONTH, '%Y-%m'), 1000,"
+        " ELT(n % 4 + 1, 'submitted', 'approved', 'paid', 'rejected')",
+    ),
+    "assessments": (
+        "student_id, programme_id, assessment_type, assessment_name, assessment_date, result",
+        "n % 1000 + 1, n % 50 + 1, ELT(n % 2 + 1, 'Formative', 'Summative'), CONCAT('Task ', n),"
+        " CURRENT_DATE - INTERVAL n % 700 DAY, ELT(n % 3 + 1, 'Competent', 'Not Yet Competent', 'Pending')",
+    ),
+    "workplace_placements": (
+        "student_id, employer_name, start_date",
+        "n % 1000 + 1, CONCAT('Employer ', n % 200), CURRENT_DATE - INTERVAL n % 700 DAY",
+    ),
+    "documents": (
+        "student_id, document_name, document_type, file_path",
+        "n % 1000 + 1, CONCAT('Doc ', n), ELT(n % 3 + 1, 'id', 'cv', 'contract'), CONCAT('/docs/', n)",
+    ),
+}
+
+_LIST_QUERIES = {
+    "students": (students_repository, students_repository.list_students, students_repository.STUDENT_FILTERS),
+    "programmes": (
+        programmes_repository,
+        programmes_repository._query_programmes,  # past the cache
+        programmes_repository.PROGRAMME_FILTERS,
+    ),
+    "enrolments": (
+        enrolments_repository,
+        enrolments_repository.list_enrolments,
+        enrolments_repository.ENROLMENT_FILTERS,
+    ),
+    "attendance": (
+        attendance_repository,
+        attendance_repository.list_attendance,
+        attendance_repository.ATTENDANCE_FILTERS,
+    ),
+    "stipends": (stipends_repository, stipends_repository.list_stipends, stipends_repository.STIPEND_FILTERS),
+    "assessments": (
+        assessments_repository,
+        assessments_repository.list_assessments,
+        assessments_repository.ASSESSMENT_FILTERS,
+    ),
+    "workplace_placements": (
+        workplace_placements_repository,
+        workplace_placements_repository.list_placements,
+        workplace_placements_repository.PLACEMENT_FILTERS,
+    ),
+    "documents": (documents_repository, documents_repository.list_documents, documents_repository.DOCUMENT_FILTERS),
+}
+
+# The first page of every list endpoint, each filter on its own and the
+# combinations the profile / dashboards send.
+EXPLAIN_CASES = [
+    ("students", {}),
+    ("students", {"email": "student7@example.com"}),
+    ("programmes", {}),
+    ("programmes", {"programme_code": "P7"}),
+    ("programmes", {"is_active": "true"}),
+    ("programmes", {"nqf_level": "4"}),
+    ("enrolments", {}),
+    ("enrolments", {"student_id": "7"}),
+    ("enrolments", {"programme_id": "7"}),
+    ("enrolments", {"programme_id": "7", "enrolment_status": "enrolled"}),
+    ("enrolments", {"enrolment_status": "enrolled"}),
+    ("attendance", {}),
+    ("attendance", {"student_id": "7"}),
+    ("attendance", {"student_id": "7", "attendance_date_from": "2025-03-01"}),
+    ("attendance", {"status": "absent"}),
+    ("attendance", {"attendance_date_from": "2025-03-01", "attendance_date_to": "2025-03-31"}),
+    ("stipends", {}),
+    ("stipends", {"student_id": "7"}),
+    ("stipends", {"status": "approved"}),
+    ("stipends", {"month": "2025-03"}),
+    ("stipends", {"month_from": "2025-01", "month_to": "2025-06"}),
+    ("assessments", {}),
+    ("assessments", {"student_id": "7"}),
+    ("assessments", {"programme_id": "7"}),
+    ("assessments", {"assessment_type": "Summative"}),
+    ("assessments", {"result": "Competent"}),
+    ("workplace_placements", {}),
+    ("workplace_placements", {"student_id": "7"}),
+    ("workplace_placements", {"employer_name": "Employer 7"}),
+    ("documents", {}),
+    ("documents", {"student_id": "7"}),
+    ("documents", {"document_type": "cv"}),
+]
+
+
+@pytest.fixture(scope="module")
+def scratch_db():
+    """
+    A MySQL session where every table is shadowed by a TEMPORARY copy (same
+    indexes, no triggers or FKs) holding EXPLAIN_ROWS synthetic rows; the
+    summary tables and table_versions start empty. Nothing is written to
+    the real tables.
+    """
+    connection = create_db_connection()
+    if connection is None:
+        pytest.skip("needs the migrated MySQL (docker compose --profile test)")
+
+    cursor = connection.cursor()
+    cursor.execute(f"SET SESSION cte_max_recursion_depth = {EXPLAIN_ROWS}")
+    for table, (columns, values) in _SCRATCH_ROWS.items():
+        cursor.execute(f"CREATE TEMPORARY TABLE {table} LIKE {table}")
+        cursor.execute(
+            f"""
+            INSERT INTO {table} ({columns})
+            WITH RECURSIVE seq (n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < {EXPLAIN_ROWS - 1})
+            SELECT {values} FROM seq
+            """
+        )
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+    for table in ("attendance_daily_summary", "stipend_month_totals", "table_versions"):
+        cursor.execute(f"CREATE TEMPORARY TABLE {table} LIKE {table}")
+    connection.commit()
+    cursor.close()
+
+    yield connection
+    connection.close()
+
+
+def assert_uses_indexes(connection, sql, params):
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = cursor.fetchall()
+    cursor.close()
+    for step in plan:
+        assert step["type"] != "ALL", f"full scan of {step['table']}:\n{sql}\n{plan}"
+        assert "filesort" not in (step["Extra"] or ""), f"filesort on {step['table']}:\n{sql}\n{plan}"
+
+
+@pytest.mark.parametrize("resource, args", EXPLAIN_CASES)
+def test_list_queries_use_indexes(fake_db, scratch_db, resource, args):
+    repository, list_rows, spec = _LIST_QUERIES[resource]
+    connection = fake_db(repository)
+
+    list_rows(limit=101, filters=parse_filters(args, spec))
+
+    assert connection.executed
+    for sql, params in connection.executed:
+        assert_uses_indexes(scratch_db, sql, params)
+
+
+def test_programme_code_probe_uses_unique_index(scratch_db):
+    connection = FakeConnection()
+    programmes_repository._ensure_unique_code(connection, "P7", exclude_id=3)
+    ((sql, params),) = connection.executed
+    assert_uses_indexes(scratch_db, sql, params)
+
+
+# ---------- read replicas ----------
+@pytest.fixture
+def replica_pool(monkeypatch, fake_pool):
+    lag = {"seconds": 0}
+
+    def connect():
+        return FakeConnection({"SHOW REPLICA STATUS": lambda params: [{"Seconds_Behind_Source": lag["seconds"]}]})
+
+    pool = ConnectionPool(connect=connect, pool_size=2, max_overflow=0)
+    replica = db.Replica("replica:3306", pool, lag_check_interval=0)
+    monkeypatch.setattr(db, "_replicas", [replica])
+    monkeypatch.setattr(db, "DB_REPLICA_CONFIGS", [{"host": "replica"}])
+    monkeypatch.setattr(db, "_sticky", TTLCache(ttl=10))
+    return replica, lag
+
+
+def test_reads_use_replica_until_caller_writes(replica_pool):
+    replica, _ = replica_pool
+
+    with app.test_request_context("/"):
+        with get_read_connection() as conn:
+            assert conn.pool is replica.pool and replica.lag == 0
+        with get_connection() as conn:
+            conn.commit()
+        with get_read_connection() as conn:
+            assert conn.pool is None  # primary: sees the write just made
+        response = app.process_response(app.response_class())
+    marker = response.headers[db.STICKY_HEADER]
+    assert db.STICKY_COOKIE in response.headers["Set-Cookie"]
+
+    # the writer presents the marker (any worker, any address) and stays on
+    # the primary; callers without it, or with a forged far-off one, do not
+    with app.test_request_context("/", headers={db.STICKY_HEADER: marker}):
+        with get_read_connection() as conn:
+            assert conn.pool is None
+    with app.test_request_context("/", environ_base={"HTTP_COOKIE": f"{db.STICKY_COOKIE}={marker}"}):
+        with get_read_connection() as conn:
+            assert conn.pool is None
+    with app.test_request_context("/", headers={db.STICKY_HEADER: str(time.time() + 3600)}):
+        with get_read_connection() as conn:
+            assert conn.pool is replica.pool
+    with app.test_request_context("/"):
+        with get_read_connection() as conn:
+            assert conn.pool is replica.pool
+
+    assert len(replica.pool._idle) == 1  # released on teardown
+
+
+def test_lagging_replica_falls_back_to_primary(replica_pool):
+    replica, lag = replica_pool
+    lag["seconds"] = 60
+
+    with app.test_request_context("/"):
+        with get_read_connection() as conn:
+            assert conn.pool is None
+    assert replica.lag == 60
+
+    with transaction():
+        lag["seconds"] = 0
+        with get_read_connection() as conn:
+            assert conn.pool is None  # reads inside a unit of work see its writes
+
+
+# ---------- prepared statements ----------
+class FakePreparedCursor(FakeCursor):
+    """Like the connector's prepared cursor: re-prepares unless given the very same SQL object."""
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.prepared = None
+        self.lastrowid = 7
+
+    def execute(self, sql, params=()):
+        if sql is not self.prepared:
+            self.connection.prepares.append(sql)
+            self.prepared = sql
+        super().execute(sql, params)
+        self.connection.unread_result = "SELECT" in sql
+
+    def fetchall(self):
+        self.connection.unread_result = False
+        return super().fetchall()
+
+
+class FakePreparedConnection(FakeConnection):
+    def __init__(self):
+        super().__init__({"SELECT": lambda params: [(params[0], "Ada")]})
+        self.prepares = []
+        self.unread_result = False
+        self.cursors = []
+
+    def cursor(self, prepared=False, dictionary=False):
+        assert prepared
+        self.cursors.append(FakePreparedCursor(self))
+        return self.cursors[-1]
+
+
+def test_mapper_statements_are_prepared_once_per_connection(monkeypatch):
+    monkeypatch.setattr(db, "_supports_prepared", lambda conn: isinstance(conn, FakePreparedConnection))
+    conn = FakePreparedConnection()
+    mapper = StudentMapper()
+
+    for _ in range(3):
+        assert mapper.get_by_id(db.ScopedConnection(conn), 5, columns=("id", "first_name")).first_name == "Ada"
+        assert not conn.unread_result  # drained for the next statement
+    assert mapper.insert(conn, Student(first_name="A", last_name="B", email="a@x.io")) == 7
+    assert mapper.insert(conn, Student(first_name="C", last_name="D", email="c@x.io")) == 7
+
+    assert len(conn.prepares) == 2  # one SELECT and one INSERT
+    assert len(conn.cursors) == 2
+
+    plain = FakeConnection()
+    assert type(db.prepared_cursor(plain, StudentMapper.DELETE_SQL)) is FakeCursor  # not a MySQL connection
+
+
+def test_prepared_statement_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(db, "_supports_prepared", lambda conn: isinstance(conn, FakePreparedConnection))
+    monkeypatch.setitem(db.DB_PREPARED_STATEMENTS, "cache_size", 1)
+    conn = FakePreparedConnection()
+
+    StudentMapper().delete(conn, 1)
+    StudentMapper().get_by_id(conn, 1, columns=("id", "first_name"))
+
+    assert [c.closed for c in conn.cursors] == [True, False]  # deallocated on eviction
+
+
+# ---------- async serving mode (asgi.py) ----------
+class FakeAsyncCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=()):
+        self.conn.executed.append((sql, params))
+        await asyncio.sleep(self.conn.delay)
+
+    async def fetchall(self):
+        return self.conn.rows
+
+    async def fetchone(self):
+        return self.conn.rows[0] if self.conn.rows else None
+
+
+class FakeAsyncConnection:
+    def __init__(self, rows, delay=0.0):
+        self.rows = rows
+        self.delay = delay
+        self.executed = []
+
+    def cursor(self):
+        return FakeAsyncCursor(self)
+
+
+@pytest.fixture
+def asgi(monkeypatch):
+    pytest.importorskip("quart")
+    pytest.importorskip("a2wsgi")
+    import asgi
+
+    monkeypatch.setitem(asgi.async_app.config, "BYPASS_AUTH", True)
+
+    async def no_versions(tables):
+        raise RuntimeError("no table_versions")
+
+    monkeypatch.setattr(asgi, "get_table_versions_async", no_versions)
+    return asgi
+
+
+def use_async_connection(monkeypatch, connection):
+    @asynccontextmanager
+    async def fake_connection():
+        yield connection
+
+    monkeypatch.setattr(students_repository, "get_async_connection", fake_connection)
+
+
+def test_async_students_list_paginates_like_sync(monkeypatch, asgi):
+    connection = FakeAsyncConnection([(i, "L", str(i), f"{i}@x.io", None, None) for i in (1, 2, 3)])
+    use_async_connection(monkeypatch, connection)
+
+    async def fetch():
+        return await asgi.async_app.test_client().get("/students?limit=2&email=1@x.io")
+
+    response = asyncio.run(fetch())
+
+    assert response.status_code == 200
+    assert [s["id"] for s in asyncio.run(response.get_json())] == [1, 2]
+    ((sql, params),) = connection.executed
+    assert "email = %s" in sql and "LIMIT %s" in sql
+    assert list(params) == ["1@x.io", 3]  # one look-ahead row
+    cursor = response.headers["Link"].split("cursor=")[1].split("&")[0].split(">")[0]
+    assert decode_cursor(cursor) == [2]
+
+
+def test_async_requests_overlap_on_one_worker(monkeypatch, asgi):
+    # 20 requests whose query takes 0.2s each finish in ~0.2s, not 4s
+    use_async_connection(monkeypatch, FakeAsyncConnection([(5, "Ada", "L", "a@x.io", None, None)], delay=0.2))
+
+    async def fetch_all():
+        client = asgi.async_app.test_client()
+        return await asyncio.gather(*(client.get("/students/5") for _ in range(20)))
+
+    started = time.perf_counter()
+    responses = asyncio.run(fetch_all())
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * 20
+    assert elapsed < 1.0
+
+
+def test_async_app_serves_reads_and_hands_the_rest_to_flask(asgi):
+    def routed(method, path):
+        return asgi.app.is_async({"type": "http", "method": method, "path": path})
+
+    assert routed("GET", "/students") and routed("HEAD", "/students/7") and routed("GET", "/health")
+    assert not routed("POST", "/students")  # writes stay sync
+    assert not routed("OPTIONS", "/students")  # CORS preflight via flask-cors
+    assert not routed("GET", "/students/search")
+    assert not routed("GET", "/programmes")
+
+
+# ---------- programme reports ----------
+def test_programme_summary_aggregates_in_sql_and_caches_per_version(monkeypatch, fake_db):
+    versions = dict.fromkeys(reports_repository.REPORT_TABLES, 1)
+    conn = fake_db(
+        reports_repository,
+        results={
+            "table_versions": lambda params: [(table, v, datetime(2025, 3, 1)) for table, v in versions.items()],
+            # The learner subquery reads enrolments too, so joins are matched first.
+            # attendance_daily_summary: (programme, month, present, absent, late, excused)
+            "JOIN attendance_daily_summary": [
+                (3, "2025-02", 15, 5, 0, 0),
+                (3, "2025-01", 0, 0, 10, 0),
+                (3, "2024-12", 0, 0, 0, 0),
+            ],
+            "JOIN stipends": [(3, "paid", 4, Decimal("10000.00")), (3, "submitted", 1, Decimal("2500.00"))],
+            "FROM programmes": [(3, "WLD-01", "Welding", 1)],
+            "FROM enrolments": [(3, "enrolled", 4), (3, "withdrawn", 1)],
+            "FROM assessments": [(3, 10, Decimal("71.456"), 6, 2)],
+        },
+    )
+    monkeypatch.setattr(reports_repository, "_cache", TTLCache(maxsize=8, ttl=60))
+
+    summary = reports_repository.get_programme_summary(3, ("2025-01", "2025-03"))
+
+    assert summary["enrolments"] == {"applied": 0, "enrolled": 4, "completed": 0, "withdrawn": 1, "total": 5}
+    assert summary["assessments"]["average_score_percentage"] == 71.46
+    assert summary["assessments"]["competency_rate"] == 75.0
+    attendance = summary["attendance"]
+    assert (attendance["days_recorded"], attendance["attendance_percentage"]) == (30, 83.33)
+    assert [m["month"] for m in attendance["months"]] == ["2025-01", "2025-02"]
+    assert attendance["months"][1]["attendance_percentage"] == 75.0
+    assert summary["stipends"]["total"] == {"count": 5, "amount": Decimal("12500.00")}
+    assert all("GROUP BY" in sql for sql, _ in conn.executed[2:])
+    assert "attendance_daily_summary" in conn.executed[-2][0]
+    assert conn.executed[-2][1] == [3, "2025-01", "2025-03"]
+
+    queries = len(conn.executed)
+    assert reports_repository.get_programme_summary(3, ("2025-01", "2025-03")) == summary
+    assert len(conn.executed) == queries + 1  # versions only: served from the cache
+
+    versions["attendance"] = 2  # a write bumps the version
+    reports_repository.get_programme_summary(3, ("2025-01", "2025-03"))
+    assert len(conn.executed) == 2 * queries + 1
+
+
+def test_report_period_defaults_and_validation(client):
+    assert reports_repository.report_period(month_to="2025-03") == ("2024-04", "2025-03")
+    assert client.get("/reports/overview?month_from=2025-13").status_code == 400
+    assert client.get("/reports/overview?month_from=2025-06&month_to=2025-01").status_code == 400
+
+
+# ---------- summary tables ----------
+def test_attendance_and_stipend_writes_move_summary_counts(monkeypatch, fake_db):
+    # the row lock returns the row's values before the write
+    conn = fake_db(attendance_repository, results={"FOR UPDATE": [(7, date(2025, 2, 28), "absent")]})
+    monkeypatch.setattr(attendance_repository, "get_attendance", lambda attendance_id: {"id": attendance_id})
+
+    attendance_repository.update_attendance(5, 7, "2025-03-03", "late")
+    assert conn.batches("attendance_daily_summary") == [[(7, "2025-02", 0, -1, 0, 0), (7, "2025-03", 0, 0, 1, 0)]]
+    assert conn.commits == 1  # base row and summary together
+
+    conn = fake_db(stipends_repository, results={"FOR UPDATE": [("2025-03", "submitted", Decimal("2500.00"))]})
+    monkeypatch.setattr(stipends_repository, "get_stipend", lambda stipend_id: {"id": stipend_id})
+
+    stipends_repository.update_stipend(9, 7, "2025-03", 2500.00, "approved")
+    stipends_repository.delete_stipend(9)
+    assert conn.batches("stipend_month_totals") == [
+        [("2025-03", "approved", 1, Decimal("2500.00")), ("2025-03", "submitted", -1, Decimal("-2500.00"))],
+        [("2025-03", "submitted", -1, Decimal("-2500.00"))],
+    ]
+    assert conn.commits == 2
+
+
+def test_rebuild_summaries_repairs_drift_on_mysql(monkeypatch, scratch_db):
+    monkeypatch.setattr(summaries_repository, "get_connection", lambda: nullcontext(scratch_db))
+
+    def drift():
+        report = summaries_repository.rebuild_summaries(check_only=True)
+        return [counts["drifted"] for counts in report.values()]  # attendance, stipends
+
+    # The scratch summaries start empty: every key of the base tables is missing
+    report = summaries_repository.rebuild_summaries()
+    assert all(counts["drifted"] > 0 and counts["after"] == 0 for counts in report.values())
+    assert drift() == [0, 0]
+
+    # Writes that bypass the summaries: one new student-month, one repriced stipend
+    cursor = scratch_db.cursor()
+    cursor.execute("INSERT INTO attendance (student_id, attendance_date, status) VALUES (1, '2020-01-15', 'late')")
+    cursor.execute("SELECT id, month, status, amount FROM stipends WHERE student_id = 1 ORDER BY id LIMIT 1")
+    ((stipend_id, month, status, amount),) = cursor.fetchall()
+    cursor.execute("UPDATE stipends SET amount = amount + 1 WHERE id = %s", (stipend_id,))
+    scratch_db.commit()
+    assert drift() == [1, 1]
+
+    # The incremental upserts square them
+    summaries_repository.adjust_attendance_summary(cursor, [(1, date(2020, 1, 15), "late", 1)])
+    summaries_repository.adjust_stipend_totals(cursor, [(month, status, amount, -1), (month, status, amount + 1, 1)])
+    scratch_db.commit()
+    assert drift() == [0, 0]
+
+    # A delete leaves a zeroed summary row behind, which matches the missing key
+    cursor.execute("DELETE FROM attendance WHERE student_id = 1 AND attendance_date = '2020-01-15'")
+    summaries_repository.adjust_attendance_summary(cursor, [(1, date(2020, 1, 15), "late", -1)])
+    scratch_db.commit()
+    cursor.execute("SELECT present, absent, late, excused FROM attendance_daily_summary WHERE month = '2020-01'")
+    assert cursor.fetchall() == [(0, 0, 0, 0)]
+    assert drift() == [0, 0]
+    cursor.close()
@@ -0,0 +1,129 @@
+USE student_registration_db;
+
+-- =========================================================
+-- Per-table change versions
+-- Bumped by triggers on every write; the API derives ETag /
+-- Last-Modified from them with a single primary-key read.
+-- =========================================================
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+);
+
+INSERT IGNORE INTO table_versions (table_name) VALUES
+    ('students'),
+    ('programmes'),
+    ('enrolments'),
+    ('workplace_placements'),
+    ('attendance'),
+    ('stipends'),
+    ('documents'),
+    ('assessments');
+
+-- ---------- students ----------
+-- FK cascades do not fire triggers, so a student delete also bumps
+-- every table that cascades from students.
+CREATE TRIGGER trg_students_versions_ai AFTER INSERT ON students FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'students';
+
+CREATE TRIGGER trg_students_versions_au AFTER UPDATE ON students FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'students';
+
+CREATE TRIGGER trg_students_versions_ad AFTER DELETE ON students FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name IN ('students', 'workplace_placements', 'attendance', 'stipends', 'documents', 'assessments');
+
+-- ---------- programmes ----------
+CREATE TRIGGER trg_programmes_versions_ai AFTER INSERT ON programmes FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'programmes';
+
+CREATE TRIGGER trg_programmes_versions_au AFTER UPDATE ON programmes FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'programmes';
+
+CREATE TRIGGER trg_programmes_versions_ad AFTER DELETE ON programmes FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name IN ('programmes', 'assessments');
+
+-- ---------- enrolments ----------
+CREATE TRIGGER trg_enrolments_versions_ai AFTER INSERT ON enrolments FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'enrolments';
+
+CREATE TRIGGER trg_enrolments_versions_au AFTER UPDATE ON enrolments FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'enrolments';
+
+CREATE TRIGGER trg_enrolments_versions_ad AFTER DELETE ON enrolments FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'enrolments';
+
+-- ---------- workplace_placements ----------
+CREATE TRIGGER trg_workplace_placements_versions_ai AFTER INSERT ON workplace_placements FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'workplace_placements';
+
+CREATE TRIGGER trg_workplace_placements_versions_au AFTER UPDATE ON workplace_placements FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'workplace_placements';
+
+CREATE TRIGGER trg_workplace_placements_versions_ad AFTER DELETE ON workplace_placements FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'workplace_placements';
+
+-- ---------- attendance ----------
+CREATE TRIGGER trg_attendance_versions_ai AFTER INSERT ON attendance FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'attendance';
+
+CREATE TRIGGER trg_attendance_versions_au AFTER UPDATE ON attendance FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'attendance';
+
+CREATE TRIGGER trg_attendance_versions_ad AFTER DELETE ON attendance FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'attendance';
+
+-- ---------- stipends ----------
+CREATE TRIGGER trg_stipends_versions_ai AFTER INSERT ON stipends FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'stipends';
+
+CREATE TRIGGER trg_stipends_versions_au AFTER UPDATE ON stipends FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'stipends';
+
+CREATE TRIGGER trg_stipends_versions_ad AFTER DELETE ON stipends FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'stipends';
+
+-- ---------- documents ----------
+CREATE TRIGGER trg_documents_versions_ai AFTER INSERT ON documents FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'documents';
+
+CREATE TRIGGER trg_documents_versions_au AFTER UPDATE ON documents FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'documents';
+
+CREATE TRIGGER trg_documents_versions_ad AFTER DELETE ON documents FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'documents';
+
+-- ---------- assessments ----------
+CREATE TRIGGER trg_assessments_versions_ai AFTER INSERT ON assessments FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'assessments';
+
+CREATE TRIGGER trg_assessments_versions_au AFTER UPDATE ON assessments FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'assessments';
+
+CREATE TRIGGER trg_assessments_versions_ad AFTER DELETE ON assessments FOR EACH ROW
+    UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6)
+    WHERE table_name = 'assessments';
@@ -0,0 +1,99 @@
+USE student_registration_db;
+
+-- =========================================================
+-- Change tracking for GET /<resource>/changes
+-- Every table gets an updated_at (set on insert and on every
+-- update) with an (updated_at, id) index for the delta query.
+-- Deletes leave a tombstone in deleted_rows.
+-- =========================================================
+
+ALTER TABLE students
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_students_updated_at (updated_at, id);
+
+ALTER TABLE programmes
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_programmes_updated_at (updated_at, id);
+
+ALTER TABLE enrolments
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_enrolments_updated_at (updated_at, id);
+
+ALTER TABLE workplace_placements
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_workplace_placements_updated_at (updated_at, id);
+
+ALTER TABLE attendance
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_attendance_updated_at (updated_at, id);
+
+ALTER TABLE stipends
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_stipends_updated_at (updated_at, id);
+
+ALTER TABLE documents
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_documents_updated_at (updated_at, id);
+
+ALTER TABLE assessments
+    ADD COLUMN updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+    ADD INDEX idx_assessments_updated_at (updated_at, id);
+
+-- ---------- tombstones ----------
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    table_name VARCHAR(64) NOT NULL,
+    row_id INT NOT NULL,
+    deleted_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+    INDEX idx_deleted_rows_table (table_name, id)
+);
+
+CREATE TRIGGER trg_students_tombstone_ad AFTER DELETE ON students FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('students', OLD.id);
+
+CREATE TRIGGER trg_programmes_tombstone_ad AFTER DELETE ON programmes FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('programmes', OLD.id);
+
+CREATE TRIGGER trg_enrolments_tombstone_ad AFTER DELETE ON enrolments FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('enrolments', OLD.id);
+
+CREATE TRIGGER trg_workplace_placements_tombstone_ad AFTER DELETE ON workplace_placements FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('workplace_placements', OLD.id);
+
+CREATE TRIGGER trg_attendance_tombstone_ad AFTER DELETE ON attendance FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('attendance', OLD.id);
+
+CREATE TRIGGER trg_stipends_tombstone_ad AFTER DELETE ON stipends FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('stipends', OLD.id);
+
+CREATE TRIGGER trg_documents_tombstone_ad AFTER DELETE ON documents FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('documents', OLD.id);
+
+CREATE TRIGGER trg_assessments_tombstone_ad AFTER DELETE ON assessments FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('assessments', OLD.id);
+
+-- FK cascades do not fire triggers, so the parent's BEFORE DELETE
+-- records tombstones for the child rows the cascade will remove.
+CREATE TRIGGER trg_students_tombstone_placements_bd BEFORE DELETE ON students FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id)
+    SELECT 'workplace_placements', id FROM workplace_placements WHERE student_id = OLD.id;
+
+CREATE TRIGGER trg_students_tombstone_attendance_bd BEFORE DELETE ON students FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id)
+    SELECT 'attendance', id FROM attendance WHERE student_id = OLD.id;
+
+CREATE TRIGGER trg_students_tombstone_stipends_bd BEFORE DELETE ON students FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id)
+    SELECT 'stipends', id FROM stipends WHERE student_id = OLD.id;
+
+CREATE TRIGGER trg_students_tombstone_documents_bd BEFORE DELETE ON students FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id)
+    SELECT 'documents', id FROM documents WHERE student_id = OLD.id;
+
+CREATE TRIGGER trg_students_tombstone_assessments_bd BEFORE DELETE ON students FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id)
+    SELECT 'assessments', id FROM assessments WHERE student_id = OLD.id;
+
+CREATE TRIGGER trg_programmes_tombstone_assessments_bd BEFORE DELETE ON programmes FOR EACH ROW
+    INSERT INTO deleted_rows (table_name, row_id)
+    SELECT 'assessments', id FROM assessments WHERE programme_id = OLD.id;
@@ -0,0 +1,70 @@
+USE student_registration_db;
+
+-- =========================================================
+-- Secondary indexes for the list endpoints
+-- Each index matches a repository's filter + keyset ORDER BY
+-- (the *_FILTERS / *_ORDER specs in backend/repositories/), so
+-- pages are read in index order with no filesort or full scan.
+-- InnoDB appends the primary key to every secondary index.
+-- test_app.py::test_list_queries_use_indexes EXPLAINs them.
+-- =========================================================
+
+-- ---------- programmes ----------
+-- ORDER BY programme_name, id; programme_code is checked for
+-- uniqueness on every create/update (and is now enforced).
+ALTER TABLE programmes
+    ADD UNIQUE INDEX uq_programmes_code (programme_code),
+    ADD INDEX idx_programmes_name (programme_name, id),
+    ADD INDEX idx_programmes_active_name (is_active, programme_name, id),
+    ADD INDEX idx_programmes_nqf_name (nqf_level, programme_name, id);
+
+-- ---------- enrolments ----------
+-- ORDER BY id DESC, filtered by student / programme / status.
+-- These replace the indexes InnoDB created implicitly for the FKs.
+-- (enrolment_status, student_id) also covers the stipend run's
+-- SELECT DISTINCT student_id ... WHERE enrolment_status = 'enrolled'.
+ALTER TABLE enrolments
+    ADD INDEX idx_enrolments_student (student_id, id),
+    ADD INDEX idx_enrolments_programme (programme_id, id),
+    ADD INDEX idx_enrolments_programme_status (programme_id, enrolment_status, id),
+    ADD INDEX idx_enrolments_status_student (enrolment_status, student_id),
+    ADD INDEX idx_enrolments_status (enrolment_status, id);
+
+-- ---------- attendance ----------
+-- ORDER BY attendance_date DESC, student_id ASC (mixed directions
+-- need a descending key part). Per-student reads already use
+-- idx_attendance_unique (student_id, attendance_date).
+ALTER TABLE attendance
+    ADD INDEX idx_attendance_date (attendance_date DESC, student_id),
+    ADD INDEX idx_attendance_status_date (status, attendance_date DESC, student_id);
+
+-- ---------- stipends ----------
+-- ORDER BY month DESC, student_id ASC; the stipend run reads one
+-- month at a time. Per-student reads use idx_stipend_unique.
+ALTER TABLE stipends
+    ADD INDEX idx_stipends_month (month DESC, student_id),
+    ADD INDEX idx_stipends_status_month (status, month DESC, student_id);
+
+-- ---------- assessments ----------
+-- ORDER BY assessment_date DESC, id DESC. The V10 single-column
+-- indexes made every filtered page sort; widen them to carry the
+-- order (the new student / programme indexes back the FKs).
+ALTER TABLE assessments
+    ADD INDEX idx_assessments_date (assessment_date, id),
+    ADD INDEX idx_assessments_student_date (student_id, assessment_date, id),
+    ADD INDEX idx_assessments_programme_date (programme_id, assessment_date, id),
+    ADD INDEX idx_assessments_type_date (assessment_type, assessment_date, id),
+    ADD INDEX idx_assessments_result_date (result, assessment_date, id);
+
+ALTER TABLE assessments
+    DROP INDEX idx_assessments_student,
+    DROP INDEX idx_assessments_programme,
+    DROP INDEX idx_assessments_type;
+
+-- ---------- workplace_placements / documents ----------
+-- ORDER BY id DESC; student filters use the V6 / V9 indexes.
+ALTER TABLE workplace_placements
+    ADD INDEX idx_placements_employer (employer_name, id);
+
+ALTER TABLE documents
+    ADD INDEX idx_documents_type (document_type, id);
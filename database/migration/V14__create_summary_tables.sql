@@ -0,0 +1,56 @@
+USE student_registration_db;
+
+-- =========================================================
+-- Summary tables for attendance and stipend reporting
+-- Maintained incrementally by the attendance / stipends
+-- repositories in the same transaction as each write
+-- (backend/repositories/summaries_repository.py); recompute
+-- and verify them with backend/rebuild_summaries.py.
+-- =========================================================
+
+-- Days per status for each learner and month ('YYYY-MM').
+-- Counts are signed so that drift shows up as a mismatch
+-- instead of failing writes. Rows go with the student.
+CREATE TABLE IF NOT EXISTS attendance_daily_summary (
+    student_id INT NOT NULL,
+    month CHAR(7) NOT NULL,
+    present INT NOT NULL DEFAULT 0,
+    absent INT NOT NULL DEFAULT 0,
+    late INT NOT NULL DEFAULT 0,
+    excused INT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (student_id, month),
+
+    CONSTRAINT fk_attendance_summary_student
+      FOREIGN KEY (student_id) REFERENCES students(id)
+      ON DELETE CASCADE
+);
+
+-- Stipend count and amount per month and status.
+CREATE TABLE IF NOT EXISTS stipend_month_totals (
+    month VARCHAR(7) NOT NULL,
+    status ENUM('submitted','approved','paid','rejected') NOT NULL,
+    stipend_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (month, status)
+);
+
+-- ---------- backfill ----------
+INSERT INTO attendance_daily_summary (student_id, month, present, absent, late, excused)
+SELECT
+    student_id,
+    DATE_FORMAT(attendance_date, '%Y-%m') AS month,
+    SUM(status = 'present'),
+    SUM(status = 'absent'),
+    SUM(status = 'late'),
+    SUM(status = 'excused')
+FROM attendance
+WHERE status IS NOT NULL
+GROUP BY student_id, month;
+
+INSERT INTO stipend_month_totals (month, status, stipend_count, total_amount)
+SELECT month, status, COUNT(*), SUM(amount)
+FROM stipends
+WHERE status IS NOT NULL
+GROUP BY month, status;
@@ -0,0 +1,46 @@
+USE student_registration_db;
+
+-- =========================================================
+-- Table versions are bumped by the application instead
+-- The V11 per-row triggers updated the single table_versions
+-- row once per written row and kept it locked until commit,
+-- serialising every writer of a table (bulk imports, class
+-- registers, stipend runs). The repository write helpers now
+-- bump each written table once per transaction, just before
+-- it commits (table_versions_repository.touch_tables).
+-- =========================================================
+
+DROP TRIGGER IF EXISTS trg_students_versions_ai;
+DROP TRIGGER IF EXISTS trg_students_versions_au;
+DROP TRIGGER IF EXISTS trg_students_versions_ad;
+
+DROP TRIGGER IF EXISTS trg_programmes_versions_ai;
+DROP TRIGGER IF EXISTS trg_programmes_versions_au;
+DROP TRIGGER IF EXISTS trg_programmes_versions_ad;
+
+DROP TRIGGER IF EXISTS trg_enrolments_versions_ai;
+DROP TRIGGER IF EXISTS trg_enrolments_versions_au;
+DROP TRIGGER IF EXISTS trg_enrolments_versions_ad;
+
+DROP TRIGGER IF EXISTS trg_workplace_placements_versions_ai;
+DROP TRIGGER IF EXISTS trg_workplace_placements_versions_au;
+DROP TRIGGER IF EXISTS trg_workplace_placements_versions_ad;
+
+DROP TRIGGER IF EXISTS trg_attendance_versions_ai;
+DROP TRIGGER IF EXISTS trg_attendance_versions_au;
+DROP TRIGGER IF EXISTS trg_attendance_versions_ad;
+
+DROP TRIGGER IF EXISTS trg_stipends_versions_ai;
+DROP TRIGGER IF EXISTS trg_stipends_versions_au;
+DROP TRIGGER IF EXISTS trg_stipends_versions_ad;
+
+DROP TRIGGER IF EXISTS trg_documents_versions_ai;
+DROP TRIGGER IF EXISTS trg_documents_versions_au;
+DROP TRIGGER IF EXISTS trg_documents_versions_ad;
+
+DROP TRIGGER IF EXISTS trg_assessments_versions_ai;
+DROP TRIGGER IF EXISTS trg_assessments_versions_au;
+DROP TRIGGER IF EXISTS trg_assessments_versions_ad;
+
+-- Expire every validator issued under the triggers
+UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP(6);
@@ -0,0 +1,12 @@
+USE student_registration_db;
+
+-- =========================================================
+-- GET /<resource>/changes reads tombstones in (deleted_at, id)
+-- order, the same time-based watermark as the rows, and
+-- prune_tombstones.py deletes them by age.
+-- =========================================================
+
+ALTER TABLE deleted_rows
+    ADD INDEX idx_deleted_rows_table_time (table_name, deleted_at, id),
+    ADD INDEX idx_deleted_rows_deleted_at (deleted_at),
+    DROP INDEX idx_deleted_rows_table;
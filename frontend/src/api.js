@@ -0,0 +1,32 @@
+// src/api.js
+
+// Rows per request when reading a whole list (the API caps it at 500)
+const PAGE_SIZE = 500;
+
+// URL of the Link: <...>; rel="next" header, or null on the last page
+function nextPageUrl(linkHeader) {
+  if (!linkHeader) return null;
+  const match = linkHeader.match(/<([^>]+)>\s*;\s*rel="next"/);
+  return match ? match[1] : null;
+}
+
+// Read every row of a list endpoint (e.g. /students) a page at a time,
+// following rel="next". Throws with the API's error message on failure;
+// `label` names the list in the fallback message.
+export async function fetchAllPages(url, token, label) {
+  const headers = { Authorization: `Bearer ${token}` };
+  const rows = [];
+  let next = `${url}${url.includes("?") ? "&" : "?"}limit=${PAGE_SIZE}`;
+
+  while (next) {
+    const resp = await fetch(next, { headers });
+    const data = await resp.json().catch(() => ({}));
+    if (!resp.ok) {
+      throw new Error(data.error || `Failed to load ${label}: ${resp.status}`);
+    }
+    rows.push(...(data || []));
+    next = nextPageUrl(resp.headers.get("Link"));
+  }
+
+  return rows;
+}
@@ -1,5 +1,6 @@
 // src/components/AssessmentsPage.jsx
 import React, { useEffect, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function AssessmentsPage() {
@@ -60,40 +61,17 @@ function AssessmentsPage() {
       try {
         const token = await getTokenForApi();
 
-        const [studentsResp, programmesResp, assessmentsResp] =
+        const [studentsData, programmesData, assessmentsData] =
           await Promise.all([
-            fetch(`${apiBase}/students`, {
-              headers: { Authorization: `Bearer ${token}` },
-            }),
-            fetch(`${apiBase}/programmes`, {
-              headers: { Authorization: `Bearer ${token}` },
-            }),
-            fetch(`${apiBase}/assessments`, {
-              headers: { Authorization: `Bearer ${token}` },
-            }),
+            fetchAllPages(`${apiBase}/students`, token, "students"),
+            fetchAllPages(`${apiBase}/programmes`, token, "programmes"),
+            fetchAllPages(`${apiBase}/assessments`, token, "assessments"),
           ]);
 
-        if (!studentsResp.ok) {
-          const data = await studentsResp.json().catch(() => ({}));
-          throw new Error(data.error || "Failed to load students");
-        }
-        if (!programmesResp.ok) {
-          const data = await programmesResp.json().catch(() => ({}));
-          throw new Error(data.error || "Failed to load programmes");
-        }
-        if (!assessmentsResp.ok) {
-          const data = await assessmentsResp.json().catch(() => ({}));
-          throw new Error(data.error || "Failed to load assessments");
-        }
-
-        const studentsData = await studentsResp.json();
-        const programmesData = await programmesResp.json();
-        const assessmentsData = await assessmentsResp.json();
-
-        setStudents(studentsData || []);
-        setProgrammes(programmesData || []);
-        setAssessments(assessmentsData || []);
-        setFiltered(assessmentsData || []);
+        setStudents(studentsData);
+        setProgrammes(programmesData);
+        setAssessments(assessmentsData);
+        setFiltered(assessmentsData);
       } catch (err) {
         console.error("Failed to load assessments", err);
         setLoadError(err.message || "Failed to load assessments");
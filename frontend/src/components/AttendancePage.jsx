@@ -1,5 +1,6 @@
 // src/components/AttendancePage.jsx
 import React, { useEffect, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function AttendancePage() {
@@ -19,19 +20,8 @@ function AttendancePage() {
             ? "http://localhost:5000"
             : "http://student-app:5000";
 
-        const url = `${apiBase}/attendance`; // TODO backend
-
-        const resp = await fetch(url, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-
-        if (!resp.ok) {
-          const data = await resp.json().catch(() => ({}));
-          throw new Error(data.error || `Failed: ${resp.status}`);
-        }
-
-        const data = await resp.json();
-        setRows(data || []);
+        const data = await fetchAllPages(`${apiBase}/attendance`, token, "attendance");
+        setRows(data);
       } catch (err) {
         console.error("Failed to load attendance", err);
         setLoadError(err.message || "Failed to load attendance");
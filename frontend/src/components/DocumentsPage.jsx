@@ -1,5 +1,6 @@
 // src/components/DocumentsPage.jsx
 import React, { useEffect, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function DocumentsPage() {
@@ -19,19 +20,8 @@ function DocumentsPage() {
             ? "http://localhost:5000"
             : "http://student-app:5000";
 
-        const url = `${apiBase}/documents`; // TODO backend
-
-        const resp = await fetch(url, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-
-        if (!resp.ok) {
-          const data = await resp.json().catch(() => ({}));
-          throw new Error(data.error || `Failed: ${resp.status}`);
-        }
-
-        const data = await resp.json();
-        setDocs(data || []);
+        const data = await fetchAllPages(`${apiBase}/documents`, token, "documents");
+        setDocs(data);
       } catch (err) {
         console.error("Failed to load documents", err);
         setLoadError(err.message || "Failed to load documents");
@@ -1,5 +1,6 @@
 // src/components/EnrolmentsPage.jsx
 import React, { useEffect, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function EnrolmentsPage() {
@@ -56,46 +57,17 @@ function EnrolmentsPage() {
       try {
         const token = await getTokenForApi();
 
-        const [enrolResp, studResp, progResp] = await Promise.all([
-          fetch(`${apiBase}/enrolments`, {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
-          fetch(`${apiBase}/students`, {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
-          fetch(`${apiBase}/programmes`, {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
+        const [enrolData, studData, progData] = await Promise.all([
+          fetchAllPages(`${apiBase}/enrolments`, token, "enrolments"),
+          fetchAllPages(`${apiBase}/students`, token, "students"),
+          fetchAllPages(`${apiBase}/programmes`, token, "programmes"),
         ]);
 
-        const [enrolDataRaw, studDataRaw, progDataRaw] = await Promise.all([
-          enrolResp.json().catch(() => []),
-          studResp.json().catch(() => []),
-          progResp.json().catch(() => []),
-        ]);
-
-        if (!enrolResp.ok) {
-          throw new Error(
-            enrolDataRaw.error || `Failed to load enrolments: ${enrolResp.status}`
-          );
-        }
-        if (!studResp.ok) {
-          throw new Error(
-            studDataRaw.error || `Failed to load students: ${studResp.status}`
-          );
-        }
-        if (!progResp.ok) {
-          throw new Error(
-            progDataRaw.error || `Failed to load programmes: ${progResp.status}`
-          );
-        }
-
-        const enrolData = enrolDataRaw || [];
         setEnrolments(enrolData);
         setFiltered(enrolData);
 
-        setStudents(studDataRaw || []);
-        setProgrammes(progDataRaw || []);
+        setStudents(studData);
+        setProgrammes(progData);
       } catch (err) {
         console.error("Failed to load enrolments/students/programmes", err);
         setLoadError(
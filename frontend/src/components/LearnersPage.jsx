@@ -1,5 +1,6 @@
 // src/components/LearnersPage.jsx
 import React, { useEffect, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function LearnersPage() {
@@ -38,20 +39,9 @@ function LearnersPage() {
 
       try {
         const token = await getTokenForApi();
-        const url = `${apiBase}/students`;
-
-        const resp = await fetch(url, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-
-        if (!resp.ok) {
-          const data = await resp.json().catch(() => ({}));
-          throw new Error(data.error || `Failed: ${resp.status}`);
-        }
-
-        const data = await resp.json();
-        setLearners(data || []);
-        setFiltered(data || []);
+        const data = await fetchAllPages(`${apiBase}/students`, token, "learners");
+        setLearners(data);
+        setFiltered(data);
       } catch (err) {
         console.error("Failed to load learners", err);
         setLoadError(err.message || "Failed to load learners");
@@ -1,5 +1,6 @@
 // src/components/ProgrammesPage.jsx
 import React, { useEffect, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function ProgrammesPage() {
@@ -40,20 +41,9 @@ function ProgrammesPage() {
 
       try {
         const token = await getTokenForApi();
-        const url = `${apiBase}/programmes`;
-
-        const resp = await fetch(url, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-
-        if (!resp.ok) {
-          const data = await resp.json().catch(() => ({}));
-          throw new Error(data.error || `Failed: ${resp.status}`);
-        }
-
-        const data = await resp.json();
-        setProgrammes(data || []);
-        setFiltered(data || []);
+        const data = await fetchAllPages(`${apiBase}/programmes`, token, "programmes");
+        setProgrammes(data);
+        setFiltered(data);
       } catch (err) {
         console.error("Failed to load programmes", err);
         setLoadError(err.message || "Failed to load programmes");
@@ -1,5 +1,6 @@
 // src/components/StipendsPage.jsx
 import React, { useEffect, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function StipendsPage() {
@@ -19,19 +20,8 @@ function StipendsPage() {
             ? "http://localhost:5000"
             : "http://student-app:5000";
 
-        const url = `${apiBase}/stipends`; // TODO backend
-
-        const resp = await fetch(url, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-
-        if (!resp.ok) {
-          const data = await resp.json().catch(() => ({}));
-          throw new Error(data.error || `Failed: ${resp.status}`);
-        }
-
-        const data = await resp.json();
-        setRows(data || []);
+        const data = await fetchAllPages(`${apiBase}/stipends`, token, "stipends");
+        setRows(data);
       } catch (err) {
         console.error("Failed to load stipends", err);
         setLoadError(err.message || "Failed to load stipends");
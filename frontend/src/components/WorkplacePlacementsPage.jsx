@@ -1,5 +1,6 @@
 // src/components/WorkplacePlacementsPage.jsx
 import React, { useEffect, useMemo, useState } from "react";
+import { fetchAllPages } from "../api";
 import { getTokenForApi } from "../authClient";
 
 function WorkplacePlacementsPage() {
@@ -62,31 +63,14 @@ function WorkplacePlacementsPage() {
       try {
         const token = await getTokenForApi();
 
-        const [placementsResp, learnersResp] = await Promise.all([
-          fetch(`${apiBase}/workplace-placements`, {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
-          fetch(`${apiBase}/students`, {
-            headers: { Authorization: `Bearer ${token}` },
-          }),
+        const [placementsData, learnersData] = await Promise.all([
+          fetchAllPages(`${apiBase}/workplace-placements`, token, "placements"),
+          fetchAllPages(`${apiBase}/students`, token, "learners"),
         ]);
 
-        if (!placementsResp.ok) {
-          const data = await placementsResp.json().catch(() => ({}));
-          throw new Error(data.error || `Failed placements: ${placementsResp.status}`);
-        }
-
-        if (!learnersResp.ok) {
-          const data = await learnersResp.json().catch(() => ({}));
-          throw new Error(data.error || `Failed learners: ${learnersResp.status}`);
-        }
-
-        const placementsData = await placementsResp.json();
-        const learnersData = await learnersResp.json();
-
-        setPlacements(placementsData || []);
-        setFiltered(placementsData || []);
-        setLearners(learnersData || []);
+        setPlacements(placementsData);
+        setFiltered(placementsData);
+        setLearners(learnersData);
       } catch (err) {
         console.error("Failed to load workplace placements", err);
         setLoadError(err.message || "Failed to load workplace placements");
@@ -0,0 +1,10 @@
+#!/bin/bash
+# Runs once, on mysql-db's first start (empty data dir). The change feed
+# reads information_schema.innodb_trx to hold pages back behind open
+# transactions, which needs PROCESS. On an existing volume run the GRANT
+# by hand as root.
+set -euo pipefail
+
+docker_process_sql <<-EOSQL
+	GRANT PROCESS ON *.* TO '${MYSQL_USER}'@'%';
+EOSQL
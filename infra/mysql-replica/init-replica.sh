@@ -0,0 +1,18 @@
+#!/bin/bash
+# Runs once, on mysql-replica's first start (empty data dir): follow
+# mysql-db from its first GTID, then refuse writes. Local testing only
+# (replicates as root).
+set -euo pipefail
+
+docker_process_sql <<-EOSQL
+	GRANT REPLICATION CLIENT ON *.* TO '${MYSQL_USER}'@'%';
+	CHANGE REPLICATION SOURCE TO
+	    SOURCE_HOST = 'mysql-db',
+	    SOURCE_PORT = 3306,
+	    SOURCE_USER = 'root',
+	    SOURCE_PASSWORD = '${MYSQL_ROOT_PASSWORD}',
+	    SOURCE_AUTO_POSITION = 1,
+	    GET_SOURCE_PUBLIC_KEY = 1;
+	START REPLICA;
+	SET PERSIST super_read_only = ON;
+EOSQL
@@ -6,7 +6,7 @@ resource "aws_db_subnet_group" "default" {
 resource "aws_db_instance" "mysql" {
   identifier        = "${var.project}-${var.env}-mysql"
   engine            = "mysql"
-  engine_version    = "8.0"
+  engine_version    = "8.0" # resolves to a current 8.0 minor; the API needs >= 8.0.19
   instance_class    = "db.t3.micro"
   allocated_storage = 20
 